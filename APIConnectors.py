@@ -5,11 +5,520 @@ Functions in this module are connectors to various API's. At the moment only
 the CDG API is accounted for, future plans include the govInfo API and
 House, Senate API's
 """
-import requests as req
 import re
 import logging
-from settings import MIN_CONGRESS, CURRENT_CONGRESS
-from keys import API_KEY
+import base64
+import gzip
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from threading import Lock
+from urllib.parse import urlsplit, parse_qsl, urlencode
+import time
+from settings import (MIN_CONGRESS, CURRENT_CONGRESS, IDENTITY_CACHE_SIZE,
+                      HTTP_POOL_SIZE, API_RATE_LIMIT, API_RATE_PERIOD,
+                      TRANSPORT, CASSETTE_DIR, get_api_key,
+                      ADAPTIVE_PAGE_SIZE, ADAPTIVE_MAX_PAGE_BYTES,
+                      ADAPTIVE_TARGET_LATENCY, CDG_MAX_PAGE_SIZE,
+                      GOVINFO_MAX_PAGE_SIZE, FAST_JSON, CDG_BASE_URL,
+                      API_RATE_LIMITED_HOSTS)
+
+_session = None
+_session_lock = Lock()
+
+
+def get_session():
+    """
+    Returns the requests session shared by every connector in the process, so
+    calls made from different objects (and threads) reuse the same pool of
+    connections.
+
+    The session asks for every compression urllib3 can decode here (gzip and
+    deflate always, brotli and zstd when their packages are installed).
+
+    requests is only imported here, the first time something actually goes
+    out over the network, so importing the connectors stays cheap.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests as req
+            from urllib3.util.request import ACCEPT_ENCODING
+            _session = req.Session()
+            _session.headers['Accept-Encoding'] = ACCEPT_ENCODING
+            adapter = req.adapters.HTTPAdapter(pool_connections=HTTP_POOL_SIZE,
+                                               pool_maxsize=HTTP_POOL_SIZE)
+            _session.mount('http://', adapter)
+            _session.mount('https://', adapter)
+        return _session
+
+
+class rate_limiter():
+    """
+    Token bucket shared by every connector in the process. api.data.gov gives
+    each key a fixed number of requests per hour, so every call takes a token
+    first and waits if the bucket is empty.
+    """
+    def __init__(self, rate=API_RATE_LIMIT, period=API_RATE_PERIOD):
+        self.rate = rate
+        self.period = period
+        self._tokens = float(rate)
+        self._updated = time.monotonic()
+        self._lock = Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._tokens = min(self.rate,
+                           self._tokens + elapsed * self.rate / self.period)
+        self._updated = now
+
+    def acquire(self):
+        """
+        Takes a token, sleeping until one is available.
+        """
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) * self.period / self.rate
+            time.sleep(wait)
+
+    @property
+    def remaining(self):
+        with self._lock:
+            self._refill()
+            return int(self._tokens)
+
+
+RATE_LIMITER = rate_limiter()
+
+
+class transfer_stats():
+    """
+    Thread-safe running totals of what's been downloaded. wire_bytes is what
+    actually came over the network (compressed, if the server compressed it)
+    and content_bytes is the size after decompression.
+    """
+    def __init__(self):
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self):
+        self.requests = 0
+        self.wire_bytes = 0
+        self.content_bytes = 0
+        self.encodings = dict()
+
+    def record(self, wire_bytes, content_bytes, encoding=None):
+        encoding = encoding or 'identity'
+        with self._lock:
+            self.requests += 1
+            self.wire_bytes += wire_bytes
+            self.content_bytes += content_bytes
+            self.encodings[encoding] = self.encodings.get(encoding, 0) + 1
+
+    @property
+    def ratio(self):
+        """
+        Compressed size as a fraction of the decompressed size.
+        """
+        if not self.content_bytes:
+            return None
+        return self.wire_bytes / self.content_bytes
+
+    def __repr__(self):
+        return ('<transfer_stats {} requests, {} bytes on the wire, {} bytes '
+                'decoded>'.format(self.requests, self.wire_bytes,
+                                  self.content_bytes))
+
+
+TRANSFER_STATS = transfer_stats()
+
+
+def wire_size(response):
+    """
+    Number of bytes a response took on the wire. urllib3 counts the raw bytes
+    it read before decoding; fall back to Content-Length, then to the decoded
+    size.
+    """
+    raw = getattr(response, 'raw', None)
+    if raw is not None and hasattr(raw, 'tell'):
+        try:
+            read = raw.tell()
+            if read:
+                return read
+        except (OSError, ValueError):
+            pass
+    length = response.headers.get('Content-Length')
+    return int(length) if length else len(response.content)
+
+
+_msgspec = None
+
+
+def fast_json():
+    """
+    Returns the msgspec module if it's installed and FAST_JSON is on, else
+    None. Like requests, msgspec is only imported the first time it's
+    needed.
+    """
+    global _msgspec
+    if _msgspec is None:
+        _msgspec = False
+        if FAST_JSON:
+            try:
+                import msgspec
+                _msgspec = msgspec
+            except ImportError:
+                pass
+    return _msgspec or None
+
+
+def decode_json(content):
+    """
+    Decodes a JSON response body (bytes or str) into dicts and lists, with
+    msgspec if it's available and the json module if not.
+    """
+    msgspec = fast_json()
+    if msgspec is not None:
+        return msgspec.json.decode(content)
+    return json.loads(content)
+
+
+class http_transport():
+    """
+    Default transport. Sends requests over the shared session, spends a token
+    from the rate limiter for each one that goes to an api.data.gov host and
+    adds its size to TRANSFER_STATS.
+    """
+    def __init__(self, stats=None):
+        self.stats = stats or TRANSFER_STATS
+
+    def get(self, url, params=None):
+        if urlsplit(url).hostname in API_RATE_LIMITED_HOSTS:
+            RATE_LIMITER.acquire()
+        response = get_session().get(url, params=params)
+        self.stats.record(wire_size(response), len(response.content),
+                          response.headers.get('Content-Encoding'))
+        if fast_json() is not None:
+            # The API always sends UTF-8 JSON, so skip requests' encoding
+            # detection and decode the bytes straight away
+            response.json = lambda **kwargs: decode_json(response.content)
+        return response
+
+
+class cassette_response():
+    """
+    Stand-in for a requests response, rebuilt from a cassette. Supports the
+    parts of the response the connectors use.
+    """
+    def __init__(self, url=None, status_code=None, headers=None,
+                 content=b''):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers or dict()
+        self.content = content
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8')
+
+    def json(self):
+        return decode_json(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            from requests import HTTPError
+            raise HTTPError('{} Error for url: {}'.format(
+                self.status_code, self.url), response=self)
+
+
+def cassette_key(url, params=None):
+    """
+    Builds the key a request is recorded under: the url plus its query
+    string and params, sorted, minus the api key so recordings can be shared
+    and committed.
+    """
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query) + list((params or dict()).items())
+    query = sorted((key, str(value)) for key, value in query
+                   if key != 'api_key')
+    base = '{}://{}{}'.format(parts.scheme, parts.netloc.lower(),
+                              parts.path.rstrip('/'))
+    return '{}?{}'.format(base, urlencode(query)) if query else base
+
+
+class cassette_transport():
+    """
+    Base class for the record and replay transports. Each request is stored
+    as its own gzipped JSON file in cassette_dir, named after a hash of its
+    cassette_key.
+    """
+    def __init__(self, cassette_dir=CASSETTE_DIR):
+        self.cassette_dir = cassette_dir
+
+    def path_for(self, url, params=None):
+        key = cassette_key(url, params)
+        name = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.cassette_dir, name + '.json.gz'), key
+
+
+class recording_transport(cassette_transport):
+    """
+    Passes every request through to another transport (live HTTP by
+    default) and saves the response to a cassette on the way back.
+    """
+    def __init__(self, cassette_dir=CASSETTE_DIR, inner=None):
+        super().__init__(cassette_dir)
+        self.inner = inner or http_transport()
+
+    def get(self, url, params=None):
+        response = self.inner.get(url, params=params)
+        path, key = self.path_for(url, params)
+        os.makedirs(self.cassette_dir, exist_ok=True)
+        recording = {'key': key,
+                     'status_code': response.status_code,
+                     'headers': {'Content-Type':
+                                 response.headers.get('Content-Type')},
+                     'body': base64.b64encode(response.content).decode()}
+        with gzip.open(path, 'wt', encoding='utf-8') as cassette:
+            json.dump(recording, cassette)
+        return response
+
+
+class replay_transport(cassette_transport):
+    """
+    Serves responses from cassettes without touching the network. Raises
+    LookupError for any request that hasn't been recorded.
+    """
+    def get(self, url, params=None):
+        path, key = self.path_for(url, params)
+        if not os.path.exists(path):
+            raise LookupError('No recording for {}'.format(key))
+        with gzip.open(path, 'rt', encoding='utf-8') as cassette:
+            recording = json.load(cassette)
+        return cassette_response(url=recording['key'],
+                                 status_code=recording['status_code'],
+                                 headers=recording['headers'],
+                                 content=base64.b64decode(recording['body']))
+
+
+def endpoint_key(url):
+    """
+    Groups urls that hit the same endpoint by swapping numbers in the path
+    for '*', e.g. bill/116/hr/1/actions and bill/117/hr/5/actions both
+    become bill/*/hr/*/actions.
+    """
+    return '/'.join('*' if part.isdigit() else part
+                    for part in canonical_url(url).split('/'))
+
+
+class endpoint_profile():
+    """
+    What's been seen from one endpoint: a decayed least-squares fit of
+    latency = overhead + per_item * items, and the average bytes per item.
+    """
+    def __init__(self, decay=0.9):
+        self.decay = decay
+        self.weight = 0.0
+        self.sum_x = 0.0
+        self.sum_y = 0.0
+        self.sum_xx = 0.0
+        self.sum_xy = 0.0
+        self.items = 0.0
+        self.bytes = 0.0
+
+    def add(self, items, seconds, nbytes):
+        self.weight = self.weight * self.decay + 1
+        self.sum_x = self.sum_x * self.decay + items
+        self.sum_y = self.sum_y * self.decay + seconds
+        self.sum_xx = self.sum_xx * self.decay + items * items
+        self.sum_xy = self.sum_xy * self.decay + items * seconds
+        self.items = self.items * self.decay + items
+        self.bytes = self.bytes * self.decay + nbytes
+
+    @property
+    def bytes_per_item(self):
+        return self.bytes / self.items if self.items else None
+
+    def fit(self):
+        """
+        Returns (overhead, per_item) in seconds. Until there have been pages
+        of different sizes all of the latency is put down to overhead.
+        """
+        mean_x = self.sum_x / self.weight
+        mean_y = self.sum_y / self.weight
+        variance = self.sum_xx / self.weight - mean_x * mean_x
+        if variance <= 1e-9:
+            return mean_y, 0.0
+        per_item = max(0.0, (self.sum_xy / self.weight - mean_x * mean_y)
+                       / variance)
+        return max(0.0, mean_y - per_item * mean_x), per_item
+
+
+class page_size_tuner():
+    """
+    Picks a page size for each endpoint from the number of items the list
+    has, how long pages from that endpoint have taken and how big they were.
+
+    Every request has a fixed overhead, so fewer, bigger pages mean less
+    total time, up to the point where a single page gets too slow
+    (target_latency seconds) or too big to hold comfortably
+    (max_page_bytes). Within those limits the tuner takes the largest page
+    it can and then evens the pages out so the last one isn't a straggler.
+    """
+    def __init__(self, max_page_bytes=ADAPTIVE_MAX_PAGE_BYTES,
+                 target_latency=ADAPTIVE_TARGET_LATENCY):
+        self.max_page_bytes = max_page_bytes
+        self.target_latency = target_latency
+        self._profiles = dict()
+        self._lock = Lock()
+
+    def observe(self, url, items, seconds, nbytes):
+        """
+        Records how a page from url went.
+        """
+        if not items:
+            return
+        key = endpoint_key(url)
+        with self._lock:
+            if key not in self._profiles:
+                self._profiles[key] = endpoint_profile()
+            self._profiles[key].add(items, seconds, nbytes)
+
+    def page_size(self, url, count, max_size=CDG_MAX_PAGE_SIZE, min_size=1):
+        """
+        Returns the page size to use for a list of count items at url.
+        """
+        if not count:
+            return min_size
+        size = min(count, max_size)
+        profile = self._profiles.get(endpoint_key(url))
+        if profile is not None:
+            with self._lock:
+                overhead, per_item = profile.fit()
+                bytes_per_item = profile.bytes_per_item
+            if bytes_per_item:
+                size = min(size, int(self.max_page_bytes // bytes_per_item))
+            if per_item and self.target_latency > overhead:
+                size = min(size, int((self.target_latency - overhead)
+                                     // per_item))
+        size = max(min_size, size)
+        pages = -(-count // size)
+        return max(min_size, min(max_size, -(-count // pages)))
+
+
+PAGE_TUNER = page_size_tuner()
+
+
+TRANSPORTS = {'live': http_transport,
+              'record': recording_transport,
+              'replay': replay_transport}
+_transport = None
+
+
+def get_transport():
+    """
+    Returns the transport every connector sends its requests through. The
+    first call picks one based on settings.TRANSPORT ('live', 'record' or
+    'replay'), which can be set with the CDG_TRANSPORT environment variable.
+    """
+    global _transport
+    if _transport is None:
+        if TRANSPORT not in TRANSPORTS:
+            raise ValueError('{} is not a valid transport, use one of {}'
+                             .format(TRANSPORT, sorted(TRANSPORTS)))
+        _transport = TRANSPORTS[TRANSPORT]()
+    return _transport
+
+
+def set_transport(transport):
+    """
+    Swaps the transport for the whole process. Pass None to go back to the
+    one chosen by settings.
+    """
+    global _transport
+    _transport = transport
+
+
+def canonical_url(url):
+    """
+    Reduces an API url to a key that's the same no matter how the url was
+    written, e.g. http://api.data.gov/congress/v2/bill/116/hr/1/ and
+    https://api.data.gov/congress/v2/bill/116/HR/1?format=json both become
+    bill/116/hr/1.
+    """
+    path = urlsplit(url).path.lower().strip('/')
+    version = re.search(r'(^|/)v[0-9]+/', path)
+    if version:
+        path = path[version.end():]
+    return path
+
+
+class identity_map():
+    """
+    Process-wide LRU map from a resource's canonical url to the object that
+    was built for it. Asking for the same bill, committee or member twice
+    hands back the object (and whatever it has already downloaded) from the
+    first time instead of building and fetching a new one.
+
+    Holds at most maxsize objects; the least recently used one is dropped when
+    it fills up. Use resize() to change the limit at runtime.
+    """
+    def __init__(self, maxsize=IDENTITY_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._objects = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._objects)
+
+    def __contains__(self, key):
+        return key in self._objects
+
+    def get(self, key):
+        with self._lock:
+            obj = self._objects.get(key)
+            if obj is not None:
+                self._objects.move_to_end(key)
+            return obj
+
+    def add(self, key, obj):
+        """
+        Stores obj under key unless something is already there, and returns
+        whichever object ends up in the map.
+        """
+        with self._lock:
+            if key in self._objects:
+                self._objects.move_to_end(key)
+                return self._objects[key]
+            self._objects[key] = obj
+            self._evict()
+            return obj
+
+    def discard(self, key):
+        with self._lock:
+            self._objects.pop(key, None)
+
+    def resize(self, maxsize):
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._objects.clear()
+
+    def _evict(self):
+        while len(self._objects) > self.maxsize:
+            self._objects.popitem(last=False)
+
+
+IDENTITY_MAP = identity_map()
 
 
 class baseAPI:
@@ -26,6 +535,9 @@ class baseAPI:
     in the corresponding class.
 
     Functions
+         - cached - builds the object, or returns the one already in the
+           identity map for the same resource.
+
          - call - makes an API call using the object's params dictionary.
            Returns requests response object.
 
@@ -38,7 +550,7 @@ class baseAPI:
     """
     def __init__(self, logger=None):
         self.logger = logger or logging.getLogger(__name__)
-        self._api_key = API_KEY
+        self._api_key = None
         self._offset = 0
         self._params = dict()
         self._data = None
@@ -49,6 +561,8 @@ class baseAPI:
         self._min_congress = 0
         self._max_congress = CURRENT_CONGRESS
         self.status_code = None
+        self.last_call_seconds = None
+        self.last_call_bytes = None
 
     @property
     def congress(self):
@@ -66,6 +580,16 @@ class baseAPI:
                               'type, select a value between %s and %s' % (
                                self._min_congress, self._max_congress)))
 
+    @classmethod
+    def cached(cls, *args, **kwargs):
+        """
+        Same arguments as the constructor, but returns the object already in
+        the identity map for this resource if there is one. Building the
+        object doesn't make any calls, so a miss costs nothing extra.
+        """
+        obj = cls(*args, **kwargs)
+        return IDENTITY_MAP.add(canonical_url(obj.url), obj)
+
     def create_url_from_parts(self):
         """
         Creates an API url from the parts provided, assuming they exist.
@@ -113,7 +637,10 @@ class baseAPI:
         Raises errors if a non-200 status is
         """
         self.logger.debug('Making call with %s' % url)
-        data = req.get(url, params=self.params)
+        start = time.perf_counter()
+        data = get_transport().get(url, params=self.params)
+        self.last_call_seconds = time.perf_counter() - start
+        self.last_call_bytes = len(data.content)
         self.status_code = data.status_code
         self.logger.debug('Call made, returning response')
         if data.status_code != 200:
@@ -133,10 +660,18 @@ class baseAPI:
     @property
     def api_key(self):
         """
-        Getter method for the private api_key variable
+        Getter method for the private api_key variable. Unless a key was set
+        on the object, it's looked up with settings.get_api_key() the first
+        time it's needed.
         """
+        if self._api_key is None:
+            self._api_key = get_api_key()
         return self._api_key
 
+    @api_key.setter
+    def api_key(self, new_key):
+        self._api_key = new_key
+
     @property
     def params(self):
         """
@@ -144,7 +679,7 @@ class baseAPI:
         the current state of the object, so you have to be careful from one
         call to another.
         """
-        params_dict = self._params
+        params_dict = dict(self._params)
         if self.api_key:
             params_dict['api_key'] = self.api_key
         if self.offset:
@@ -184,7 +719,7 @@ class govInfoAPI(baseAPI):
         self._page_size = 20
         self._fromDateTime = None
         self._toDateTime = None
-        self._params = {'api_key': self._api_key}
+        self._params = dict()
         self._congress = None
         self._max_congress = CURRENT_CONGRESS
         self._url = url
@@ -199,16 +734,24 @@ class govInfoAPI(baseAPI):
         """
         Setter method, makes sure the limit is a valid integer greater than 0
         """
-        if type(new_limit) == int and new_limit > 0 and new_limit < 1000:
+        if type(new_limit) == int and new_limit > 0 and new_limit <= 1000:
             self._page_size = new_limit
         else:
-            raise ValueError('{} is invalid, provide an integer between 0'
+            raise ValueError('{} is invalid, provide an integer between 1'
                              ' and 1000'.format(new_limit))
 
     @page_size.deleter
     def page_size(self):
         self._page_size = 20
 
+    def tune_page_size(self, url, count):
+        """
+        Sets page_size from PAGE_TUNER for a list of count items at url.
+        """
+        self.page_size = PAGE_TUNER.page_size(
+            url, count, max_size=GOVINFO_MAX_PAGE_SIZE)
+        return self.page_size
+
     # lastModifiedStartDate
     @property
     def lastModifiedStartDate(self):
@@ -249,6 +792,18 @@ class govInfoAPI(baseAPI):
     def lastModifiedEndDate(self, time_string):
         self._toDateTime = None
 
+    # Params
+    @property
+    def params(self):
+        """
+        Getter method for the params, which adds pageSize to the ones every
+        API shares.
+        """
+        params_dict = super().params
+        if self.page_size:
+            params_dict['pageSize'] = self.page_size
+        return params_dict
+
     def paginate(self, url):
         """
         Generator that makes the initial call to a URL then paginates through
@@ -296,11 +851,14 @@ class cdgAPI(baseAPI):
 
     def __init__(self, url=None):
         super().__init__()
-        self._base_url = 'http://api.data.gov/congress/v2/'
+        self._base_url = CDG_BASE_URL
         self._limit = 20
+        self._max_limit = CDG_MAX_PAGE_SIZE
+        self.adaptive = ADAPTIVE_PAGE_SIZE
+        self._format = 'json'
         self._fromDateTime = None
         self._toDateTime = None
-        self._params = {'api_key': self._api_key}
+        self._params = dict()
         self._congress = None
         self._max_congress = CURRENT_CONGRESS
         self._min_congress = MIN_CONGRESS
@@ -316,16 +874,42 @@ class cdgAPI(baseAPI):
         """
         Setter method, makes sure the limit is a valid integer greater than 0
         """
-        if type(new_limit) == int and new_limit > 0 and new_limit < 1000:
+        if type(new_limit) == int and new_limit > 0 and new_limit <= 1000:
             self._limit = new_limit
         else:
-            raise ValueError('{} is invalid, provide an integer between 0'
+            raise ValueError('{} is invalid, provide an integer between 1'
                              ' and 1000'.format(new_limit))
 
     @limit.deleter
     def limit(self):
         self._limit = 0
 
+    def tune_limit(self, url, count):
+        """
+        Sets limit from PAGE_TUNER for a list of count items at url. Used by
+        lists when adaptive is switched on.
+        """
+        self.limit = PAGE_TUNER.page_size(url, count,
+                                          max_size=self._max_limit)
+        return self.limit
+
+    # format
+    @property
+    def format(self):
+        return self._format
+
+    @format.setter
+    def format(self, new_format):
+        """
+        The API can answer in json or xml. json is both what the connectors
+        parse and the smaller of the two on the wire.
+        """
+        if new_format in ('json', 'xml'):
+            self._format = new_format
+        else:
+            raise ValueError('{} is invalid, use json or xml'.format(
+                new_format))
+
     # fromDateTime
     @property
     def fromDateTime(self):
@@ -372,9 +956,13 @@ class cdgAPI(baseAPI):
         the current state of the object, so you have to be careful from one
         call to another.
         """
-        params_dict = self._params
+        params_dict = dict(self._params)
+        if self.api_key:
+            params_dict['api_key'] = self.api_key
         if self.limit:
             params_dict['limit'] = self.limit
+        if self.format:
+            params_dict['format'] = self.format
         if self.offset:
             params_dict['offset'] = self.offset
         if self.fromDateTime:
@@ -0,0 +1,5 @@
+"""
+Modules in this package work on legislation data once it has been pulled from
+the API or loaded into the database. Nothing in here should be making calls
+that the connectors in models.cdg could be making for it.
+"""
@@ -0,0 +1,169 @@
+"""
+Vectorized aggregates over loaded legislation data.
+
+load_frames() reads the Bill, Sponsorship, Member, Actions, BillStatus and
+BillCommittee tables for a congress into pandas DataFrames in one query per
+table, with the repeated string columns (bill type, party, state, member,
+action code, stage) stored as categoricals. The functions below then work on
+whole columns at once instead of looping over ORM objects:
+
+    frames = load_frames(db_session, congress=117)
+    bills_per_sponsor(frames).head()
+    days_to_passage(frames, 'house').describe()
+"""
+import pandas as pd
+from database import db_session
+from models.db.models import (Actions, Bill, BillCommittee, BillStatus,
+                              Member, Sponsorship)
+
+CATEGORICAL = {
+    'bills': ('bill_type',),
+    'sponsorships': ('bioguide_id',),
+    'members': ('party', 'state', 'chamber'),
+    'actions': ('action_code', 'action_type', 'source_system_name'),
+    'status': ('stage',),
+    'committees': ('activity_name',),
+}
+DATES = {
+    'bills': ('introduced_date',),
+    'sponsorships': ('sponsorship_date', 'sponsorship_withdrawn_date'),
+    'actions': ('action_date',),
+    'status': ('introduced_date', 'reported_date', 'passed_house_date',
+               'passed_senate_date', 'enrolled_date', 'vetoed_date',
+               'became_law_date', 'latest_action_date'),
+    'committees': ('activity_date',),
+}
+MILESTONES = {'house': 'passed_house_date',
+              'senate': 'passed_senate_date',
+              'law': 'became_law_date'}
+
+
+def _read(session, query):
+    return pd.read_sql(query.statement, session.connection())
+
+
+def encode(frames):
+    """
+    Converts the known date columns to datetimes and the repeated string
+    columns to categoricals, in place. Returns frames.
+    """
+    for name, frame in frames.items():
+        for column in DATES.get(name, ()):
+            if column in frame:
+                frame[column] = pd.to_datetime(frame[column])
+        for column in CATEGORICAL.get(name, ()):
+            if column in frame:
+                frame[column] = frame[column].astype('category')
+    return frames
+
+
+def load_frames(session=None, congress=None):
+    """
+    Returns a dict of DataFrames (bills, sponsorships, members, actions,
+    status, committees), limited to one congress if one is given. members
+    only has the members who sponsored or cosponsored one of the bills.
+    """
+    session = session or db_session
+    bills = session.query(Bill)
+    if congress is not None:
+        bills = bills.filter(Bill.congress == congress)
+    bill_ids = bills.with_entities(Bill.bill_id).scalar_subquery()
+    frames = {
+        'bills': _read(session, bills),
+        'sponsorships': _read(session, session.query(Sponsorship).filter(
+            Sponsorship.bill_id.in_(bill_ids))),
+        'members': _read(session, session.query(Member).filter(
+            Member.bioguide_id.in_(
+                session.query(Sponsorship.bioguide_id)
+                .filter(Sponsorship.bill_id.in_(bill_ids))
+                .scalar_subquery()))),
+        'actions': _read(session, session.query(Actions).filter(
+            Actions.bill_id.in_(bill_ids))),
+        'status': _read(session, session.query(BillStatus).filter(
+            BillStatus.bill_id.in_(bill_ids))),
+        'committees': _read(session, session.query(BillCommittee).filter(
+            BillCommittee.bill_id.in_(bill_ids))),
+    }
+    return encode(frames)
+
+
+def bills_per_sponsor(frames):
+    """
+    Number of bills each member sponsored, most first.
+    """
+    sponsorships = frames['sponsorships']
+    sponsors = sponsorships[sponsorships['is_sponsor'].astype(bool)]
+    return (sponsors.groupby('bioguide_id', observed=True)['bill_id']
+            .nunique().sort_values(ascending=False))
+
+
+def bills_per_party(frames):
+    """
+    Number of bills sponsored by members of each party.
+    """
+    sponsorships = frames['sponsorships']
+    sponsors = sponsorships[sponsorships['is_sponsor'].astype(bool)]
+    merged = sponsors[['bill_id', 'bioguide_id']].astype(
+        {'bioguide_id': object}).merge(
+        frames['members'][['bioguide_id', 'party']], on='bioguide_id')
+    return (merged.groupby('party', observed=True)['bill_id'].nunique()
+            .sort_values(ascending=False))
+
+
+def cosponsors_per_bill(frames):
+    """
+    Number of current (not withdrawn) cosponsors on each bill, indexed by
+    bill_id. Bills with none are included as 0.
+    """
+    sponsorships = frames['sponsorships']
+    current = sponsorships[~sponsorships['is_sponsor'].astype(bool)
+                           & sponsorships['sponsorship_withdrawn_date']
+                           .isna()]
+    counts = current.groupby('bill_id')['bioguide_id'].count()
+    return counts.reindex(frames['bills']['bill_id'], fill_value=0)
+
+
+def days_to_passage(frames, milestone='house'):
+    """
+    Days from introduction to a milestone ('house', 'senate' or 'law') for
+    every bill that reached it, indexed by bill_id.
+    """
+    if milestone not in MILESTONES:
+        raise ValueError('{} is not a valid milestone, use one of {}'.format(
+            milestone, list(MILESTONES)))
+    status = frames['status'].set_index('bill_id')
+    reached = status[status[MILESTONES[milestone]].notna()]
+    return (reached[MILESTONES[milestone]]
+            - reached['introduced_date']).dt.days
+
+
+def stage_counts(frames):
+    """
+    Number of bills at each stage, broken down by bill type.
+    """
+    merged = frames['status'][['bill_id', 'stage']].merge(
+        frames['bills'][['bill_id', 'bill_type']], on='bill_id')
+    return pd.crosstab(merged['bill_type'], merged['stage'])
+
+
+def actions_per_month(frames, action_type=None):
+    """
+    Number of actions per calendar month, optionally of one action_type.
+    """
+    actions = frames['actions']
+    if action_type is not None:
+        actions = actions[actions['action_type'] == action_type]
+    return (actions.set_index('action_date')['action_id']
+            .resample('MS').count())
+
+
+def committee_throughput(frames):
+    """
+    For each committee, the number of distinct bills with each kind of
+    activity (referred, reported, discharged, ...), as a committee x activity
+    table.
+    """
+    committees = frames['committees']
+    return (committees.groupby(['committee_id', 'activity_name'],
+                               observed=True)['bill_id']
+            .nunique().unstack(fill_value=0))
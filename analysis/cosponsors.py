@@ -0,0 +1,250 @@
+"""
+Co-sponsorship network built from Sponsorship rows.
+
+Every cosponsor of a bill gets a directed edge to the bill's sponsor, weighted
+by the number of bills they've cosponsored together. Members are mapped to
+integer ids and the edges are kept in compressed sparse row (CSR) arrays, one
+set for outgoing edges and one for incoming, so neighbor, degree and
+centrality queries over a whole congress are plain NumPy operations.
+
+Bills can be added at any time. New edges go into a small buffer that is
+merged into the arrays the next time the graph is queried, and re-adding a
+bill replaces its old edges, so the graph can follow the database as new
+bills sync:
+
+    graph = cosponsor_graph(congress=117)
+    graph.update_from_db()
+    graph.neighbors('S000033')
+"""
+import logging
+import numpy as np
+from collections import defaultdict
+from database import db_session
+from models.db.models import Bill, Sponsorship
+
+logger = logging.getLogger(__name__)
+
+DIRECTIONS = ('out', 'in', 'both')
+
+
+class cosponsor_graph():
+    """
+    Member-to-member co-sponsorship graph. Edges point from a cosponsor to the
+    sponsor they signed on with.
+
+    Functions
+        add_bill - adds (or replaces) one bill's sponsor and cosponsors.
+
+        remove_bill - takes one bill's edges out.
+
+        add_sponsorships - adds bills from an iterable of Sponsorship rows.
+
+        update_from_db - pulls Sponsorship rows added since the last update.
+
+        neighbors, degree, degrees, pagerank - queries over the graph.
+    """
+    def __init__(self, congress=None):
+        self.congress = congress
+        self.members = list()
+        self._index = dict()
+        self._bills = dict()
+        self._pending = list()
+        self._last_sponsorship_id = 0
+        empty = np.zeros(0, dtype=np.int64)
+        self._out = (np.zeros(1, dtype=np.int64), empty, empty)
+        self._in = (np.zeros(1, dtype=np.int64), empty, empty)
+
+    def __len__(self):
+        return len(self.members)
+
+    def member_id(self, bioguide_id, create=False):
+        """
+        Returns the integer id for a member. Raises KeyError for members the
+        graph hasn't seen unless create is True.
+        """
+        if bioguide_id not in self._index:
+            if not create:
+                raise KeyError(bioguide_id)
+            self._index[bioguide_id] = len(self.members)
+            self.members.append(bioguide_id)
+        return self._index[bioguide_id]
+
+    def add_bill(self, bill_key, sponsor_id, cosponsor_ids):
+        """
+        Adds a bill's edges. If the bill is already in the graph its old edges
+        are taken out first, so calling this again after a bill gains or
+        loses cosponsors leaves the right weights behind.
+        """
+        self.remove_bill(bill_key)
+        sponsor = self.member_id(sponsor_id, create=True)
+        cosponsors = tuple(self.member_id(item, create=True)
+                           for item in set(cosponsor_ids)
+                           if item != sponsor_id)
+        self._bills[bill_key] = (sponsor, cosponsors)
+        for cosponsor in cosponsors:
+            self._pending.append((cosponsor, sponsor, 1))
+
+    def remove_bill(self, bill_key):
+        """
+        Takes a bill's edges out of the graph. Does nothing for bills the
+        graph doesn't have.
+        """
+        if bill_key not in self._bills:
+            return
+        old_sponsor, old_cosponsors = self._bills.pop(bill_key)
+        for cosponsor in old_cosponsors:
+            self._pending.append((cosponsor, old_sponsor, -1))
+
+    def add_sponsorships(self, rows):
+        """
+        Adds bills from Sponsorship rows (or anything with the same
+        attributes). Rows are grouped by bill_id, so pass every current row
+        for a bill, not just the new ones. Withdrawn cosponsors are skipped,
+        and a bill whose rows have all been withdrawn loses its edges.
+        """
+        grouped = defaultdict(lambda: [None, list()])
+        for row in rows:
+            self._last_sponsorship_id = max(self._last_sponsorship_id,
+                                            row.sponsorship_id or 0)
+            entry = grouped[row.bill_id]
+            if row.sponsorship_withdrawn_date is not None:
+                continue
+            if row.is_sponsor:
+                entry[0] = row.bioguide_id
+            else:
+                entry[1].append(row.bioguide_id)
+        for bill_id, (sponsor_id, cosponsor_ids) in grouped.items():
+            self.remove_bill(bill_id)
+            if sponsor_id is None:
+                if not cosponsor_ids:
+                    continue
+                logger.warning('No sponsor found for bill_id {}, skipping'
+                               .format(bill_id))
+                continue
+            self.add_bill(bill_id, sponsor_id, cosponsor_ids)
+        return len(grouped)
+
+    def update_from_db(self, session=None):
+        """
+        Adds every bill that has gained Sponsorship rows since the last
+        update. Each of those bills is re-read in full so its edges are
+        replaced rather than added to, and bills that no longer have any
+        Sponsorship rows are taken out.
+        """
+        session = session or db_session
+        query = (session.query(Sponsorship.bill_id)
+                 .filter(Sponsorship.bill_id.isnot(None)))
+        if self.congress is not None:
+            query = (query.join(Bill, Bill.bill_id == Sponsorship.bill_id)
+                     .filter(Bill.congress == self.congress))
+        removed = 0
+        if self._bills:
+            remaining = {row.bill_id for row in query.distinct()}
+            for bill_id in set(self._bills) - remaining:
+                self.remove_bill(bill_id)
+                removed += 1
+        changed = query.filter(Sponsorship.sponsorship_id >
+                               self._last_sponsorship_id)
+        bill_ids = [row.bill_id for row in changed.distinct()]
+        if not bill_ids:
+            return removed
+        logger.debug('Updating graph with {} bills'.format(len(bill_ids)))
+        rows = (session.query(Sponsorship)
+                .filter(Sponsorship.bill_id.in_(bill_ids)))
+        return removed + self.add_sponsorships(rows)
+
+    def _compact(self):
+        """
+        Merges pending edges into the CSR arrays.
+        """
+        size = len(self.members)
+        if not self._pending and len(self._out[0]) == size + 1:
+            return
+        pending = np.array(self._pending, dtype=np.int64).reshape(-1, 3)
+        self._pending = list()
+        indptr, indices, weights = self._out
+        sources = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+        sources = np.concatenate([sources, pending[:, 0]])
+        targets = np.concatenate([indices, pending[:, 1]])
+        values = np.concatenate([weights, pending[:, 2]])
+        keys, inverse = np.unique(sources * size + targets,
+                                  return_inverse=True)
+        summed = np.bincount(inverse, weights=values).astype(np.int64)
+        keep = summed > 0
+        sources, targets = np.divmod(keys[keep], size)
+        self._out = self._to_csr(sources, targets, summed[keep], size)
+        self._in = self._to_csr(targets, sources, summed[keep], size)
+
+    @staticmethod
+    def _to_csr(rows, cols, values, size):
+        order = np.lexsort((cols, rows))
+        indptr = np.zeros(size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=size), out=indptr[1:])
+        return indptr, cols[order], values[order]
+
+    def _csr(self, direction):
+        if direction not in DIRECTIONS:
+            raise ValueError('{} is not a valid direction, use one of {}'
+                             .format(direction, DIRECTIONS))
+        self._compact()
+        return self._out if direction == 'out' else self._in
+
+    def neighbors(self, bioguide_id, direction='out'):
+        """
+        Returns a list of (bioguide_id, weight) tuples, heaviest first.
+        'out' gives the sponsors a member has cosponsored with, 'in' gives the
+        members who have cosponsored their bills and 'both' adds the two.
+        """
+        node = self.member_id(bioguide_id)
+        directions = ('out', 'in') if direction == 'both' else (direction,)
+        totals = defaultdict(int)
+        for item in directions:
+            indptr, indices, weights = self._csr(item)
+            start, end = indptr[node], indptr[node + 1]
+            for other, weight in zip(indices[start:end], weights[start:end]):
+                totals[self.members[other]] += int(weight)
+        return sorted(totals.items(), key=lambda item: (-item[1], item[0]))
+
+    def degrees(self, direction='out', weighted=False):
+        """
+        Returns an array of every member's degree, indexed by member id.
+        """
+        if direction == 'both':
+            return (self.degrees('out', weighted)
+                    + self.degrees('in', weighted))
+        indptr, indices, weights = self._csr(direction)
+        if not weighted:
+            return np.diff(indptr)
+        rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+        return np.bincount(rows, weights=weights,
+                           minlength=len(indptr) - 1).astype(np.int64)
+
+    def degree(self, bioguide_id, direction='out', weighted=False):
+        return int(self.degrees(direction, weighted)[
+            self.member_id(bioguide_id)])
+
+    def pagerank(self, damping=0.85, tolerance=1e-8, max_iter=100):
+        """
+        Weighted PageRank over the cosponsor -> sponsor edges, so members
+        whose bills attract cosponsors from other well-supported members rank
+        highest. Returns a dict of bioguide_id to score.
+        """
+        size = len(self.members)
+        if size == 0:
+            return dict()
+        indptr, indices, weights = self._csr('out')
+        sources = np.repeat(np.arange(size), np.diff(indptr))
+        out_weight = np.bincount(sources, weights=weights, minlength=size)
+        dangling = out_weight == 0
+        share = weights / out_weight[sources]
+        scores = np.full(size, 1.0 / size)
+        for i in range(max_iter):
+            flow = np.bincount(indices, weights=scores[sources] * share,
+                               minlength=size)
+            updated = ((1 - damping) / size
+                       + damping * (flow + scores[dangling].sum() / size))
+            converged = np.abs(updated - scores).sum() < tolerance
+            scores = updated
+            if converged:
+                break
+        return dict(zip(self.members, scores.tolist()))
@@ -0,0 +1,184 @@
+"""
+Related-bill graph with its connected components kept up to date.
+
+Edges come from the Related table and are stored per relationship type
+('Identical bill', 'Related bill', 'Procedurally-related', ...). Alongside
+the edges the graph keeps a union-find over every type together and one over
+each type on its own, each with the member list of every cluster. Asking for
+all the bills related to a bill, directly or through other bills, is then a
+find and a dict lookup rather than a walk over relatedBills:
+
+    graph = related_graph.from_db(db_session, congress=117)
+    graph.cluster_of(graph.bill_id(117, 'hr', '1'))
+    graph.cluster_of(bill_id, 'Identical bill')
+"""
+from collections import defaultdict
+from database import db_session
+from models.db.models import Bill, Related
+
+ALL = None
+
+
+class union_find():
+    """
+    Disjoint sets over hashable items, with path halving and union by size.
+    Each root keeps the list of its set's members, so returning a whole set
+    costs nothing once find() has run.
+    """
+    def __init__(self):
+        self._parent = dict()
+        self._members = dict()
+
+    def __contains__(self, item):
+        return item in self._parent
+
+    def add(self, item):
+        if item not in self._parent:
+            self._parent[item] = item
+            self._members[item] = [item]
+
+    def find(self, item):
+        parent = self._parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, first, second):
+        self.add(first)
+        self.add(second)
+        first, second = self.find(first), self.find(second)
+        if first == second:
+            return first
+        if len(self._members[first]) < len(self._members[second]):
+            first, second = second, first
+        self._parent[second] = first
+        self._members[first].extend(self._members.pop(second))
+        return first
+
+    def members(self, item):
+        return self._members[self.find(item)]
+
+    def sets(self):
+        return list(self._members.values())
+
+
+class related_graph():
+    """
+    Undirected graph of related bills, keyed on bill_id.
+
+    Functions
+        add_edge, add_rows, from_db - build the graph.
+
+        neighbors - bills directly related to a bill.
+
+        cluster_of, clusters - connected components, over every relationship
+        type or just one.
+
+        bill_id, label - translate between bill_id and (congress, type,
+        number) for graphs built with from_db.
+    """
+    def __init__(self):
+        self.edges = defaultdict(lambda: defaultdict(set))
+        self._clusters = defaultdict(union_find)
+        self._ids = dict()
+        self._labels = dict()
+
+    def __len__(self):
+        return len(self._clusters[ALL]._parent)
+
+    def __contains__(self, bill_id):
+        return bill_id in self._clusters[ALL]
+
+    @property
+    def relationship_types(self):
+        return sorted(self.edges)
+
+    def add_bill(self, bill_id, congress=None, bill_type=None, number=None):
+        self._clusters[ALL].add(bill_id)
+        if congress is not None:
+            key = (congress, bill_type, str(number))
+            self._ids[key] = bill_id
+            self._labels[bill_id] = key
+
+    def add_edge(self, first, second, relationship_type):
+        if first == second:
+            return
+        self.edges[relationship_type][first].add(second)
+        self.edges[relationship_type][second].add(first)
+        self._clusters[ALL].union(first, second)
+        self._clusters[relationship_type].union(first, second)
+
+    def add_rows(self, rows):
+        """
+        Adds edges from Related rows (or anything with bill_id_1, bill_id_2
+        and relationship_type).
+        """
+        count = 0
+        for row in rows:
+            self.add_edge(row.bill_id_1, row.bill_id_2, row.relationship_type)
+            count += 1
+        return count
+
+    @classmethod
+    def from_db(cls, session=None, congress=None):
+        """
+        Builds the graph from the Related table, with every bill in it (or
+        in one congress) as a node so lookups by bill key work for bills
+        with no related bills too.
+        """
+        session = session or db_session
+        graph = cls()
+        bills = session.query(Bill.bill_id, Bill.congress, Bill.bill_type,
+                              Bill.bill_number)
+        related = session.query(Related.bill_id_1, Related.bill_id_2,
+                                Related.relationship_type)
+        if congress is not None:
+            bills = bills.filter(Bill.congress == congress)
+            related = (related.join(Bill, Bill.bill_id == Related.bill_id_1)
+                       .filter(Bill.congress == congress))
+        for row in bills:
+            graph.add_bill(row.bill_id, row.congress, row.bill_type,
+                           row.bill_number)
+        graph.add_rows(related)
+        return graph
+
+    def bill_id(self, congress, bill_type, number):
+        return self._ids[congress, bill_type.lower(), str(number)]
+
+    def label(self, bill_id):
+        return self._labels.get(bill_id)
+
+    def neighbors(self, bill_id, relationship_type=ALL):
+        """
+        Bills directly related to a bill, by one relationship type or any.
+        """
+        if relationship_type is not ALL:
+            return sorted(self.edges[relationship_type].get(bill_id, ()))
+        found = set()
+        for edges in self.edges.values():
+            found |= edges.get(bill_id, set())
+        return sorted(found)
+
+    def cluster_of(self, bill_id, relationship_type=ALL):
+        """
+        Every bill connected to bill_id (including bill_id itself) through
+        relationships of one type, or of any type by default.
+        """
+        clusters = self._clusters.get(relationship_type)
+        if clusters is None or bill_id not in clusters:
+            if bill_id not in self:
+                raise KeyError(bill_id)
+            return [bill_id]
+        return clusters.members(bill_id)
+
+    def clusters(self, relationship_type=ALL, min_size=2):
+        """
+        Every cluster with at least min_size bills, largest first.
+        """
+        clusters = self._clusters.get(relationship_type)
+        if clusters is None:
+            return list()
+        return sorted((members for members in clusters.sets()
+                       if len(members) >= min_size),
+                      key=len, reverse=True)
@@ -0,0 +1,289 @@
+"""
+Near-duplicate bill detection with MinHash and locality-sensitive hashing.
+
+Each text is cut into overlapping word shingles, and each shingle is hashed
+to 32 bits. A batch of texts is then turned into MinHash signatures with one
+NumPy pass per chunk of shingles: num_perm universal hashes of every shingle,
+reduced to a per-text minimum. Signatures are split into bands and every
+band is bucketed, so only texts that share a bucket are ever compared. That
+keeps a congress-wide search close to linear instead of comparing every pair:
+
+    index = minhash_index.from_db(db_session, congress=117)
+    index.similar_pairs(threshold=0.8)
+
+find_near_duplicates() does the same and writes what it finds to Related
+with identified_by='minhash', so the rest of the tree (related_graph, for
+instance) picks the matches up alongside the API's own related bills.
+"""
+import logging
+import re
+import zlib
+from collections import defaultdict
+import numpy as np
+from sqlalchemy import or_
+from database import db_session
+from models.db.models import Bill, BillText, Related
+
+logger = logging.getLogger(__name__)
+
+IDENTIFIED_BY = 'minhash'
+RELATIONSHIP_TYPE = 'Similar text'
+SHINGLE_SIZE = 5
+NUM_PERM = 128
+BANDS = 16
+# Rows of the shingles x permutations matrix hashed at once
+BATCH_ROWS = 20000
+
+WORD = re.compile(r'\w+')
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+SHINGLE_MULTIPLIER = np.uint64(1000003)
+
+
+def shingle_hashes(text, size=SHINGLE_SIZE):
+    """
+    The distinct 32 bit hashes of a text's size-word shingles, as a uint64
+    array. Case and punctuation are ignored. Texts shorter than size words
+    are one shingle.
+    """
+    words = WORD.findall(text.lower())
+    if not words:
+        return np.zeros(0, dtype=np.uint64)
+    hashed = np.array([zlib.crc32(word.encode('utf-8')) for word in words],
+                      dtype=np.uint64)
+    count = max(len(hashed) - size + 1, 1)
+    shingles = np.zeros(count, dtype=np.uint64)
+    for offset in range(min(size, len(hashed))):
+        shingles = (shingles * SHINGLE_MULTIPLIER
+                    + hashed[offset:offset + count]) & MAX_HASH
+    return np.unique(shingles)
+
+
+def permutations(num_perm=NUM_PERM, seed=1):
+    """
+    The (a, b) coefficients for num_perm hashes of the form
+    (a * x + b) mod p. Both stay under 2 ** 32, so with 32 bit shingles
+    nothing overflows.
+    """
+    generator = np.random.RandomState(seed)
+    a = generator.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+    b = generator.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+    return a, b
+
+
+def signatures(shingle_sets, num_perm=NUM_PERM, seed=1,
+               batch_rows=BATCH_ROWS):
+    """
+    MinHash signatures for a list of shingle arrays, as a
+    len(shingle_sets) x num_perm uint64 array. Texts with no shingles get
+    all MAX_HASH, which matches nothing.
+    """
+    a, b = permutations(num_perm, seed)
+    result = np.full((len(shingle_sets), num_perm), MAX_HASH,
+                     dtype=np.uint64)
+    start = 0
+    while start < len(shingle_sets):
+        # Take texts until the chunk has batch_rows shingles (at least one)
+        end = start
+        rows = 0
+        while end < len(shingle_sets) and (end == start or
+                                           rows + len(shingle_sets[end])
+                                           <= batch_rows):
+            rows += len(shingle_sets[end])
+            end += 1
+        chunk = [item for item in shingle_sets[start:end] if len(item)]
+        owners = [index for index in range(start, end)
+                  if len(shingle_sets[index])]
+        if chunk:
+            values = np.concatenate(chunk)[:, None]
+            hashed = ((values * a + b) % MERSENNE_PRIME) & MAX_HASH
+            offsets = np.cumsum([0] + [len(item) for item in chunk[:-1]])
+            result[owners] = np.minimum.reduceat(hashed, offsets, axis=0)
+        start = end
+    return result
+
+
+class minhash_index():
+    """
+    MinHash signatures for a set of texts with LSH buckets over them. Texts
+    are keyed on whatever you like (bill_id in from_db).
+
+    Functions
+        add_many - adds a batch of texts.
+
+        candidates - pairs of keys that share at least one bucket.
+
+        similarity - estimated Jaccard similarity of two keys.
+
+        similar_pairs - candidates at or above a similarity threshold.
+
+        query - keys of the texts that share a bucket with a new text.
+    """
+    def __init__(self, num_perm=NUM_PERM, bands=BANDS,
+                 shingle_size=SHINGLE_SIZE, seed=1):
+        if num_perm % bands:
+            raise ValueError('num_perm ({}) has to divide evenly into {} '
+                             'bands'.format(num_perm, bands))
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.seed = seed
+        self.keys = list()
+        self._index = dict()
+        self._signatures = list()
+        self._buckets = [defaultdict(list) for i in range(bands)]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def _signatures_for(self, texts):
+        return signatures([shingle_hashes(text, self.shingle_size)
+                           for text in texts],
+                          num_perm=self.num_perm, seed=self.seed)
+
+    def _band_keys(self, signature):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:
+                                  (band + 1) * self.rows].tobytes()
+
+    def add_many(self, keys, texts):
+        """
+        Adds texts under keys (two lists of the same length). A key that's
+        already in the index is skipped.
+        """
+        keys = list(keys)
+        fresh = [i for i, key in enumerate(keys) if key not in self._index]
+        if not fresh:
+            return 0
+        texts = list(texts)
+        block = self._signatures_for([texts[i] for i in fresh])
+        for row, i in enumerate(fresh):
+            position = len(self.keys)
+            self.keys.append(keys[i])
+            self._index[keys[i]] = position
+            self._signatures.append(block[row])
+            if (block[row] == MAX_HASH).all():
+                continue
+            for band, bucket in self._band_keys(block[row]):
+                self._buckets[band][bucket].append(position)
+        return len(fresh)
+
+    def add(self, key, text):
+        return self.add_many([key], [text])
+
+    def signature(self, key):
+        return self._signatures[self._index[key]]
+
+    def similarity(self, first, second):
+        return float(np.mean(self.signature(first) == self.signature(second)))
+
+    def candidates(self):
+        """
+        Set of (key, key) pairs that land in the same bucket in at least one
+        band, each pair in index order.
+        """
+        pairs = set()
+        for buckets in self._buckets:
+            for positions in buckets.values():
+                if len(positions) < 2:
+                    continue
+                for i, first in enumerate(positions):
+                    for second in positions[i + 1:]:
+                        pairs.add((first, second))
+        return {(self.keys[first], self.keys[second])
+                for first, second in pairs}
+
+    def similar_pairs(self, threshold=0.8):
+        """
+        Candidate pairs whose estimated similarity is at least threshold, as
+        (key, key, similarity) tuples, most similar first.
+        """
+        found = list()
+        for first, second in self.candidates():
+            score = self.similarity(first, second)
+            if score >= threshold:
+                found.append((first, second, score))
+        return sorted(found, key=lambda item: -item[2])
+
+    def query(self, text):
+        """
+        Keys of the indexed texts that share a bucket with text.
+        """
+        signature = self._signatures_for([text])[0]
+        found = set()
+        for band, bucket in self._band_keys(signature):
+            found.update(self._buckets[band].get(bucket, ()))
+        return [self.keys[position] for position in sorted(found)]
+
+    @classmethod
+    def from_db(cls, session=None, congress=None, text_format='Formatted Text',
+                **kwargs):
+        """
+        Builds an index over the latest stored text of every bill (in one
+        congress, if given), keyed on bill_id.
+        """
+        session = session or db_session
+        rows = (session.query(BillText.bill_id, BillText.version_date,
+                              BillText.text)
+                .filter(BillText.text_format == text_format))
+        if congress is not None:
+            rows = (rows.join(Bill, Bill.bill_id == BillText.bill_id)
+                    .filter(Bill.congress == congress))
+        latest = dict()
+        for row in rows:
+            current = latest.get(row.bill_id)
+            # Versions without a date are the most recent
+            if (current is None or row.version_date is None
+                    or (current.version_date is not None
+                        and row.version_date > current.version_date)):
+                latest[row.bill_id] = row
+        index = cls(**kwargs)
+        bill_ids = sorted(latest)
+        for start in range(0, len(bill_ids), 1000):
+            batch = bill_ids[start:start + 1000]
+            index.add_many(batch, [latest[item].text or '' for item in batch])
+        return index
+
+
+def write_related(session, pairs, bill_ids=None):
+    """
+    Replaces the minhash Related rows on either side of bill_ids (every bill
+    that was indexed; the bills in pairs by default) with one row per
+    (bill_id, bill_id, similarity) pair, so a bill whose text has drifted
+    away loses its old row. Doesn't commit. Returns the number of rows
+    written.
+    """
+    if bill_ids is None:
+        bill_ids = {item for pair in pairs for item in pair[:2]}
+    bill_ids = sorted(bill_ids)
+    for start in range(0, len(bill_ids), 500):
+        batch = bill_ids[start:start + 500]
+        (session.query(Related)
+         .filter(Related.identified_by == IDENTIFIED_BY,
+                 or_(Related.bill_id_1.in_(batch),
+                     Related.bill_id_2.in_(batch)))
+         .delete(synchronize_session=False))
+    for first, second, score in pairs:
+        first, second = sorted((first, second))
+        session.add(Related(first, second, RELATIONSHIP_TYPE, IDENTIFIED_BY))
+    return len(pairs)
+
+
+def find_near_duplicates(session=None, congress=None, threshold=0.8,
+                         **kwargs):
+    """
+    Indexes the stored bill texts of a congress, writes every pair at or
+    above threshold to Related and commits. Returns the pairs.
+    """
+    session = session or db_session
+    index = minhash_index.from_db(session, congress=congress, **kwargs)
+    pairs = index.similar_pairs(threshold)
+    logger.info('Found {} near-duplicate pairs among {} bills'.format(
+        len(pairs), len(index)))
+    write_related(session, pairs, index.keys)
+    session.commit()
+    return pairs
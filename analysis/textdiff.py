@@ -0,0 +1,226 @@
+"""
+Functions in this module compare the text versions of a bill (introduced,
+reported, enrolled and so on) at either the section or the paragraph level.
+
+Each version is split into pieces and every piece is hashed, so pieces that
+didn't change between two versions are matched on their hash and never
+run through a line-by-line diff. Finished comparisons are kept in a cache
+keyed on the exact bytes of the two texts, so asking for the same comparison
+twice costs nothing.
+
+Typical use:
+
+    from models.cdg.legislation import bill
+    from analysis import textdiff
+
+    changes = textdiff.diff_bill(bill(congress=116, bill_type='hr',
+                                      bill_num=2546))
+    for piece in changes[0].sections:
+        print(piece.status, piece.key)
+"""
+import difflib
+import hashlib
+import logging
+import re
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from threading import Lock
+from settings import TEXT_DIFF_CACHE_SIZE
+from models.cdg import core
+
+logger = logging.getLogger(__name__)
+
+SECTION_HEADING = re.compile(r'^\s*(?:SEC(?:TION)?\.|TITLE\s+[IVXLC]+)',
+                             re.IGNORECASE | re.MULTILINE)
+PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+LEVELS = ('section', 'paragraph')
+
+section = namedtuple('section', ['key', 'text', 'digest'])
+section_diff = namedtuple('section_diff', ['key', 'status', 'old', 'new',
+                                           'diff'])
+version_diff = namedtuple('version_diff', ['old_version', 'new_version',
+                                           'sections'])
+
+
+class diff_cache():
+    """
+    Small thread-safe LRU cache for finished comparisons. Keys are built from
+    content hashes, so a cached result is valid no matter which bill the text
+    came from.
+    """
+    def __init__(self, maxsize=TEXT_DIFF_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return self._items[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._items)
+
+
+_cache = diff_cache()
+
+
+def digest(text):
+    """
+    Returns a stable hash of a piece of text. Whitespace is collapsed first so
+    that re-flowed text doesn't count as a change.
+    """
+    normalized = ' '.join(text.split())
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+
+def _cache_key(old_text, new_text, level):
+    # The cached diff lines come from the raw text, so the key can't ignore
+    # whitespace the way digest does.
+    return (hashlib.sha1(old_text.encode('utf-8')).hexdigest(),
+            hashlib.sha1(new_text.encode('utf-8')).hexdigest(), level)
+
+
+def split_sections(text, level='section'):
+    """
+    Splits a bill's text into a list of sections (or paragraphs) with their
+    hashes. Anything that comes before the first section heading (the
+    preamble, enacting clause, etc.) is kept as its own piece.
+    """
+    if level not in LEVELS:
+        raise ValueError('{} is not a valid level, use one of {}'.format(
+            level, LEVELS))
+    if level == 'section':
+        starts = [match.start() for match in SECTION_HEADING.finditer(text)]
+        if not starts or starts[0] != 0:
+            starts.insert(0, 0)
+        bounds = zip(starts, starts[1:] + [len(text)])
+        chunks = [text[start:end] for start, end in bounds]
+    else:
+        chunks = PARAGRAPH_BREAK.split(text)
+    pieces = list()
+    for chunk in chunks:
+        stripped = chunk.strip()
+        if not stripped:
+            continue
+        heading = stripped.splitlines()[0].strip()
+        pieces.append(section(heading, stripped, digest(stripped)))
+    return pieces
+
+
+def _line_diff(old, new):
+    return list(difflib.unified_diff(old.text.splitlines(),
+                                     new.text.splitlines(),
+                                     fromfile=old.key, tofile=new.key,
+                                     lineterm=''))
+
+
+def diff_texts(old_text, new_text, level='section', cache=None):
+    """
+    Compares two versions of a bill's text and returns a list of section_diff
+    tuples, one per section, in the order they appear in the new text. Status
+    is one of 'unchanged', 'changed', 'added' or 'removed'; diff holds
+    unified diff lines for changed sections and is empty otherwise.
+    """
+    cache = _cache if cache is None else cache
+    key = _cache_key(old_text, new_text, level)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    old_sections = split_sections(old_text, level)
+    new_sections = split_sections(new_text, level)
+    matcher = difflib.SequenceMatcher(
+        a=[item.digest for item in old_sections],
+        b=[item.digest for item in new_sections],
+        autojunk=False)
+    results = list()
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        old_block = old_sections[i1:i2]
+        new_block = new_sections[j1:j2]
+        if tag == 'equal':
+            for item in new_block:
+                results.append(section_diff(item.key, 'unchanged', item,
+                                            item, list()))
+            continue
+        paired = min(len(old_block), len(new_block))
+        for old, new in zip(old_block[:paired], new_block[:paired]):
+            results.append(section_diff(new.key, 'changed', old, new,
+                                        _line_diff(old, new)))
+        for old in old_block[paired:]:
+            results.append(section_diff(old.key, 'removed', old, None,
+                                        list()))
+        for new in new_block[paired:]:
+            results.append(section_diff(new.key, 'added', None, new, list()))
+    results = tuple(results)
+    cache.set(key, results)
+    return results
+
+
+def sorted_versions(text_versions):
+    """
+    Puts a bill's textVersions list in chronological order. Versions without
+    a date (usually the most recent one) go last.
+    """
+    return sorted(text_versions,
+                  key=lambda item: (item['date'] is None, item['date'] or ''))
+
+
+def diff_bill(bill_obj, level='section', text_format='Formatted Text',
+              cache=None):
+    """
+    Compares each of a bill's text versions with the one before it and
+    returns a list of version_diff tuples, oldest comparison first.
+    """
+    versions = [core.text_version(item, text_format=text_format)
+                for item in sorted_versions(bill_obj.texts or list())]
+    versions = [item for item in versions if item.url]
+    logger.debug('Comparing {} text versions'.format(len(versions)))
+    results = list()
+    for old, new in zip(versions, versions[1:]):
+        sections = diff_texts(old.text, new.text, level=level, cache=cache)
+        results.append(version_diff(old.version_type, new.version_type,
+                                    sections))
+    return results
+
+
+def diff_bills(bill_objs, level='section', text_format='Formatted Text',
+               max_workers=8, cache=None):
+    """
+    Runs diff_bill over many bills at once. Most of the time goes to
+    downloading the text, so the work is spread over a thread pool.
+
+    Yields (bill, results, error) tuples as each bill finishes. If something
+    goes wrong with one bill the error is handed back instead of raised, so
+    one bad bill doesn't stop the rest.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(diff_bill, bill_obj, level, text_format,
+                               cache): bill_obj
+                   for bill_obj in bill_objs}
+        for future in as_completed(futures):
+            bill_obj = futures[future]
+            try:
+                yield bill_obj, future.result(), None
+            except Exception as error:
+                logger.warning('Could not diff {}: {}'.format(bill_obj,
+                                                              error))
+                yield bill_obj, None, error
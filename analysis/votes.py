@@ -0,0 +1,97 @@
+"""
+Vectorized vote analysis over the packed positions pipeline.votes stores.
+
+load_matrix() reads a chamber's votes for a congress into a members x votes
+int8 matrix (one row per VoteRoster entry), and the functions below work on
+that matrix directly, so party unity or pairwise agreement across a full
+congress is a handful of NumPy operations:
+
+    matrix = load_matrix(db_session, 117, 'house')
+    scores = party_unity(matrix)
+"""
+import numpy as np
+from collections import namedtuple
+from database import db_session
+from models.db.models import Vote, VoteRoster
+from pipeline.votes import YEA, NAY, ABSENT
+
+vote_matrix = namedtuple('vote_matrix', ['members', 'parties', 'vote_ids',
+                                         'positions'])
+
+
+def load_matrix(session=None, congress=None, chamber=None):
+    """
+    Returns a vote_matrix for every vote a chamber took in a congress.
+    members and parties follow roster order, vote_ids follow roll call order
+    and positions is a members x votes int8 array. Members who joined after a
+    vote (so aren't in its packed positions) are ABSENT for it.
+    """
+    session = session or db_session
+    roster = (session.query(VoteRoster)
+              .filter_by(congress=congress, chamber=chamber)
+              .order_by(VoteRoster.roster_index).all())
+    votes = (session.query(Vote.vote_id, Vote.positions)
+             .filter_by(congress=congress, chamber=chamber)
+             .order_by(Vote.session, Vote.roll_number).all())
+    positions = np.full((len(roster), len(votes)), ABSENT, dtype=np.int8)
+    for column, vote in enumerate(votes):
+        packed = np.frombuffer(vote.positions or b'', dtype=np.int8)
+        positions[:len(packed), column] = packed
+    return vote_matrix([row.member_id for row in roster],
+                       np.array([row.party for row in roster]),
+                       [vote.vote_id for vote in votes], positions)
+
+
+def party_positions(matrix, party):
+    """
+    Each vote's majority position for party: YEA, NAY, or 0 on a tie or when
+    nobody in the party voted yea or nay.
+    """
+    members = matrix.parties == party
+    yeas = (matrix.positions[members] == YEA).sum(axis=0)
+    nays = (matrix.positions[members] == NAY).sum(axis=0)
+    return np.where(yeas > nays, YEA, np.where(nays > yeas, NAY, 0))
+
+
+def party_unity_votes(matrix, parties=('D', 'R')):
+    """
+    Boolean mask of the votes where the majorities of the two parties took
+    opposite sides.
+    """
+    first = party_positions(matrix, parties[0])
+    second = party_positions(matrix, parties[1])
+    return (first != 0) & (second != 0) & (first != second)
+
+
+def party_unity(matrix, parties=('D', 'R')):
+    """
+    Share of party unity votes on which each member voted with their party's
+    majority, counting only the votes where they voted yea or nay. Members of
+    other parties (and members with no qualifying votes) get NaN. Returns an
+    array in roster order.
+    """
+    unity = party_unity_votes(matrix, parties)
+    scores = np.full(len(matrix.members), np.nan)
+    for party in parties:
+        members = matrix.parties == party
+        line = party_positions(matrix, party)[unity]
+        cast = matrix.positions[members][:, unity]
+        voted = (cast == YEA) | (cast == NAY)
+        agreed = (cast == line) & voted
+        with np.errstate(invalid='ignore', divide='ignore'):
+            scores[members] = agreed.sum(axis=1) / voted.sum(axis=1)
+    return scores
+
+
+def agreement(matrix):
+    """
+    members x members array of how often each pair voted the same way, out of
+    the votes where both voted yea or nay. NaN where a pair never overlapped.
+    """
+    yeas = (matrix.positions == YEA).astype(np.float32)
+    nays = (matrix.positions == NAY).astype(np.float32)
+    both = yeas + nays
+    same = yeas @ yeas.T + nays @ nays.T
+    total = both @ both.T
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(total > 0, same / total, np.nan)
@@ -0,0 +1,99 @@
+"""
+Measures JSON decode throughput for Congress.gov payloads: a full page of
+actions and a bill record, decoded
+
+    - with json.loads into dicts (what requests' .json() does),
+    - with json.loads into the namedtuple records (schema's fallback),
+    - with msgspec into dicts (APIConnectors.decode_json),
+    - with msgspec straight into the struct records (schema's fast path).
+
+The msgspec rows are skipped if it isn't installed. Run from the repository
+root:
+
+    python benchmarks/bench_decode.py
+
+Set CDG_BENCH_RUNS to change the number of repetitions (default 200).
+"""
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUNS = int(os.environ.get('CDG_BENCH_RUNS', 200))
+
+
+def actions_page(size=250):
+    actions = [{'actionDate': '2021-03-{:02d}'.format(i % 28 + 1),
+                'actionTime': '12:{:02d}:00'.format(i % 60),
+                'actionCode': 'H{}'.format(11100 + i),
+                'type': 'Committee',
+                'text': 'Referred to the Subcommittee on the Constitution, '
+                        'Civil Rights, and Civil Liberties. ({})'.format(i),
+                'sourceSystem': {'code': 2, 'name': 'House floor actions'},
+                'committees': [{'name': 'Judiciary Committee',
+                                'systemCode': 'hsju00',
+                                'url': 'https://api.congress.gov/v3/'
+                                       'committee/house/hsju00'}]}
+               for i in range(size)]
+    return json.dumps({'actions': actions,
+                       'pagination': {'count': size}}).encode()
+
+
+def bill_payload():
+    pointer = {'count': 12, 'url': 'https://api.congress.gov/v3/bill/117/hr/1'}
+    return json.dumps({'bill': {
+        'congress': 117, 'type': 'HR', 'number': '1',
+        'title': 'For the People Act of 2021',
+        'originChamber': 'House', 'originChamberCode': 'H',
+        'introducedDate': '2021-01-04', 'updateDate': '2022-09-29T03:27:05Z',
+        'policyArea': {'name': 'Government Operations and Politics'},
+        'latestAction': {'actionDate': '2022-03-17', 'text': 'Placed on '
+                         'Senate Legislative Calendar.'},
+        'sponsors': [{'bioguideId': 'S001168', 'fullName': 'Rep. Sarbanes, '
+                      'John P. [D-MD-3]', 'party': 'D', 'state': 'MD',
+                      'district': 3}],
+        'actions': pointer, 'cosponsors': pointer, 'titles': pointer,
+        'summaries': pointer, 'committees': pointer,
+        'relatedBills': pointer, 'subjects': pointer,
+        'amendments': pointer, 'textVersions': pointer}}).encode()
+
+
+def throughput(decode, content):
+    """
+    Median MB/s over RUNS decodes of content.
+    """
+    timings = list()
+    for i in range(RUNS):
+        start = time.perf_counter()
+        decode(content)
+        timings.append(time.perf_counter() - start)
+    return len(content) / statistics.median(timings) / 1e6
+
+
+def decoders(kind, name, many):
+    from models.cdg import schema
+    fallback = schema._tuple_schema()
+    found = [('json.loads -> dicts', json.loads),
+             ('json.loads -> records',
+              lambda content: fallback.decode(content, kind, name, many))]
+    try:
+        import msgspec
+    except ImportError:
+        return found
+    fast = schema._struct_schema(msgspec)
+    return found + [('msgspec -> dicts', msgspec.json.decode),
+                    ('msgspec -> structs',
+                     lambda content: fast.decode(content, kind, name, many))]
+
+
+if __name__ == '__main__':
+    sys.path.insert(0, ROOT)
+    for label, content, kind, name, many in (
+            ('actions page', actions_page(), 'action', 'actions', True),
+            ('bill record', bill_payload(), 'bill', 'bill', False)):
+        print('{} ({:.1f} KB)'.format(label, len(content) / 1024))
+        for decoder_name, decode in decoders(kind, name, many):
+            print('    {:<24} {:8.1f} MB/s'.format(
+                decoder_name, throughput(decode, content)))
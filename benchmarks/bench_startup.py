@@ -0,0 +1,67 @@
+"""
+Measures cold-start cost: how long a fresh interpreter takes to import the
+connectors, and how long a spawn-based process pool takes to bring up
+workers that import them.
+
+Run from the repository root:
+
+    python benchmarks/bench_startup.py
+
+Set CDG_BENCH_RUNS to change the number of repetitions (default 10).
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUNS = int(os.environ.get('CDG_BENCH_RUNS', 10))
+MODULES = ('APIConnectors', 'models.cdg.legislation',
+           'models.cdg.committees')
+
+
+def cold_import(module):
+    """
+    Seconds for a brand new interpreter to start and import module, minus a
+    bare interpreter start so only the import itself is counted.
+    """
+    def run(code):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True)
+        return time.perf_counter() - start
+    bare = statistics.median(run('pass') for i in range(RUNS))
+    loaded = statistics.median(run('import {}'.format(module))
+                               for i in range(RUNS))
+    return loaded - bare
+
+
+def _worker_ready(i):
+    import models.cdg.legislation  # noqa: F401
+    return os.getpid()
+
+
+def pool_startup(workers=4):
+    """
+    Seconds until every worker of a spawn-based pool has imported the
+    connectors and answered once.
+    """
+    timings = list()
+    for i in range(RUNS):
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=get_context('spawn')) as pool:
+            list(pool.map(_worker_ready, range(workers)))
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+if __name__ == '__main__':
+    sys.path.insert(0, ROOT)
+    for module in MODULES:
+        print('import {:<28} {:8.1f} ms'.format(
+            module, cold_import(module) * 1000))
+    print('spawn pool of 4 workers          {:8.1f} ms'.format(
+        pool_startup() * 1000))
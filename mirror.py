@@ -0,0 +1,394 @@
+"""
+Read-only HTTP mirror of the Congress.gov bill endpoints, answered from the
+local database instead of api.data.gov.
+
+It serves the url shapes cdgAPI builds, with or without the /congress/v2/
+prefix:
+
+    bill
+    bill/{congress}
+    bill/{congress}/{type}
+    bill/{congress}/{type}/{number}
+    bill/{congress}/{type}/{number}/actions
+    bill/{congress}/{type}/{number}/cosponsors
+    bill/{congress}/{type}/{number}/relatedBills
+
+List responses use the API's envelope, {"<name>": [...], "pagination":
+{"count": ..., "next": ...}}, and take the same offset, limit, fromDateTime
+and toDateTime params, so cdgAPI.paginate() and core.lazy_list work against
+the mirror unchanged. A bill is served as it was last loaded, from its
+newest BillVersion (see pipeline.history), or rebuilt from the Bill,
+Actions, Sponsorship and Related tables if it has no history. Sub-list
+pointers the mirror can't serve (titles, summaries...) are left out of the
+bill, the way the API leaves out ones a bill doesn't have.
+
+Responses are cached for MIRROR_CACHE_TTL seconds. Start the mirror with
+
+    python mirror.py [port]
+
+and point connectors at it with CDG_BASE_URL=http://127.0.0.1:8080/ (or by
+setting _base_url on a cdgAPI object).
+"""
+import json
+import logging
+import sys
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from urllib.parse import parse_qsl, urlencode, urlsplit
+from APIConnectors import canonical_url
+from database import db_session
+from models.db.models import Actions, Bill, Member, Related, Sponsorship
+from pipeline.bills import DERIVED_RELATIONS, TIMESTAMP_FORMAT, parse_datetime
+from pipeline.history import bill_version, latest_version
+from settings import (CDG_MAX_PAGE_SIZE, MIRROR_CACHE_SIZE, MIRROR_CACHE_TTL,
+                      MIRROR_HOST, MIRROR_PORT)
+
+logger = logging.getLogger(__name__)
+
+SUB_LISTS = ('actions', 'cosponsors', 'relatedBills')
+DEFAULT_LIMIT = 20
+# Params that don't change the answer
+IGNORED_PARAMS = ('api_key', 'format')
+
+
+class response_cache():
+    """
+    LRU cache of encoded responses that also drops anything older than ttl
+    seconds, since the database underneath keeps changing.
+    """
+    def __init__(self, maxsize=MIRROR_CACHE_SIZE, ttl=MIRROR_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._responses = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._responses)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._responses.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self._responses.pop(key, None)
+                self.misses += 1
+                return None
+            self._responses.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def add(self, key, response):
+        with self._lock:
+            self._responses[key] = (time.monotonic() + self.ttl, response)
+            self._responses.move_to_end(key)
+            while len(self._responses) > self.maxsize:
+                self._responses.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._responses.clear()
+
+
+class not_found(LookupError):
+    pass
+
+
+def _date(value):
+    return value.isoformat() if value else None
+
+
+def _timestamp(value):
+    return value.strftime(TIMESTAMP_FORMAT) if value else None
+
+
+class mirror_api():
+    """
+    Turns a request path and params into a (status, payload) pair. Knows
+    nothing about HTTP, so it can be used (and tested) without a server.
+
+    base_url is what the mirror is reachable at; it goes into every url it
+    hands out.
+    """
+    def __init__(self, session_factory=None, base_url=None):
+        self.session_factory = session_factory or db_session
+        self.base_url = base_url or 'http://{}:{}/'.format(MIRROR_HOST,
+                                                           MIRROR_PORT)
+
+    def url(self, *parts):
+        return self.base_url + '/'.join(str(part) for part in parts)
+
+    def handle(self, path, params):
+        session = self.session_factory()
+        try:
+            return 200, self.route(session, canonical_url(path).split('/'),
+                                   params)
+        except not_found as error:
+            return 404, {'error': str(error)}
+        except ValueError as error:
+            return 400, {'error': str(error)}
+        finally:
+            if hasattr(self.session_factory, 'remove'):
+                self.session_factory.remove()
+            else:
+                session.close()
+
+    def route(self, session, parts, params):
+        if parts[0] != 'bill' or len(parts) > 5:
+            raise not_found('No mirror for {}'.format('/'.join(parts)))
+        if len(parts) <= 3:
+            return self.bill_list(session, params, *parts[1:])
+        row = self.bill_row(session, *parts[1:4])
+        if len(parts) == 4:
+            return {'bill': self.bill_data(session, row)}
+        name = {item.lower(): item for item in SUB_LISTS}.get(parts[4])
+        if name is None:
+            raise not_found('No mirror for {}'.format('/'.join(parts)))
+        return self.page(name, self.sub_list(session, row, name), params,
+                         parts)
+
+    def page(self, name, items, params, parts, count=None):
+        """
+        The API's list envelope around one page of items. items is either
+        the whole list, or (with count) the page itself.
+        """
+        offset = int(params.get('offset') or 0)
+        limit = int(params.get('limit') or DEFAULT_LIMIT)
+        if offset < 0 or not 0 < limit <= CDG_MAX_PAGE_SIZE:
+            raise ValueError('offset must be 0 or more and limit between 1 '
+                             'and {}'.format(CDG_MAX_PAGE_SIZE))
+        if count is None:
+            count = len(items)
+            items = items[offset:offset + limit]
+        pagination = {'count': count}
+        if offset + limit < count:
+            next_params = {key: value for key, value in params.items()
+                           if key not in IGNORED_PARAMS}
+            next_params.update(offset=offset + limit, limit=limit)
+            pagination['next'] = '{}?{}'.format(self.url(*parts),
+                                                urlencode(next_params))
+        return {name: items, 'pagination': pagination,
+                'request': {'contentType': 'application/json',
+                            'format': 'json'}}
+
+    def bill_list(self, session, params, congress=None, bill_type=None):
+        query = session.query(Bill)
+        if congress is not None:
+            query = query.filter(Bill.congress == int(congress))
+        if bill_type is not None:
+            query = query.filter(Bill.bill_type == bill_type)
+        if params.get('fromDateTime'):
+            query = query.filter(Bill.ext_update_date >=
+                                 parse_datetime(params['fromDateTime']))
+        if params.get('toDateTime'):
+            query = query.filter(Bill.ext_update_date <=
+                                 parse_datetime(params['toDateTime']))
+        count = query.count()
+        offset = int(params.get('offset') or 0)
+        limit = int(params.get('limit') or DEFAULT_LIMIT)
+        rows = (query.order_by(Bill.ext_update_date.desc(), Bill.bill_id)
+                .offset(offset).limit(limit))
+        items = [{'congress': row.congress, 'type': row.bill_type.upper(),
+                  'number': row.bill_number,
+                  'updateDate': _timestamp(row.ext_update_date),
+                  'url': self.url('bill', row.congress, row.bill_type,
+                                  row.bill_number)}
+                 for row in rows]
+        parts = [part for part in ('bill', congress, bill_type)
+                 if part is not None]
+        return self.page('bills', items, params, parts, count=count)
+
+    def bill_row(self, session, congress, bill_type, number):
+        if not congress.isdigit():
+            raise not_found('{} is not a congress'.format(congress))
+        row = (session.query(Bill)
+               .filter_by(congress=int(congress), bill_type=bill_type,
+                          bill_number=number)
+               .one_or_none())
+        if row is None:
+            raise not_found('No bill {} {} {}'.format(congress, bill_type,
+                                                      number))
+        return row
+
+    def record(self, session, row):
+        """
+        The bill's newest stored version, or None if it has no history.
+        """
+        latest = latest_version(session, row.bill_id)
+        if latest is None:
+            return None
+        return bill_version(session, row.bill_id, latest.version)
+
+    def bill_data(self, session, row):
+        record = self.record(session, row)
+        if record is not None:
+            data = {key: value for key, value in record['bill'].items()
+                    if not (isinstance(value, dict) and 'url' in value
+                            and 'count' in value)}
+        else:
+            data = {'congress': row.congress, 'type': row.bill_type.upper(),
+                    'number': row.bill_number,
+                    'introducedDate': _date(row.introduced_date),
+                    'updateDate': _timestamp(row.ext_update_date),
+                    'sponsors': self.sponsors(session, row, True)}
+        parts = ('bill', row.congress, row.bill_type, row.bill_number)
+        data['url'] = self.url(*parts)
+        for name in SUB_LISTS:
+            items = self.sub_list(session, row, name, record)
+            if items:
+                data[name] = {'count': len(items),
+                              'url': self.url(*parts, name)}
+        return data
+
+    def sub_list(self, session, row, name, record=False):
+        if record is False:
+            record = self.record(session, row)
+        if record is not None and name in record:
+            return record[name]
+        if name == 'actions':
+            return self.actions(session, row)
+        if name == 'cosponsors':
+            return self.sponsors(session, row, False)
+        return self.related(session, row)
+
+    def actions(self, session, row):
+        rows = (session.query(Actions)
+                .filter(Actions.bill_id == row.bill_id)
+                .order_by(Actions.action_date.desc(),
+                          Actions.action_id.desc()))
+        return [{'actionDate': _date(item.action_date),
+                 'text': item.action_text, 'type': item.action_type,
+                 'actionCode': item.action_code,
+                 'sourceSystem': {'code': item.source_system_code,
+                                  'name': item.source_system_name}}
+                for item in rows]
+
+    def sponsors(self, session, row, is_sponsor):
+        rows = (session.query(Sponsorship, Member)
+                .outerjoin(Member,
+                           Member.bioguide_id == Sponsorship.bioguide_id)
+                .filter(Sponsorship.bill_id == row.bill_id,
+                        Sponsorship.is_sponsor.is_(is_sponsor))
+                .order_by(Sponsorship.sponsorship_id))
+        items = list()
+        for sponsorship, member in rows:
+            item = {'bioguideId': sponsorship.bioguide_id}
+            if member is not None:
+                item.update(fullName=member.full_name,
+                            firstName=member.first_name,
+                            middleName=member.middle_name,
+                            lastName=member.last_name, party=member.party,
+                            state=member.state,
+                            district=(int(member.district)
+                                      if member.district else None))
+            if not is_sponsor:
+                item.update(
+                    sponsorshipDate=_date(sponsorship.sponsorship_date),
+                    isOriginalCosponsor=sponsorship.is_original_cosponsor,
+                    sponsorshipWithdrawnDate=_date(
+                        sponsorship.sponsorship_withdrawn_date))
+            items.append(item)
+        return items
+
+    def related(self, session, row):
+        rows = (session.query(Related, Bill)
+                .join(Bill, Bill.bill_id == Related.bill_id_2)
+                .filter(Related.bill_id_1 == row.bill_id,
+                        Related.identified_by.notin_(DERIVED_RELATIONS))
+                .order_by(Related.related_id))
+        items = OrderedDict()
+        for relation, other in rows:
+            item = items.setdefault(other.bill_id, {
+                'congress': other.congress, 'type': other.bill_type.upper(),
+                'number': int(other.bill_number),
+                'url': self.url('bill', other.congress, other.bill_type,
+                                other.bill_number),
+                'relationshipDetails': list()})
+            item['relationshipDetails'].append(
+                {'type': relation.relationship_type,
+                 'identifiedBy': relation.identified_by})
+        return list(items.values())
+
+
+class mirror_handler(BaseHTTPRequestHandler):
+    """
+    GETs go to the server's mirror_api through its response_cache; anything
+    else is refused, the mirror is read-only.
+    """
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = dict(parse_qsl(url.query))
+        key = (canonical_url(url.path),
+               tuple(sorted((name, value) for name, value in params.items()
+                            if name not in IGNORED_PARAMS)))
+        cached = self.server.cache.get(key)
+        if cached is None:
+            status, payload = self.server.api.handle(url.path, params)
+            body = json.dumps(payload, separators=(',', ':'),
+                              default=str).encode('utf-8')
+            cached = (status, body)
+            if status == 200:
+                self.server.cache.add(key, cached)
+            hit = 'MISS'
+        else:
+            hit = 'HIT'
+        status, body = cached
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('X-Cache', hit)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def refuse(self):
+        self.send_error(405, 'The mirror is read-only')
+
+    do_POST = do_PUT = do_PATCH = do_DELETE = refuse
+
+    def log_message(self, format, *args):
+        logger.debug('%s - %s', self.address_string(), format % args)
+
+
+class mirror_server(ThreadingHTTPServer):
+    """
+    Threaded HTTP server for a mirror_api. Each request runs on its own
+    thread with its own session from session_factory.
+
+    Functions
+        start - serves on a background thread and returns the server.
+
+        stop - shuts the server down.
+    """
+    daemon_threads = True
+
+    def __init__(self, host=MIRROR_HOST, port=MIRROR_PORT,
+                 session_factory=None, cache=None):
+        super().__init__((host, port), mirror_handler)
+        self.base_url = 'http://{}:{}/'.format(*self.server_address[:2])
+        self.api = mirror_api(session_factory, self.base_url)
+        self.cache = cache if cache is not None else response_cache()
+        self._thread = None
+
+    def start(self):
+        self._thread = Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else MIRROR_PORT
+    server = mirror_server(port=port)
+    logger.info('Mirroring Congress.gov at {}'.format(server.base_url))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
@@ -1,23 +1,16 @@
-from io import StringIO
-from html.parser import HTMLParser
+"""
+Connectors for the objects in the Congress.gov API. See models.cdg.core for
+the shared pieces and models.cdg.legislation, models.cdg.committees,
+models.cdg.members and models.cdg.nominations for the objects themselves.
+"""
 
 
-class MLStripper(HTMLParser):
-    def __init__(self):
-        super().__init__()
-        self.reset()
-        self.strict = False
-        self.convert_charrefs = True
-        self.text = StringIO()
-
-    def handle_data(self, d):
-        self.text.write(d)
-
-    def get_data(self):
-        return self.text.getvalue()
-
-
-def strip_tags(html):
-    s = MLStripper()
-    s.feed(html)
-    return s.get_data()
+def __getattr__(name):
+    # MLStripper and strip_tags used to be defined here as well as in core.
+    # Hand back core's copies, but only when someone asks, so importing the
+    # package doesn't pull in the connectors or html.parser.
+    if name in ('MLStripper', 'strip_tags'):
+        from models.cdg import core
+        return getattr(core, name)
+    raise AttributeError('module {} has no attribute {}'.format(__name__,
+                                                                name))
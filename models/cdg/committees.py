@@ -8,7 +8,7 @@ class committee(cdgAPI):
             super().__init__(url=url)
             self.chamber = chamber
             self.committee_id = committee_id
-            self._url_parts = ['committee', self.committee_id]
+            self._url_parts = ['committee', self.chamber, self.committee_id]
         else:
             raise AttributeError('Please provide either a URL OR a chamber and'
                                  ' committee_id_num')
@@ -17,9 +17,9 @@ class committee(cdgAPI):
 class committeeReport(cdgAPI):
     def __init__(self, url=None, congress=None, report_type=None,
                  report_num=None):
-        if url is None or (congress is None and
-                           report_type is None
-                           and report_num is None):
+        if url is not None or (congress is not None and
+                               report_type is not None
+                               and report_num is not None):
             super().__init__(url=url)
             self.congress = congress
             self.report_type = report_type
@@ -29,3 +29,41 @@ class committeeReport(cdgAPI):
         else:
             raise AttributeError('Please provide either a URL OR a congress, '
                                  'report_type, and report_num')
+
+
+def list_committees(congress=None, chamber=None):
+    """
+    Generator that pages through the committee list, optionally for one
+    congress and chamber, and yields each committee's list entry. Entries
+    for subcommittees carry a parent, and entries for committees list their
+    subcommittees.
+    """
+    listing = cdgAPI()
+    listing._url_parts = ['committee']
+    if congress is not None:
+        listing._url_parts.append(congress)
+    if chamber is not None:
+        listing._url_parts.append(chamber)
+    listing.limit = listing._max_limit
+    for page in listing.paginate(listing.url):
+        for item in page['committees']:
+            yield item
+
+
+def list_committee_reports(congress, report_type=None, since=None):
+    """
+    Generator that pages through every committee report in a congress (or
+    just one type of report, e.g. 'hrpt') and yields each report's list
+    entry. Pass an ISO8601 timestamp as since to only get reports updated
+    after it.
+    """
+    listing = cdgAPI()
+    listing._url_parts = ['committeeReport', congress]
+    if report_type is not None:
+        listing._url_parts.append(report_type)
+    listing.limit = listing._max_limit
+    if since is not None:
+        listing.fromDateTime = since
+    for page in listing.paginate(listing.url):
+        for item in page['reports']:
+            yield item
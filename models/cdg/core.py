@@ -15,33 +15,116 @@ Available objects include:
     committeeReport
     member
     nomination
+
+committee and committeeReport live in models.cdg.committees and are imported
+here so they can still be reached as core.committee and core.committeeReport.
 """
-from APIConnectors import cdgAPI
+from APIConnectors import cdgAPI, IDENTITY_MAP, PAGE_TUNER, canonical_url
+from models.cdg.committees import committee, committeeReport  # noqa: F401
+from settings import SUB_LIST_MAX_PAGES
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from io import StringIO
-from html.parser import HTMLParser
+from itertools import islice
+import logging
 
+logger = logging.getLogger(__name__)
 
-class MLStripper(HTMLParser):
-    def __init__(self):
-        super().__init__()
-        self.reset()
-        self.strict = False
-        self.convert_charrefs = True
-        self.text = StringIO()
 
-    def handle_data(self, d):
-        self.text.write(d)
+_stripper_class = None
+
+
+def _ml_stripper():
+    """
+    Builds the MLStripper class the first time it's needed, so html.parser
+    is only imported by code that actually strips tags.
+    """
+    global _stripper_class
+    if _stripper_class is None:
+        from html.parser import HTMLParser
+
+        class MLStripper(HTMLParser):
+            def __init__(self):
+                super().__init__()
+                self.reset()
+                self.strict = False
+                self.convert_charrefs = True
+                self.text = StringIO()
+
+            def handle_data(self, d):
+                self.text.write(d)
+
+            def get_data(self):
+                return self.text.getvalue()
+
+        _stripper_class = MLStripper
+    return _stripper_class
 
-    def get_data(self):
-        return self.text.getvalue()
+
+def __getattr__(name):
+    if name == 'MLStripper':
+        return _ml_stripper()
+    raise AttributeError('module {} has no attribute {}'.format(__name__,
+                                                                name))
 
 
 def strip_tags(html):
-    s = MLStripper()
+    s = _ml_stripper()()
     s.feed(html)
     return s.get_data()
 
 
+def hydrate(cls, cached=True, fetch_all=False, **kwargs):
+    """
+    Builds an object of class cls and fetches its data (and, with
+    fetch_all, every sub-resource). With cached, the object comes from the
+    identity map and is taken back out if the fetch fails.
+    """
+    factory = cls.cached if cached else cls
+    obj = factory(**kwargs)
+    try:
+        if obj._data is None:
+            response = obj.call(obj.url)
+            response.raise_for_status()
+            obj._data = response.json()
+        if fetch_all:
+            obj.fetch_all()
+    except Exception:
+        if cached:
+            IDENTITY_MAP.discard(canonical_url(obj.url))
+        raise
+    return obj
+
+
+def fetch_batch(congress, keys, hydrate, result, max_workers):
+    """
+    Runs hydrate(key) for every key on a thread pool, keeping about two keys
+    per worker in flight, and yields result(key, obj, error) tuples as they
+    finish.
+    """
+    keys = iter(keys)
+    pending = dict()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+
+        def submit(count):
+            for key in islice(keys, count):
+                pending[pool.submit(hydrate, key)] = key
+
+        submit(max_workers * 2)
+        while pending:
+            done, not_done = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                key = pending.pop(future)
+                try:
+                    yield result(key, future.result(), None)
+                except Exception as error:
+                    logger.warning('Could not fetch {} {}: {}'.format(
+                        congress, ' '.join(str(part) for part in key),
+                        error))
+                    yield result(key, None, error)
+            submit(len(done))
+
+
 class sub_list(cdgAPI):
     """
     Represents a nested list in the Congress.gov API. Used when the API wants
@@ -54,6 +137,8 @@ class sub_list(cdgAPI):
         self.count = source['count'] if 'count' in source else None
         self.name = obj_name
         self._list = None
+        if self.adaptive and self.count:
+            self.tune_limit(self.url, self.count)
 
     @property
     def list(self):
@@ -76,22 +161,141 @@ class sub_list(cdgAPI):
                                '{}, paginating.'.format(self.count,
                                                         self.limit)))
             for result in self.paginate(self.url):
+                self.observe_page(result[self.name])
                 for item in result[self.name]:
                     self.logger.debug('Yielding {}'.format(item))
                     yield item
         else:
             obj_call = self.get()
+            self.observe_page(obj_call[self.name])
             for item in obj_call[self.name]:
                 self.logger.debug('Yielding {}'.format(item))
                 yield item
 
+    def observe_page(self, items):
+        """
+        Tells the page size tuner how the last page went.
+        """
+        if self.last_call_seconds is not None:
+            PAGE_TUNER.observe(self.url, len(items), self.last_call_seconds,
+                               self.last_call_bytes)
 
-class cosponsors_list(sub_list):
 
-    def __init__(self, source=None, obj_name=None):
-        super().__init__(source=source['url'], obj_name=obj_name)
-        self.count = source['totalCount'] if 'totalCount' in source else None
-        self._list = None
+class lazy_list(sub_list):
+    """
+    A sub_list that behaves like a read-only sequence and only fetches the
+    pages it needs. len() comes straight from the count the API gives you, so
+    it never makes a call, and indexing or iterating fetches one page at a
+    time as it gets there.
+
+    Only the max_pages most recently used pages are kept, so walking a long
+    list of actions doesn't keep all of it in memory. Use <object name>.list
+    if you really do want the whole thing at once.
+    """
+    def __init__(self, source=None, obj_name=None, max_pages=None):
+        super().__init__(source=source, obj_name=obj_name)
+        self.max_pages = max_pages or SUB_LIST_MAX_PAGES
+        self._pages = OrderedDict()
+        self.pages_fetched = 0
+
+    def __len__(self):
+        return self.count or 0
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __iter__(self):
+        for page_num in range(self.page_count):
+            for item in self.get_page(page_num):
+                yield item
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if index < 0 or index >= len(self):
+            raise IndexError('sub list index out of range')
+        page = self.get_page(index // self.limit)
+        try:
+            return page[index % self.limit]
+        except IndexError:
+            raise IndexError('{} only returned {} items on this page'.format(
+                self.name, len(page)))
+
+    def __eq__(self, other):
+        try:
+            return len(self) == len(other) and list(self) == list(other)
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self):
+        return '<lazy_list {} ({} items, {} pages loaded)>'.format(
+            self.name, len(self), len(self._pages))
+
+    @property
+    def page_count(self):
+        return -(-len(self) // self.limit)
+
+    def get_page(self, page_num):
+        """
+        Returns the items on a single page, fetching it if it isn't already
+        loaded. Drops the least recently used page once there are more than
+        max_pages in memory.
+        """
+        if page_num in self._pages:
+            self._pages.move_to_end(page_num)
+            return self._pages[page_num]
+        self.logger.debug('Fetching page {} of {}'.format(page_num,
+                                                          self.name))
+        if page_num:
+            self.offset = page_num * self.limit
+        else:
+            del self.offset
+        items = self.decode_page(self.call(self.url))
+        self.observe_page(items)
+        self.pages_fetched += 1
+        self._pages[page_num] = items
+        while len(self._pages) > self.max_pages:
+            self._pages.popitem(last=False)
+        return items
+
+    def decode_page(self, response):
+        return response.json()[self.name]
+
+    def release(self):
+        """
+        Drops every loaded page.
+        """
+        self._pages.clear()
+
+
+class typed_list(lazy_list):
+    """
+    A lazy_list whose items are schema records (e.g. kind='action') instead
+    of dicts. With msgspec installed each page is decoded straight from the
+    response bytes; see models.cdg.schema.
+    """
+    def __init__(self, source=None, obj_name=None, kind=None,
+                 max_pages=None):
+        super().__init__(source=source, obj_name=obj_name,
+                         max_pages=max_pages)
+        if 'totalCount' in source:
+            self.count = source['totalCount']
+        self.kind = kind
+
+    def decode_page(self, response):
+        from models.cdg import schema
+        return schema.decode_page(response.content, self.kind, self.name)
+
+
+class cosponsors_list(lazy_list):
+
+    def __init__(self, source=None, obj_name=None, max_pages=None):
+        super().__init__(source=source, obj_name=obj_name,
+                         max_pages=max_pages)
+        if 'totalCount' in source:
+            self.count = source['totalCount']
 
 
 class object_list(cdgAPI):
@@ -140,36 +344,6 @@ class object_list(cdgAPI):
         return obj_list
 
 
-class committee(cdgAPI):
-    def __init__(self, chamber=None, committee_id=None, url=None):
-        if url is not None or (chamber is not None
-                               and committee_id is not None):
-            super().__init__(url=url)
-            self.chamber = chamber
-            self.committee_id = committee_id
-            self._url_parts = ['committee', self.committee_id]
-        else:
-            raise AttributeError('Please provide either a URL OR a chamber and'
-                                 ' committee_id_num')
-
-
-class committeeReport(cdgAPI):
-    def __init__(self, url=None, congress=None, report_type=None,
-                 report_num=None):
-        if url is None or (congress is None and
-                           report_type is None
-                           and report_num is None):
-            super().__init__(url=url)
-            self.congress = congress
-            self.report_type = report_type
-            self.report_num = report_num
-            self._url_parts = ['committeeReport', self.congress,
-                               self.report_type, self.report_num]
-        else:
-            raise AttributeError('Please provide either a URL OR a congress, '
-                                 'report_type, and report_num')
-
-
 class actions():
     """
     Represents action objects and data in the Congress.gov API. You can either
@@ -233,7 +407,7 @@ class actions():
             return None
 
     @property
-    def committee(self):
+    def committee(self):  # noqa: F811 (the module's committee class)
         if self._data['committee']['name']:
             return self._data['committee']['name']
         else:
@@ -252,3 +426,65 @@ class actions():
             return self._data['committee']['url']
         else:
             None
+
+
+class text_version(cdgAPI):
+    """
+    Represents one entry in a bill's textVersions list. The API only gives you
+    the date, the version type and a list of formats with links to the text
+    on congress.gov, so this object goes and gets the text for you.
+
+    Valid properties include:
+
+        data, date, version_type, formats, text
+    """
+    def __init__(self, data=None, text_format='Formatted Text'):
+        super().__init__()
+        self._data = data
+        self.text_format = text_format
+        self._url = self.format_url(text_format)
+        self._text = None
+
+    @property
+    def data(self):
+        return self._data
+
+    @property
+    def date(self):
+        return self._data['date'] if self._data['date'] else None
+
+    @property
+    def version_type(self):
+        return self._data['type'] if self._data['type'] else None
+
+    @property
+    def formats(self):
+        return self._data['formats'] if self._data['formats'] else list()
+
+    def format_url(self, text_format):
+        """
+        Returns the url for the requested format, or None if this version
+        isn't available in that format.
+        """
+        for item in self.formats:
+            if item['type'] == text_format:
+                return item['url']
+        return None
+
+    @property
+    def params(self):
+        """
+        Text files are served straight from congress.gov, which doesn't take
+        any of the API's parameters (and doesn't need our key).
+        """
+        return dict()
+
+    @property
+    def text(self):
+        if self._text is None:
+            if self._url is None:
+                raise AttributeError('No {} available for {}'.format(
+                    self.text_format, self.version_type))
+            response = self.call(self._url)
+            self._text = strip_tags(response.text)
+        return self._text
@@ -1,5 +1,21 @@
 from APIConnectors import cdgAPI
-from models.cdg import core
+from models.cdg import core, committees
+from collections import namedtuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+batch_result = namedtuple('batch_result', ['key', 'bill', 'error'])
+amendment_result = namedtuple('amendment_result',
+                              ['key', 'amendment', 'error'])
+
+
+# Sub-resource name to (list name, schema record) for bill.typed()
+TYPED_LISTS = {'actions': ('actions', 'action'),
+               'cosponsors': ('cosponsors', 'cosponsor'),
+               'titles': ('titles', 'title'),
+               'summaries': ('billSummaries', 'summary'),
+               'committees': ('billCommittees', 'committee')}
 
 
 class bill(cdgAPI):
@@ -10,6 +26,13 @@ class bill(cdgAPI):
     Titles: official_title, short_title, titles
 
     Summaries: summaries, latest_summary
+
+    Sub-resources (titles, summaries, committees, actions, cosponsors,
+    subjects, amendments, texts) come back as core.lazy_list objects, which
+    only fetch the pages you actually read. Call fetch_all() if you want
+    everything pulled down and stored in data.
+
+    Typed records: record, typed(source_name)
     """
     def __init__(self, congress=None, bill_type=None, bill_num=None,
                  url=None):
@@ -35,23 +58,57 @@ class bill(cdgAPI):
                                  'bill type, and bill number.')
 
     def fetch_all(self):
-        self.get_titles()
-        self.get_summaries()
-        self.get_committees()
-        self.get_actions()
-        self.get_related_bills()
-        self.get_cosponsors()
-        self.get_subjects()
-        self.get_amendments()
-        self.get_texts()
+        """
+        Downloads every sub-resource in full and stores the lists in
+        self.data, e.g. when the whole record is about to be serialized. The
+        individual properties don't need this, they only fetch the pages
+        they use.
+        """
+        sources = (('titles', self.get_titles, '_titles'),
+                   ('summaries', self.get_summaries, '_summaries'),
+                   ('committees', self.get_committees, '_committees'),
+                   ('actions', self.get_actions, '_actions'),
+                   ('relatedBills', self.get_related_bills, '_related_bills'),
+                   ('cosponsors', self.get_cosponsors, '_cosponsors'),
+                   ('subjects', self.get_subjects, '_subjects'),
+                   ('amendments', self.get_amendments, '_amendments'),
+                   ('textVersions', self.get_texts, '_texts'))
+        for source_name, getter, attr in sources:
+            # The API leaves out sub-resources a bill doesn't have
+            if source_name not in self.data['bill']:
+                continue
+            getter()
+            obj = getattr(self, attr)
+            self.data['bill'][source_name]['list'] = (
+                list(obj) if obj.count is not None else None)
 
     def get_attribute(self, source_name, obj_dict_name):
-        obj = core.sub_list(
+        """
+        Returns a lazy_list over one of the bill's sub-resources. Nothing is
+        fetched until the list is indexed or iterated.
+        """
+        return core.lazy_list(
             source=self.data['bill'][source_name],
             obj_name=obj_dict_name
             )
-        self.data['bill'][source_name]['list'] = obj.list
-        return obj
+
+    def typed(self, source_name):
+        """
+        Returns a core.typed_list over one of the bill's sub-resources
+        listed in TYPED_LISTS, whose items are schema records rather than
+        dicts.
+        """
+        obj_name, kind = TYPED_LISTS[source_name]
+        return core.typed_list(source=self.data['bill'][source_name],
+                               obj_name=obj_name, kind=kind)
+
+    @property
+    def record(self):
+        """
+        The bill's own data as a schema.bill record.
+        """
+        from models.cdg import schema
+        return schema.convert('bill', self.data['bill'])
 
     # Titles
     def get_titles(self):
@@ -59,9 +116,9 @@ class bill(cdgAPI):
 
     @property
     def titles(self):
-        if not self._titles:
+        if self._titles is None:
             self.get_titles()
-        return self.data['bill']['titles']['list']
+        return self._titles
 
     @property
     def short_title(self):
@@ -74,17 +131,16 @@ class bill(cdgAPI):
                                        'Official Title as Introduced')
 
     def _find_title_by_tag(self, title_json, title_type):
-        if not self._data['bill']['titles']['list']:
-            self.get_titles()
-        try:
-            if title_json is None:
-                return None
-            else:
-                title_types_list = [item['titleType'] for item in title_json]
-                title_index = title_types_list.index(title_type)
-                return title_json[title_index]['title']
-        except ValueError:
-            return "No title(s) available."
+        """
+        Walks the titles until it finds the one it's looking for, so only the
+        pages up to that title get fetched.
+        """
+        if title_json is None or title_json.count is None:
+            return None
+        for item in title_json:
+            if item['titleType'] == title_type:
+                return item['title']
+        return "No title(s) available."
 
     # Summaries
     def get_summaries(self):
@@ -92,33 +148,27 @@ class bill(cdgAPI):
 
     @property
     def summaries(self):
-        if not self._summaries:
+        if self._summaries is None:
             self.get_summaries()
-        return self.data['bill']['summaries']['list']
+        return self._summaries
 
     @property
     def latest_summary(self):
-        if not self._summaries:
+        if self._summaries is None:
             self.get_summaries()
         self.logger.debug('Accessing latest summary.')
-        if self._find_latest_summary(self.summaries):
-            latest = self._find_latest_summary(self.summaries)['text']
-        else:
-            None
-        latest_stripped = core.strip_tags(latest) if latest else None
+        latest = self._find_latest_summary(self.summaries)
+        latest_text = latest['text'] if latest else None
+        latest_stripped = core.strip_tags(latest_text) if latest_text else None
         return latest_stripped
 
     def _find_latest_summary(self, summary_json):
-        if summary_json is None:
-            self.logger.debug('Summary JSON provided == None, returning None')
+        if not summary_json:
+            self.logger.debug('No summaries available, returning None')
             return None
         else:
-            dates = [item['actionDate'] for item in summary_json]
-            self.logger.debug('Available dates: {}'.format(dates))
-            max_date = max(dates)
-            self.logger.debug('Max date found: {}'.format(max_date))
-            latest_summary_index = dates.index(max_date)
-            latest_summary = summary_json[latest_summary_index]
+            latest_summary = max(summary_json,
+                                 key=lambda item: item['actionDate'])
             self.logger.debug('Found latest summary:{}'.format(latest_summary))
             return latest_summary
 
@@ -128,19 +178,29 @@ class bill(cdgAPI):
 
     @property
     def committees(self):
-        if not self._committees:
+        if self._committees is None:
             self.get_committees()
-        return self._committees.list
+        return self._committees
+
+    @property
+    def committee_objects(self):
+        """
+        The bill's committees as committees.committee objects. These come from
+        the identity map, so every bill referred to the same committee shares
+        one object (and one download).
+        """
+        return [committees.committee.cached(url=item['url'])
+                for item in self.committees]
 
     # Actions
     def get_actions(self):
-        self.get_attribute('actions', 'actions')
+        self._actions = self.get_attribute('actions', 'actions')
 
     @property
     def actions(self):
-        if not self._actions:
+        if self._actions is None:
             self.get_actions()
-        return self._actions.list
+        return self._actions
 
     # Related Bills
     def get_related_bills(self):
@@ -149,25 +209,31 @@ class bill(cdgAPI):
 
     @property
     def related_bills(self):
-        if not self._related_bills:
+        if self._related_bills is None:
+            self.get_related_bills()
+        return self._related_bills
+
+    @property
+    def related_bill_objects(self):
+        """
+        Related bills as bill objects, shared through the identity map.
+        """
+        if self._related_bills is None:
             self.get_related_bills()
-        return self._actions.list
+        return [bill.cached(url=item['url']) for item in self._related_bills]
 
     # Cosponsors
     def get_cosponsors(self):
-        self._cosponsors = (
-            core.cosponsors_list(
-                source=self.data['bill']['cosponsors'],
-                obj_name='cosponsors'
-                )
-        )
-        self.data['bill']['cosponsors']['list'] = self._cosponsors.list
+        self._cosponsors = core.cosponsors_list(
+            source=self.data['bill']['cosponsors'],
+            obj_name='cosponsors'
+            )
 
     @property
     def cosponsors(self):
-        if not self._cosponsors:
+        if self._cosponsors is None:
             self.get_cosponsors()
-        return self._cosponsors.list
+        return self._cosponsors
 
     # Subjects
     def get_subjects(self):
@@ -175,33 +241,50 @@ class bill(cdgAPI):
 
     @property
     def subjects(self):
-        if not self._subjects:
+        if self._subjects is None:
             self.get_subjects()
-        return self.data['bill']['subjects']['list']
+        return self._subjects
 
     def get_amendments(self):
         self._amendments = self.get_attribute('amendments', 'amendments')
 
     @property
     def amendments(self):
-        if not self._amendments:
+        if self._amendments is None:
             self.get_amendments()
-        return self._amendments.list
+        return self._amendments
+
+    @property
+    def amendment_objects(self):
+        """
+        The bill's amendments as amendment objects, shared through the
+        identity map.
+        """
+        return [amendment.cached(url=item['url']) for item in self.amendments]
 
     def get_texts(self):
         self._texts = self.get_attribute('textVersions', 'textVersions')
 
     @property
     def texts(self):
-        if not self._texts:
-            self._texts = core.sub_list(
-                source=self.data['bill']['textVersions'],
-                obj_name='textVersions')
-            self.data['bill']['textVersions']['list'] = self._texts.list
-        return self._texts.list
+        if self._texts is None:
+            self.get_texts()
+        return self._texts
 
 
 class amendment(cdgAPI):
+    """
+    Class representing an amendment in the Congress.gov API. Available
+    properties include:
+
+    actions, cosponsors, amendments (amendments to this amendment), texts
+
+    amended_bill, amended_amendment - the bill or amendment this amends, as
+    objects shared through the identity map (None if it doesn't amend one).
+
+    Like bill, the sub-resources come back as core.lazy_list objects and
+    fetch_all() pulls everything down into data.
+    """
     def __init__(self, url=None, congress=None, amdmt_num=None,
                  amdmt_type=None):
         if url is not None or (congress is not None and amdmt_num is not None
@@ -212,6 +295,159 @@ class amendment(cdgAPI):
             self.amdmt_type = amdmt_type
             self._url_parts = ['amendment', self.congress, self.amdmt_type,
                                self.amdmt_num]
+            self._actions = None
+            self._cosponsors = None
+            self._amendments = None
+            self._texts = None
         else:
             raise AttributeError(('Please provide either a URL OR a congress, '
                                   'amdmt_num, and amdmt_type'))
+
+    def fetch_all(self):
+        """
+        Downloads every sub-resource in full and stores the lists in
+        self.data.
+        """
+        sources = (('actions', self.get_actions, '_actions'),
+                   ('cosponsors', self.get_cosponsors, '_cosponsors'),
+                   ('amendmentsToAmendment', self.get_amendments,
+                    '_amendments'),
+                   ('textVersions', self.get_texts, '_texts'))
+        for source_name, getter, attr in sources:
+            if source_name not in self.data['amendment']:
+                continue
+            getter()
+            obj = getattr(self, attr)
+            self.data['amendment'][source_name]['list'] = (
+                list(obj) if obj.count is not None else None)
+
+    def get_attribute(self, source_name, obj_dict_name):
+        return core.lazy_list(
+            source=self.data['amendment'][source_name],
+            obj_name=obj_dict_name
+            )
+
+    def get_actions(self):
+        self._actions = self.get_attribute('actions', 'actions')
+
+    @property
+    def actions(self):
+        if self._actions is None:
+            self.get_actions()
+        return self._actions
+
+    def get_cosponsors(self):
+        self._cosponsors = core.cosponsors_list(
+            source=self.data['amendment']['cosponsors'],
+            obj_name='cosponsors'
+            )
+
+    @property
+    def cosponsors(self):
+        if self._cosponsors is None:
+            self.get_cosponsors()
+        return self._cosponsors
+
+    def get_amendments(self):
+        self._amendments = self.get_attribute('amendmentsToAmendment',
+                                              'amendments')
+
+    @property
+    def amendments(self):
+        if self._amendments is None:
+            self.get_amendments()
+        return self._amendments
+
+    def get_texts(self):
+        self._texts = self.get_attribute('textVersions', 'textVersions')
+
+    @property
+    def texts(self):
+        if self._texts is None:
+            self.get_texts()
+        return self._texts
+
+    @property
+    def amended_bill(self):
+        source = self.data['amendment'].get('amendedBill')
+        return bill.cached(url=source['url']) if source else None
+
+    @property
+    def amended_amendment(self):
+        source = self.data['amendment'].get('amendedAmendment')
+        return amendment.cached(url=source['url']) if source else None
+
+
+def list_bills(congress, bill_type=None, since=None):
+    """
+    Generator that pages through every bill in a congress (or just one type
+    of bill) and yields (bill_type, bill_num) tuples, ready to hand to
+    bills(). Pass an ISO8601 timestamp as since to only get bills updated
+    after it.
+    """
+    listing = cdgAPI()
+    listing.congress = congress
+    listing._url_parts = ['bill', congress]
+    if bill_type is not None:
+        listing._url_parts.append(bill_type)
+    listing.limit = listing._max_limit
+    if since is not None:
+        listing.fromDateTime = since
+    for page in listing.paginate(listing.url):
+        for item in page['bills']:
+            yield item['type'].lower(), int(item['number'])
+
+
+def list_amendments(congress, amdmt_type=None, since=None):
+    """
+    Generator that pages through every amendment in a congress (or just one
+    type, e.g. 'samdt') and yields (amdmt_type, amdmt_num) tuples, ready to
+    hand to amendments(). since works as it does for list_bills.
+    """
+    listing = cdgAPI()
+    listing.congress = congress
+    listing._url_parts = ['amendment', congress]
+    if amdmt_type is not None:
+        listing._url_parts.append(amdmt_type)
+    listing.limit = listing._max_limit
+    if since is not None:
+        listing.fromDateTime = since
+    for page in listing.paginate(listing.url):
+        for item in page['amendments']:
+            yield item['type'].lower(), int(item['number'])
+
+
+def bills(congress, keys, max_workers=8, cached=True, fetch_all=False):
+    """
+    Fetches many bills from the same congress at once. keys is an iterable of
+    (bill_type, bill_num) tuples, e.g. [('hr', 1), ('s', 5)].
+
+    The bills are fetched on a thread pool and share the connection pool,
+    rate limit and identity map with everything else in the process. Results
+    are yielded as batch_result(key, bill, error) tuples in the order they
+    finish; if a bill can't be fetched its error is handed back in the tuple
+    rather than raised, and the rest of the batch carries on.
+
+    keys is read as the batch goes and only a couple of bills per worker are
+    in flight at once, so a generator over a whole congress is fine. Pass
+    cached=False to keep the bills out of the identity map in that case, and
+    fetch_all=True to have the workers download every sub-resource as well.
+    """
+    def hydrate(key):
+        return core.hydrate(bill, cached, fetch_all, congress=congress,
+                            bill_type=key[0], bill_num=key[1])
+
+    return core.fetch_batch(congress, keys, hydrate, batch_result, max_workers)
+
+
+def amendments(congress, keys, max_workers=8, cached=True, fetch_all=False):
+    """
+    Same as bills(), for (amdmt_type, amdmt_num) keys. Yields
+    amendment_result(key, amendment, error) tuples.
+    """
+    def hydrate(key):
+        return core.hydrate(amendment, cached, fetch_all, congress=congress,
+                            amdmt_type=key[0], amdmt_num=key[1])
+
+    return core.fetch_batch(congress, keys, hydrate, amendment_result,
+                            max_workers)
@@ -0,0 +1,55 @@
+from APIConnectors import cdgAPI
+from models.cdg import core
+
+
+class member(cdgAPI):
+    """
+    Class representing a member of Congress in the Congress.gov API, keyed on
+    their bioguide ID. sponsored_legislation and cosponsored_legislation come
+    back as core.lazy_list objects.
+    """
+    def __init__(self, bioguide_id=None, url=None):
+        if url is not None or bioguide_id is not None:
+            super().__init__(url=url)
+            self.bioguide_id = bioguide_id
+            self._url_parts = ['member', self.bioguide_id]
+            self._sponsored = None
+            self._cosponsored = None
+        else:
+            raise AttributeError('Please provide either a URL OR a '
+                                 'bioguide_id')
+
+    def get_attribute(self, source_name, obj_dict_name):
+        return core.lazy_list(
+            source=self.data['member'][source_name],
+            obj_name=obj_dict_name
+            )
+
+    @property
+    def sponsored_legislation(self):
+        if self._sponsored is None:
+            self._sponsored = self.get_attribute('sponsoredLegislation',
+                                                 'sponsoredLegislation')
+        return self._sponsored
+
+    @property
+    def cosponsored_legislation(self):
+        if self._cosponsored is None:
+            self._cosponsored = self.get_attribute('cosponsoredLegislation',
+                                                   'cosponsoredLegislation')
+        return self._cosponsored
+
+
+def list_members(congress=None):
+    """
+    Generator that pages through every member (or every member who served
+    in one congress) and yields each member's list entry.
+    """
+    listing = cdgAPI()
+    listing._url_parts = ['member']
+    if congress is not None:
+        listing._url_parts += ['congress', congress]
+    listing.limit = listing._max_limit
+    for page in listing.paginate(listing.url):
+        for item in page['members']:
+            yield item
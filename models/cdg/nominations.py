@@ -0,0 +1,118 @@
+from APIConnectors import cdgAPI
+from models.cdg import core
+from collections import namedtuple
+from settings import NOM_MIN_CONGRESS
+
+nomination_result = namedtuple('nomination_result',
+                               ['key', 'nomination', 'error'])
+
+
+class nomination(cdgAPI):
+    """
+    Class representing a nomination in the Congress.gov API. Nominations
+    only go back to NOM_MIN_CONGRESS. Available properties include:
+
+    positions - the positions in the nomination, straight from data, each
+    with an ordinal and a nominee count.
+
+    actions, committees - core.lazy_list objects over the nomination's
+    actions and committee referrals.
+
+    nominees(ordinal) - a core.lazy_list over the nominees for one position.
+    """
+    def __init__(self, congress=None, nom_num=None, url=None):
+        if url is not None or (congress is not None and nom_num is not None):
+            super().__init__(url=url)
+            self._min_congress = NOM_MIN_CONGRESS
+            self.congress = congress
+            self.nom_num = nom_num
+            self._url_parts = ['nomination', self.congress, self.nom_num]
+            self._actions = None
+            self._committees = None
+            self._nominees = dict()
+        else:
+            raise AttributeError('Please provide either a URL OR a congress '
+                                 'and nom_num')
+
+    def fetch_all(self):
+        """
+        Downloads the actions, committees and every position's nominees and
+        stores the lists in self.data.
+        """
+        data = self.data['nomination']
+        for source_name, attr in (('actions', 'actions'),
+                                  ('committees', 'committees')):
+            if source_name in data:
+                obj = getattr(self, attr)
+                data[source_name]['list'] = (list(obj) if obj.count
+                                             is not None else None)
+        for position in self.positions:
+            position['list'] = list(self.nominees(position['ordinal']))
+
+    def get_attribute(self, source_name, obj_dict_name):
+        return core.lazy_list(
+            source=self.data['nomination'][source_name],
+            obj_name=obj_dict_name
+            )
+
+    @property
+    def positions(self):
+        return self.data['nomination'].get('nominees') or list()
+
+    @property
+    def actions(self):
+        if self._actions is None:
+            self._actions = self.get_attribute('actions', 'actions')
+        return self._actions
+
+    @property
+    def committees(self):
+        if self._committees is None:
+            self._committees = self.get_attribute('committees', 'committees')
+        return self._committees
+
+    def nominees(self, ordinal):
+        if ordinal not in self._nominees:
+            for position in self.positions:
+                if position['ordinal'] == ordinal:
+                    break
+            else:
+                raise KeyError('No position with ordinal {}'.format(ordinal))
+            self._nominees[ordinal] = core.lazy_list(
+                source={'url': position['url'],
+                        'count': position.get('nomineeCount')},
+                obj_name='nominees')
+        return self._nominees[ordinal]
+
+
+def list_nominations(congress, since=None):
+    """
+    Generator that pages through every nomination in a congress and yields
+    (nom_num,) tuples, ready to hand to nominations(). Nominations split
+    into parts are listed once per part but only yielded once.
+    """
+    listing = cdgAPI()
+    listing._url_parts = ['nomination', congress]
+    listing.limit = listing._max_limit
+    if since is not None:
+        listing.fromDateTime = since
+    seen = set()
+    for page in listing.paginate(listing.url):
+        for item in page['nominations']:
+            number = int(item['number'])
+            if number not in seen:
+                seen.add(number)
+                yield (number,)
+
+
+def nominations(congress, keys, max_workers=8, cached=True, fetch_all=False):
+    """
+    Same as legislation.bills(), for (nom_num,) keys. Yields
+    nomination_result(key, nomination, error) tuples.
+    """
+    def hydrate(key):
+        return core.hydrate(nomination, cached, fetch_all, congress=congress,
+                            nom_num=key[0])
+
+    return core.fetch_batch(congress, keys, hydrate, nomination_result,
+                            max_workers)
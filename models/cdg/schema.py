@@ -0,0 +1,204 @@
+"""
+Typed records for the main Congress.gov payloads: bills, actions,
+cosponsors, titles, summaries and committees.
+
+Each record type is declared once in SCHEMAS, with snake_case field names
+(the API's camelCase keys are worked out from them). If msgspec is
+installed, the schemas become msgspec Structs and pages are decoded straight
+from the response bytes into them, without building the intermediate dicts.
+If it isn't (or settings.FAST_JSON is off), the same schemas become
+namedtuples filled in from json.loads. Either way every field is an
+attribute and anything the API leaves out is None (or [] for lists):
+
+    from models.cdg import schema
+    actions = schema.decode_page(response.content, 'action', 'actions')
+    actions[0].action_date, actions[0].source_system.name
+
+core.typed_list is a lazy_list whose pages come back as records, and
+bill.typed() hands one out for any of a bill's typed sub-lists.
+"""
+import json
+from collections import namedtuple
+from threading import Lock
+from typing import List, Optional, Union
+from APIConnectors import fast_json
+
+# Numbers the API sometimes sends as strings, kept as whichever they were
+ID = Union[int, str]
+
+# Record name to [(field, type)]. A type is a scalar, the name of another
+# record, or [name] for a list of them.
+SCHEMAS = {
+    'pointer': [('count', int), ('url', str)],
+    'source_system': [('code', ID), ('name', str)],
+    'committee_ref': [('name', str), ('system_code', str), ('url', str)],
+    'latest_action': [('action_date', str), ('action_time', str),
+                      ('text', str)],
+    'policy_area': [('name', str)],
+    'sponsor': [('bioguide_id', str), ('full_name', str),
+                ('first_name', str), ('last_name', str), ('party', str),
+                ('state', str), ('district', ID), ('is_by_request', str),
+                ('url', str)],
+    'action': [('action_date', str), ('action_time', str),
+               ('action_code', str), ('type', str), ('text', str),
+               ('source_system', 'source_system'),
+               ('committees', ['committee_ref'])],
+    'cosponsor': [('bioguide_id', str), ('full_name', str),
+                  ('first_name', str), ('middle_name', str),
+                  ('last_name', str), ('party', str), ('state', str),
+                  ('district', ID), ('sponsorship_date', str),
+                  ('is_original_cosponsor', bool),
+                  ('sponsorship_withdrawn_date', str), ('url', str)],
+    'title': [('title', str), ('title_type', str), ('title_type_code', ID),
+              ('chamber_code', str), ('chamber_name', str),
+              ('bill_text_version_code', str),
+              ('bill_text_version_name', str), ('update_date', str)],
+    'summary': [('action_date', str), ('action_desc', str), ('text', str),
+                ('update_date', str), ('version_code', str)],
+    'activity': [('name', str), ('date', str)],
+    'subcommittee': [('name', str), ('system_code', str), ('url', str),
+                     ('activities', ['activity'])],
+    'committee': [('name', str), ('system_code', str), ('chamber', str),
+                  ('type', str), ('url', str), ('activities', ['activity']),
+                  ('subcommittees', ['subcommittee'])],
+    'bill': [('congress', int), ('type', str), ('number', ID),
+             ('title', str), ('origin_chamber', str),
+             ('origin_chamber_code', str), ('introduced_date', str),
+             ('update_date', str), ('update_date_including_text', str),
+             ('policy_area', 'policy_area'),
+             ('latest_action', 'latest_action'),
+             ('sponsors', ['sponsor']), ('actions', 'pointer'),
+             ('cosponsors', 'pointer'), ('titles', 'pointer'),
+             ('summaries', 'pointer'), ('committees', 'pointer'),
+             ('related_bills', 'pointer'), ('subjects', 'pointer'),
+             ('amendments', 'pointer'), ('text_versions', 'pointer')],
+}
+
+
+def camel(name):
+    first, *rest = name.split('_')
+    return first + ''.join(part.title() for part in rest)
+
+
+class _struct_schema():
+    """
+    The schemas as msgspec Structs, with one cached decoder per wrapper.
+    """
+    def __init__(self, msgspec):
+        self.msgspec = msgspec
+        self.types = dict()
+        for name, fields in SCHEMAS.items():
+            spec = list()
+            for field, kind in fields:
+                if isinstance(kind, list):
+                    spec.append((field, List[self.types[kind[0]]],
+                                 msgspec.field(default_factory=list)))
+                else:
+                    spec.append((field, Optional[self.types.get(kind, kind)],
+                                 None))
+            self.types[name] = msgspec.defstruct(
+                name, spec, kw_only=True, rename='camel', gc=False)
+        self._decoders = dict()
+        self._lock = Lock()
+
+    def _decoder(self, kind, name, many):
+        key = (kind, name, many)
+        with self._lock:
+            if key not in self._decoders:
+                record = self.types[kind]
+                wrapper = self.msgspec.defstruct(
+                    '{}_payload'.format(name),
+                    [(name, List[record] if many else Optional[record],
+                      self.msgspec.field(default_factory=list) if many
+                      else None)])
+                self._decoders[key] = self.msgspec.json.Decoder(
+                    wrapper, strict=False)
+            return self._decoders[key]
+
+    def decode(self, content, kind, name, many):
+        return getattr(self._decoder(kind, name, many).decode(content), name)
+
+    def convert(self, kind, data):
+        return self.msgspec.convert(data, self.types[kind], strict=False)
+
+
+class _tuple_schema():
+    """
+    The schemas as namedtuples, filled in from the json module's dicts.
+    """
+    def __init__(self):
+        self.types = {name: namedtuple(name, [field for field, _ in fields],
+                                       defaults=(None,) * len(fields))
+                      for name, fields in SCHEMAS.items()}
+        # (key, nested record or None, is a list) for each field, in order
+        self._fields = {
+            name: [(camel(field),
+                    kind[0] if isinstance(kind, list)
+                    else kind if kind in SCHEMAS else None,
+                    isinstance(kind, list))
+                   for field, kind in fields]
+            for name, fields in SCHEMAS.items()}
+
+    def convert(self, kind, data):
+        if data is None:
+            return None
+        values = list()
+        for key, nested, many in self._fields[kind]:
+            value = data.get(key)
+            if many:
+                value = [self.convert(nested, item) for item in value or ()]
+            elif nested is not None:
+                value = self.convert(nested, value)
+            values.append(value)
+        return self.types[kind]._make(values)
+
+    def decode(self, content, kind, name, many):
+        data = json.loads(content).get(name)
+        if many:
+            return [self.convert(kind, item) for item in data or ()]
+        return self.convert(kind, data)
+
+
+_schema = None
+_schema_lock = Lock()
+
+
+def get_schema():
+    """
+    The struct schemas if msgspec is available, else the namedtuple ones.
+    Built the first time they're needed.
+    """
+    global _schema
+    with _schema_lock:
+        if _schema is None:
+            msgspec = fast_json()
+            _schema = (_struct_schema(msgspec) if msgspec is not None
+                       else _tuple_schema())
+        return _schema
+
+
+def record_type(kind):
+    return get_schema().types[kind]
+
+
+def decode(content, kind, name=None):
+    """
+    Decodes a single-record payload such as {"bill": {...}} into a record.
+    name is the payload's top-level key and defaults to kind.
+    """
+    return get_schema().decode(content, kind, name or kind, False)
+
+
+def decode_page(content, kind, name):
+    """
+    Decodes one page of a list, e.g. {"actions": [...], "pagination": ...},
+    into a list of records.
+    """
+    return get_schema().decode(content, kind, name, True)
+
+
+def convert(kind, data):
+    """
+    Turns an already decoded dict into a record.
+    """
+    return get_schema().convert(kind, data)
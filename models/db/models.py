@@ -1,9 +1,14 @@
-from sqlalchemy import Column, Integer, String, Date, DateTime, Boolean
+from sqlalchemy import (Column, Integer, String, Date, DateTime, Boolean,
+                        ForeignKey, Index, LargeBinary, Text)
 from database import Base
 
 
 class Bill(Base):
     __tablename__ = 'bill'
+    __table_args__ = (
+        Index('ix_bill_congress_type_number', 'congress', 'bill_type',
+              'bill_number', unique=True),
+    )
     bill_id = Column(Integer, primary_key=True)
     congress = Column(Integer, nullable=False)
     bill_number = Column(String(5), nullable=False)
@@ -29,36 +34,90 @@ class Bill(Base):
 
 
 class Vote(Base):
+    """
+    A roll call vote. positions holds every member's vote packed as one
+    signed byte per member, in VoteRoster order for the vote's congress and
+    chamber (see pipeline.votes for the codes).
+    """
     __tablename__ = 'vote'
+    __table_args__ = (
+        Index('ix_vote_congress_chamber_session_roll', 'congress', 'chamber',
+              'session', 'roll_number', unique=True),
+    )
     vote_id = Column(Integer, primary_key=True)
-    bill_id = Column(Integer, foreign_key=True)
+    bill_id = Column(Integer, ForeignKey('bill.bill_id'), index=True)
     roll_number = Column(Integer, nullable=False)
     url = Column(String(255), nullable=False)
     chamber = Column(String(6), nullable=False)
     congress = Column(Integer, nullable=False)
     session = Column(Integer, nullable=False)
     date = Column(DateTime, nullable=False)
+    question = Column(String(1024))
+    result = Column(String(255))
+    positions = Column(LargeBinary)
 
     def __init__(self, bill_id=None, roll_num=None, url=None, chamber=None,
-                 congress=None, session=None, date=None):
-        self.bill_id = None
+                 congress=None, session=None, date=None, question=None,
+                 result=None, positions=None):
+        self.bill_id = bill_id
         self.roll_number = roll_num
         self.url = url
         self.chamber = chamber
         self.congress = congress
         self.session = session
         self.date = date
+        self.question = question
+        self.result = result
+        self.positions = positions
 
     def __repr__(self):
         return '{} {} Roll Call No. {}'.format(self.congress, self.chamber,
                                                self.roll_number)
 
 
+class VoteRoster(Base):
+    """
+    The members who have voted in a chamber during a congress, each with a
+    fixed roster_index that is their offset into Vote.positions. member_id is
+    the bioguide id for the House and the LIS id for the Senate, since that's
+    what each chamber's vote files use.
+    """
+    __tablename__ = 'vote_roster'
+    __table_args__ = (
+        Index('ix_vote_roster_member', 'congress', 'chamber', 'member_id',
+              unique=True),
+        Index('ix_vote_roster_index', 'congress', 'chamber', 'roster_index',
+              unique=True),
+    )
+    vote_roster_id = Column(Integer, primary_key=True)
+    congress = Column(Integer, nullable=False)
+    chamber = Column(String(6), nullable=False)
+    roster_index = Column(Integer, nullable=False)
+    member_id = Column(String(10), nullable=False)
+    name = Column(String(255))
+    party = Column(String(3))
+    state = Column(String(2))
+
+    def __init__(self, congress=None, chamber=None, roster_index=None,
+                 member_id=None, name=None, party=None, state=None):
+        self.congress = congress
+        self.chamber = chamber
+        self.roster_index = roster_index
+        self.member_id = member_id
+        self.name = name
+        self.party = party
+        self.state = state
+
+    def __repr__(self):
+        return '{} {} #{} {}'.format(self.congress, self.chamber,
+                                     self.roster_index, self.member_id)
+
+
 class BillCommittee(Base):
     __tablename__ = 'bill_committee'
     bill_committee_id = Column(Integer, primary_key=True)
-    bill_id = Column(Integer, foreign_key=True)
-    committee_id = Column(Integer, foreign_key=True)
+    bill_id = Column(Integer, ForeignKey('bill.bill_id'), index=True)
+    committee_id = Column(Integer, ForeignKey('committee.committee_id'))
     activity_name = Column(String(255), nullable=False)
     activity_date = Column(Date, nullable=False)
     create_date = Column(Date)
@@ -66,7 +125,7 @@ class BillCommittee(Base):
 
     def __init__(self, bill_id=None, committee_id=None, activity_name=None,
                  activity_date=None, create_date=None, update_date=None):
-        self.bill_id = bill_id,
+        self.bill_id = bill_id
         self.committee_id = committee_id
         self.activity_name = activity_name
         self.activity_date = activity_date
@@ -78,22 +137,28 @@ class BillCommittee(Base):
 
 
 class Committee(Base):
+    """
+    A committee or subcommittee. Subcommittees point at their parent by
+    parent_committee_code; top level committees have none.
+    """
     __tablename__ = 'committee'
     committee_id = Column(Integer, primary_key=True)
-    committee_code = Column(String(7), nullable=False)
-    parent_committee_code = Column(String(7), nullable=False)
+    committee_code = Column(String(7), nullable=False, unique=True)
+    parent_committee_code = Column(String(7), index=True)
     name = Column(String(1024), nullable=False)
-    comm_type = Column(String(10), nullable=False)
-    ext_create_date = Column(Date, nullable=False)
+    chamber = Column(String(6))
+    comm_type = Column(String(20), nullable=False)
+    ext_create_date = Column(Date)
     ext_update_date = Column(Date, nullable=False)
     is_current = Column(Boolean)
 
     def __init__(self, committee_code=None, parent_committee_code=None,
                  name=None, comm_type=None, ext_create_date=None,
-                 ext_update_date=None, is_current=None):
+                 ext_update_date=None, is_current=None, chamber=None):
         self.committee_code = committee_code
         self.parent_committee_code = parent_committee_code
         self.name = name
+        self.chamber = chamber
         self.comm_type = comm_type
         self.ext_create_date = ext_create_date
         self.ext_update_date = ext_update_date
@@ -103,13 +168,45 @@ class Committee(Base):
         return '{}'.format(self.name)
 
 
+class CommitteeReport(Base):
+    __tablename__ = 'committee_report'
+    __table_args__ = (
+        Index('ix_committee_report_congress_type_number_part', 'congress',
+              'report_type', 'report_number', 'part', unique=True),
+    )
+    committee_report_id = Column(Integer, primary_key=True)
+    congress = Column(Integer, nullable=False)
+    report_type = Column(String(4), nullable=False)
+    report_number = Column(Integer, nullable=False)
+    part = Column(Integer, nullable=False, default=1)
+    chamber = Column(String(6))
+    citation = Column(String(50))
+    url = Column(String(255))
+    ext_update_date = Column(DateTime)
+
+    def __init__(self, congress=None, report_type=None, report_number=None,
+                 part=1, chamber=None, citation=None, url=None,
+                 ext_update_date=None):
+        self.congress = congress
+        self.report_type = report_type
+        self.report_number = report_number
+        self.part = part
+        self.chamber = chamber
+        self.citation = citation
+        self.url = url
+        self.ext_update_date = ext_update_date
+
+    def __repr__(self):
+        return '{}'.format(self.citation)
+
+
 class Related(Base):
     __tablename__ = 'related'
     related_id = Column(Integer, primary_key=True)
-    bill_id_1 = Column(Integer, foreign_key=True)
-    bill_id_2 = Column(Integer, foreign_key=True)
+    bill_id_1 = Column(Integer, ForeignKey('bill.bill_id'), index=True)
+    bill_id_2 = Column(Integer, ForeignKey('bill.bill_id'), index=True)
     relationship_type = Column(String(50), nullable=False)
-    identified_by = Column(String(10), nullable=False)
+    identified_by = Column(String(50), nullable=False)
 
     def __init__(self, bill_id_1=None, bill_id_2=None, relationship_type=None,
                  identified_by=None):
@@ -122,7 +219,12 @@ class Related(Base):
 class Actions(Base):
     __tablename__ = 'actions'
     action_id = Column(Integer, primary_key=True)
-    committee_id = Column(Integer, foreign_key=True)
+    bill_id = Column(Integer, ForeignKey('bill.bill_id'), index=True)
+    amendment_id = Column(Integer, ForeignKey('amendment.amendment_id'),
+                          index=True)
+    nomination_id = Column(Integer, ForeignKey('nomination.nomination_id'),
+                           index=True)
+    committee_id = Column(Integer, ForeignKey('committee.committee_id'))
     action_date = Column(Date)
     action_text = Column(String(4000))
     action_type = Column(String(100))
@@ -132,7 +234,11 @@ class Actions(Base):
 
     def __init__(self, action_date=None, action_text=None, action_type=None,
                  action_code=None, source_system_code=None,
-                 source_system_name=None):
+                 source_system_name=None, bill_id=None, amendment_id=None,
+                 nomination_id=None):
+        self.bill_id = bill_id
+        self.amendment_id = amendment_id
+        self.nomination_id = nomination_id
         self.action_date = action_date
         self.action_text = action_text
         self.action_type = action_type
@@ -141,10 +247,208 @@ class Actions(Base):
         self.source_system_name = source_system_name
 
 
-class Sponsorship(Base):
-    __tablename__ = 'sponsorship'
-    sponsorship_id = Column(Integer, primary_key=True)
-    bioguide_id = Column(String(7), nullable=False)
+class BillStatus(Base):
+    """
+    One row per bill with the date it reached each stage, derived from its
+    Actions by pipeline.status and refreshed whenever the bill is loaded.
+    stage is the furthest stage reached.
+    """
+    __tablename__ = 'bill_status'
+    __table_args__ = (
+        Index('ix_bill_status_congress_stage', 'congress', 'stage'),
+        Index('ix_bill_status_congress_passed_house', 'congress',
+              'passed_house_date'),
+        Index('ix_bill_status_congress_passed_senate', 'congress',
+              'passed_senate_date'),
+        Index('ix_bill_status_congress_became_law', 'congress',
+              'became_law_date'),
+    )
+    bill_id = Column(Integer, ForeignKey('bill.bill_id'), primary_key=True)
+    congress = Column(Integer, nullable=False)
+    stage = Column(String(20), nullable=False)
+    introduced_date = Column(Date)
+    reported_date = Column(Date)
+    passed_house_date = Column(Date)
+    passed_senate_date = Column(Date)
+    enrolled_date = Column(Date)
+    vetoed_date = Column(Date)
+    became_law_date = Column(Date)
+    latest_action_date = Column(Date)
+    latest_action_text = Column(String(4000))
+    update_date = Column(DateTime)
+
+    def __init__(self, bill_id=None, congress=None, stage=None):
+        self.bill_id = bill_id
+        self.congress = congress
+        self.stage = stage
+
+    def __repr__(self):
+        return 'BillStatus {} {}'.format(self.bill_id, self.stage)
+
+
+class SyncCheckpoint(Base):
+    """
+    Where an incremental sync left off, e.g. the time the last successful
+    bill sync for a congress started.
+    """
+    __tablename__ = 'sync_checkpoint'
+    name = Column(String(100), primary_key=True)
+    value = Column(String(255))
+    update_date = Column(DateTime)
+
+    def __init__(self, name=None, value=None, update_date=None):
+        self.name = name
+        self.value = value
+        self.update_date = update_date
+
+    def __repr__(self):
+        return '{}: {}'.format(self.name, self.value)
+
+
+class BillVersion(Base):
+    """
+    One past version of a bill's record (see pipeline.history). payload is
+    zlib-compressed JSON: the whole record for a keyframe, otherwise a
+    delta against the version before it.
+    """
+    __tablename__ = 'bill_version'
+    __table_args__ = (
+        Index('ix_bill_version_bill_version', 'bill_id', 'version',
+              unique=True),
+    )
+    bill_version_id = Column(Integer, primary_key=True)
+    bill_id = Column(Integer, ForeignKey('bill.bill_id'), nullable=False)
+    version = Column(Integer, nullable=False)
+    valid_from = Column(DateTime, nullable=False)
+    is_keyframe = Column(Boolean, nullable=False)
+    payload = Column(LargeBinary, nullable=False)
+    create_date = Column(DateTime)
+
+    def __init__(self, bill_id=None, version=None, valid_from=None,
+                 is_keyframe=False, payload=None, create_date=None):
+        self.bill_id = bill_id
+        self.version = version
+        self.valid_from = valid_from
+        self.is_keyframe = is_keyframe
+        self.payload = payload
+        self.create_date = create_date
+
+    def __repr__(self):
+        return 'BillVersion {} v{}'.format(self.bill_id, self.version)
+
+
+class ContentHash(Base):
+    """
+    Hash of one part of a stored resource (e.g. a bill's actions) as it was
+    last loaded, so a reload can tell whether that part changed. See
+    pipeline.changes.
+    """
+    __tablename__ = 'content_hash'
+    __table_args__ = (
+        Index('ix_content_hash_resource_part', 'resource_type', 'resource_id',
+              'part', unique=True),
+    )
+    content_hash_id = Column(Integer, primary_key=True)
+    resource_type = Column(String(20), nullable=False)
+    resource_id = Column(Integer, nullable=False)
+    part = Column(String(30), nullable=False)
+    digest = Column(String(40), nullable=False)
+    update_date = Column(DateTime)
+
+    def __init__(self, resource_type=None, resource_id=None, part=None,
+                 digest=None, update_date=None):
+        self.resource_type = resource_type
+        self.resource_id = resource_id
+        self.part = part
+        self.digest = digest
+        self.update_date = update_date
+
+
+class ChangeFeed(Base):
+    """
+    One part of one resource that a load actually changed, tagged with the
+    run that changed it.
+    """
+    __tablename__ = 'change_feed'
+    change_id = Column(Integer, primary_key=True)
+    run_id = Column(String(100), index=True)
+    resource_type = Column(String(20), nullable=False)
+    resource_id = Column(Integer, nullable=False, index=True)
+    part = Column(String(30), nullable=False)
+    change_type = Column(String(10), nullable=False)
+    change_date = Column(DateTime)
+
+    def __init__(self, run_id=None, resource_type=None, resource_id=None,
+                 part=None, change_type=None, change_date=None):
+        self.run_id = run_id
+        self.resource_type = resource_type
+        self.resource_id = resource_id
+        self.part = part
+        self.change_type = change_type
+        self.change_date = change_date
+
+    def __repr__(self):
+        return '{} {} {} {}'.format(self.resource_type, self.resource_id,
+                                    self.part, self.change_type)
+
+
+class WorkItem(Base):
+    """
+    A job on a durable work queue (see pipeline.workqueue), e.g. one bill to
+    fetch. A leased item belongs to lease_owner until lease_expires; after
+    that it goes back on the queue. available_date holds retries back.
+    """
+    __tablename__ = 'work_item'
+    __table_args__ = (
+        Index('ix_work_item_queue_key', 'queue', 'congress', 'item_type',
+              'item_number', unique=True),
+        Index('ix_work_item_queue_status', 'queue', 'status',
+              'available_date'),
+    )
+    work_item_id = Column(Integer, primary_key=True)
+    queue = Column(String(50), nullable=False)
+    congress = Column(Integer, nullable=False)
+    item_type = Column(String(10), nullable=False)
+    item_number = Column(Integer, nullable=False)
+    status = Column(String(20), nullable=False)
+    attempts = Column(Integer, nullable=False)
+    lease_owner = Column(String(100))
+    lease_expires = Column(DateTime)
+    available_date = Column(DateTime)
+    last_error = Column(Text)
+    create_date = Column(DateTime)
+    update_date = Column(DateTime)
+
+    def __init__(self, queue=None, congress=None, item_type=None,
+                 item_number=None, status='pending', attempts=0,
+                 available_date=None, create_date=None):
+        self.queue = queue
+        self.congress = congress
+        self.item_type = item_type
+        self.item_number = item_number
+        self.status = status
+        self.attempts = attempts
+        self.available_date = available_date
+        self.create_date = create_date
+        self.update_date = create_date
+
+    @property
+    def key(self):
+        return self.item_type, self.item_number
+
+    def __repr__(self):
+        return '{} {} {} {} ({})'.format(self.queue, self.congress,
+                                         self.item_type, self.item_number,
+                                         self.status)
+
+
+class Member(Base):
+    """
+    A member of Congress, keyed on their bioguide ID. party, state and
+    district are the most recent the API has given for them.
+    """
+    __tablename__ = 'member'
+    bioguide_id = Column(String(7), primary_key=True)
     full_name = Column(String(255))
     first_name = Column(String(255))
     middle_name = Column(String(255))
@@ -152,14 +456,13 @@ class Sponsorship(Base):
     party = Column(String(1))
     state = Column(String(2))
     district = Column(String(3))
-    sponsorship_date = Column(Date)
-    is_original_cosponsor = Column(Boolean)
-    sponsorship_withdrawn_date = Column(Date)
+    chamber = Column(String(6))
+    ext_update_date = Column(DateTime)
+    update_date = Column(DateTime)
 
     def __init__(self, bioguide_id=None, full_name=None, first_name=None,
                  middle_name=None, last_name=None, party=None, state=None,
-                 district=None, sponsorship_date=None,
-                 is_original_cosponsor=None, sponsorship_withdrawn_date=None):
+                 district=None, chamber=None):
         self.bioguide_id = bioguide_id
         self.full_name = full_name
         self.first_name = first_name
@@ -168,6 +471,36 @@ class Sponsorship(Base):
         self.party = party
         self.state = state
         self.district = district
+        self.chamber = chamber
+
+    def __repr__(self):
+        return '{}'.format(self.full_name or self.bioguide_id)
+
+
+class Sponsorship(Base):
+    """
+    One member sponsoring or cosponsoring a bill (or an amendment). Who the
+    member is lives in Member.
+    """
+    __tablename__ = 'sponsorship'
+    sponsorship_id = Column(Integer, primary_key=True)
+    bill_id = Column(Integer, ForeignKey('bill.bill_id'), index=True)
+    amendment_id = Column(Integer, ForeignKey('amendment.amendment_id'),
+                          index=True)
+    bioguide_id = Column(String(7), ForeignKey('member.bioguide_id'),
+                         nullable=False, index=True)
+    is_sponsor = Column(Boolean, default=False)
+    sponsorship_date = Column(Date)
+    is_original_cosponsor = Column(Boolean)
+    sponsorship_withdrawn_date = Column(Date)
+
+    def __init__(self, bioguide_id=None, sponsorship_date=None,
+                 is_original_cosponsor=None, sponsorship_withdrawn_date=None,
+                 bill_id=None, is_sponsor=False, amendment_id=None):
+        self.bill_id = bill_id
+        self.amendment_id = amendment_id
+        self.bioguide_id = bioguide_id
+        self.is_sponsor = is_sponsor
         self.sponsorship_date = sponsorship_date
         self.is_original_cosponsor = is_original_cosponsor
         self.sponsorship_withdrawn_date = sponsorship_withdrawn_date
@@ -175,15 +508,185 @@ class Sponsorship(Base):
 
 class Subjects(Base):
     __tablename__ = 'subject'
+    subject_id = Column(Integer, primary_key=True)
 
 
 class PolicyArea(Base):
     __tablename__ = 'policy_area'
+    policy_area_id = Column(Integer, primary_key=True)
 
 
 class Titles(Base):
     __tablename__ = 'title'
+    title_id = Column(Integer, primary_key=True)
 
 
 class Amendment(Base):
+    """
+    An amendment. bill_id is the bill it amends and amended_amendment_id the
+    amendment it amends, when either is in the database. Its actions and
+    sponsors are Actions and Sponsorship rows with amendment_id set.
+    """
     __tablename__ = 'amendment'
+    __table_args__ = (
+        Index('ix_amendment_congress_type_number', 'congress',
+              'amendment_type', 'amendment_number', unique=True),
+    )
+    amendment_id = Column(Integer, primary_key=True)
+    congress = Column(Integer, nullable=False)
+    amendment_type = Column(String(7), nullable=False)
+    amendment_number = Column(Integer, nullable=False)
+    bill_id = Column(Integer, ForeignKey('bill.bill_id'), index=True)
+    amended_amendment_id = Column(Integer,
+                                  ForeignKey('amendment.amendment_id'),
+                                  index=True)
+    chamber = Column(String(6))
+    description = Column(String(4000))
+    purpose = Column(String(4000))
+    proposed_date = Column(DateTime)
+    submitted_date = Column(Date)
+    latest_action_date = Column(Date)
+    latest_action_text = Column(String(4000))
+    ext_update_date = Column(DateTime)
+    create_date = Column(DateTime)
+    update_date = Column(DateTime)
+
+    def __init__(self, congress=None, amendment_type=None,
+                 amendment_number=None, bill_id=None):
+        self.congress = congress
+        self.amendment_type = amendment_type
+        self.amendment_number = amendment_number
+        self.bill_id = bill_id
+
+    def __repr__(self):
+        return '{} {} {}'.format(self.congress, self.amendment_type,
+                                 self.amendment_number)
+
+
+class Nomination(Base):
+    """
+    A presidential nomination. Its actions are Actions rows with
+    nomination_id set, its nominees are in Nominee and its committee
+    referrals in NominationCommittee.
+    """
+    __tablename__ = 'nomination'
+    __table_args__ = (
+        Index('ix_nomination_congress_number', 'congress', 'number',
+              unique=True),
+    )
+    nomination_id = Column(Integer, primary_key=True)
+    congress = Column(Integer, nullable=False)
+    number = Column(Integer, nullable=False)
+    citation = Column(String(20))
+    description = Column(String(4000))
+    organization = Column(String(255))
+    received_date = Column(Date)
+    authority_date = Column(Date)
+    is_privileged = Column(Boolean)
+    is_civilian = Column(Boolean)
+    latest_action_date = Column(Date)
+    latest_action_text = Column(String(4000))
+    ext_update_date = Column(DateTime)
+    create_date = Column(DateTime)
+    update_date = Column(DateTime)
+
+    def __init__(self, congress=None, number=None, citation=None):
+        self.congress = congress
+        self.number = number
+        self.citation = citation
+
+    def __repr__(self):
+        return '{} {}'.format(self.congress, self.citation)
+
+
+class Nominee(Base):
+    """
+    One person nominated to one position in a nomination. ordinal is the
+    position's number within the nomination.
+    """
+    __tablename__ = 'nominee'
+    nominee_id = Column(Integer, primary_key=True)
+    nomination_id = Column(Integer, ForeignKey('nomination.nomination_id'),
+                           nullable=False, index=True)
+    ordinal = Column(Integer, nullable=False)
+    position_title = Column(String(1024))
+    organization = Column(String(255))
+    first_name = Column(String(255))
+    middle_name = Column(String(255))
+    last_name = Column(String(255))
+    prefix = Column(String(50))
+    suffix = Column(String(50))
+    state = Column(String(2))
+    effective_date = Column(Date)
+    predecessor_name = Column(String(255))
+
+    def __init__(self, nomination_id=None, ordinal=None, position_title=None,
+                 organization=None, first_name=None, middle_name=None,
+                 last_name=None, prefix=None, suffix=None, state=None,
+                 effective_date=None, predecessor_name=None):
+        self.nomination_id = nomination_id
+        self.ordinal = ordinal
+        self.position_title = position_title
+        self.organization = organization
+        self.first_name = first_name
+        self.middle_name = middle_name
+        self.last_name = last_name
+        self.prefix = prefix
+        self.suffix = suffix
+        self.state = state
+        self.effective_date = effective_date
+        self.predecessor_name = predecessor_name
+
+    def __repr__(self):
+        return '{} {}'.format(self.first_name, self.last_name)
+
+
+class NominationCommittee(Base):
+    __tablename__ = 'nomination_committee'
+    nomination_committee_id = Column(Integer, primary_key=True)
+    nomination_id = Column(Integer, ForeignKey('nomination.nomination_id'),
+                           nullable=False, index=True)
+    committee_id = Column(Integer, ForeignKey('committee.committee_id'),
+                          index=True)
+    activity_name = Column(String(255), nullable=False)
+    activity_date = Column(Date)
+
+    def __init__(self, nomination_id=None, committee_id=None,
+                 activity_name=None, activity_date=None):
+        self.nomination_id = nomination_id
+        self.committee_id = committee_id
+        self.activity_name = activity_name
+        self.activity_date = activity_date
+
+
+class BillText(Base):
+    """
+    The plain text of one of a bill's text versions, as pipeline.texts
+    downloaded it. digest is a hash of the text, so a reload can tell
+    whether anything changed.
+    """
+    __tablename__ = 'bill_text'
+    __table_args__ = (
+        Index('ix_bill_text_bill_version_format', 'bill_id', 'version_type',
+              'text_format', unique=True),
+    )
+    bill_text_id = Column(Integer, primary_key=True)
+    bill_id = Column(Integer, ForeignKey('bill.bill_id'), nullable=False)
+    version_type = Column(String(100), nullable=False)
+    version_date = Column(DateTime)
+    text_format = Column(String(50), nullable=False)
+    text = Column(Text)
+    digest = Column(String(40))
+    update_date = Column(DateTime)
+
+    def __init__(self, bill_id=None, version_type=None, version_date=None,
+                 text_format=None, text=None, digest=None):
+        self.bill_id = bill_id
+        self.version_type = version_type
+        self.version_date = version_date
+        self.text_format = text_format
+        self.text = text
+        self.digest = digest
+
+    def __repr__(self):
+        return 'BillText {} {}'.format(self.bill_id, self.version_type)
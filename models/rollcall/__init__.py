@@ -0,0 +1,5 @@
+"""
+Connectors for roll call votes. The Congress.gov API doesn't carry them, so
+these read the XML files each chamber publishes: the House Clerk's at
+clerk.house.gov and the Senate's LIS files at senate.gov.
+"""
@@ -0,0 +1,196 @@
+"""
+Classes in this module fetch and parse a single roll call vote from the
+House Clerk or the Senate. Both hand back the same shape of data through
+their metadata and positions properties, so the rest of the code doesn't
+have to care which chamber a vote came from.
+
+    from models.rollcall.votes import houseVote
+    vote = houseVote(congress=117, session=1, roll_num=10)
+    vote.metadata['question'], len(vote.positions)
+"""
+import datetime
+import re
+import xml.etree.ElementTree as ElementTree
+from APIConnectors import baseAPI
+from settings import CURRENT_CONGRESS
+
+BILL_TYPES = ('hr', 'hres', 'hjres', 'hconres', 's', 'sres', 'sjres',
+              'sconres')
+BILL_REFERENCE = re.compile(r'^({})(\d+)$'.format('|'.join(BILL_TYPES)))
+
+
+def congress_year(congress, session):
+    """
+    The calendar year a session of congress sat in, e.g. the 117th's first
+    session was 2021.
+    """
+    return 1787 + 2 * congress + (session - 1)
+
+
+def parse_bill_reference(text):
+    """
+    Turns 'H R 1234', 'H.R.' + '1234', 'S.J.Res. 5' and the like into
+    ('hr', 1234). Returns None for things that aren't bills (quorum calls,
+    nominations, the Journal, etc.).
+    """
+    if not text:
+        return None
+    compact = re.sub(r'[\s.]', '', text).lower()
+    match = BILL_REFERENCE.match(compact)
+    if not match:
+        return None
+    return match.group(1), int(match.group(2))
+
+
+class rollCallVote(baseAPI):
+    """
+    Base class for one roll call vote file. Subclasses set the url and know
+    how to read their chamber's XML.
+
+    Available properties: metadata, positions, bill_reference
+    """
+    chamber = None
+
+    def __init__(self, congress=None, session=None, roll_num=None):
+        super().__init__()
+        self._max_congress = CURRENT_CONGRESS
+        self.congress = congress
+        self.session = session
+        self.roll_num = roll_num
+        self._root = None
+
+    @property
+    def params(self):
+        """
+        The vote files are static XML and don't take the API's parameters.
+        """
+        return dict()
+
+    @property
+    def root(self):
+        if self._root is None:
+            response = self.call(self.url)
+            response.raise_for_status()
+            self._root = ElementTree.fromstring(response.content)
+        return self._root
+
+    def _text(self, path):
+        element = self.root.find(path)
+        if element is None or element.text is None:
+            return None
+        return element.text.strip()
+
+    @property
+    def metadata(self):
+        """
+        dict with chamber, congress, session, roll_number, date, question,
+        result, url and bill (a (bill_type, bill_num) tuple or None).
+        """
+        return {'chamber': self.chamber,
+                'congress': self.congress,
+                'session': self.session,
+                'roll_number': self.roll_num,
+                'date': self.date,
+                'question': self.question,
+                'result': self.result,
+                'url': self.url,
+                'bill': self.bill_reference}
+
+
+class houseVote(rollCallVote):
+    """
+    A roll call vote from the House Clerk.
+    """
+    chamber = 'house'
+
+    def __init__(self, congress=None, session=None, roll_num=None, url=None):
+        super().__init__(congress=congress, session=session,
+                         roll_num=roll_num)
+        self._url = url or (
+            'https://clerk.house.gov/evs/{}/roll{:03d}.xml'.format(
+                congress_year(congress, session), roll_num))
+
+    @property
+    def date(self):
+        day = self._text('vote-metadata/action-date')
+        time = self._text('vote-metadata/action-time') or '12:00 PM'
+        return datetime.datetime.strptime('{} {}'.format(day, time),
+                                          '%d-%b-%Y %I:%M %p')
+
+    @property
+    def question(self):
+        return self._text('vote-metadata/vote-question')
+
+    @property
+    def result(self):
+        return self._text('vote-metadata/vote-result')
+
+    @property
+    def bill_reference(self):
+        return parse_bill_reference(self._text('vote-metadata/legis-num'))
+
+    @property
+    def positions(self):
+        """
+        List of dicts with member_id (bioguide), name, party, state and
+        vote, one per member.
+        """
+        positions = list()
+        for record in self.root.iterfind('vote-data/recorded-vote'):
+            legislator = record.find('legislator')
+            positions.append({'member_id': legislator.get('name-id'),
+                              'name': legislator.get('unaccented-name'),
+                              'party': legislator.get('party'),
+                              'state': legislator.get('state'),
+                              'vote': record.findtext('vote', '').strip()})
+        return positions
+
+
+class senateVote(rollCallVote):
+    """
+    A roll call vote from the Senate's LIS files.
+    """
+    chamber = 'senate'
+
+    def __init__(self, congress=None, session=None, roll_num=None, url=None):
+        super().__init__(congress=congress, session=session,
+                         roll_num=roll_num)
+        self._url = url or (
+            'https://www.senate.gov/legislative/LIS/roll_call_votes/'
+            'vote{0}{1}/vote_{0}_{1}_{2:05d}.xml'.format(congress, session,
+                                                         roll_num))
+
+    @property
+    def date(self):
+        text = ' '.join(self._text('vote_date').split())
+        return datetime.datetime.strptime(text, '%B %d, %Y, %I:%M %p')
+
+    @property
+    def question(self):
+        return self._text('vote_question_text') or self._text('question')
+
+    @property
+    def result(self):
+        return self._text('vote_result')
+
+    @property
+    def bill_reference(self):
+        document_type = self._text('document/document_type') or ''
+        number = self._text('document/document_number') or ''
+        return parse_bill_reference(document_type + number)
+
+    @property
+    def positions(self):
+        """
+        List of dicts with member_id (LIS id), name, party, state and vote,
+        one per senator.
+        """
+        positions = list()
+        for member in self.root.iterfind('members/member'):
+            positions.append({'member_id': member.findtext('lis_member_id'),
+                              'name': member.findtext('member_full'),
+                              'party': member.findtext('party'),
+                              'state': member.findtext('state'),
+                              'vote': member.findtext('vote_cast', '')
+                              .strip()})
+        return positions
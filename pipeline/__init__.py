@@ -0,0 +1,5 @@
+"""
+Modules in this package move legislation data in bulk: crawling the API,
+loading the database and writing exports. They build on the single-object
+connectors in models.cdg rather than calling the API themselves.
+"""
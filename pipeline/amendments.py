@@ -0,0 +1,132 @@
+"""
+Loads amendments from the Congress.gov API into the Amendment table, along
+with their actions and sponsors (as Actions and Sponsorship rows carrying an
+amendment_id instead of a bill_id).
+
+Amendments are fetched with legislation.amendments(), so a congress is
+crawled on a bounded thread pool the same way bills are, and
+sync_amendments() is incremental in the same way as sync_congress():
+
+    from database import db_session
+    from pipeline.amendments import sync_amendments
+    sync_amendments(db_session, 117)
+
+Each amendment is linked to the bill it amends when that bill is already
+loaded, so sync bills first. An amendment to an amendment that hasn't been
+loaded yet is linked the next time it's loaded.
+"""
+import datetime
+import logging
+from models.cdg.legislation import amendments, list_amendments
+from models.db.models import Actions, Amendment, Bill, Sponsorship
+from pipeline.bills import (action_row, ensure_members, parse_date,
+                            parse_datetime, sponsorship_row,
+                            sync_checkpointed)
+from pipeline.members import MEMBER_ROSTER
+
+logger = logging.getLogger(__name__)
+
+
+def _amended_bill_id(session, data):
+    source = data.get('amendedBill')
+    if not source:
+        return None
+    row = (session.query(Bill.bill_id)
+           .filter_by(congress=int(source['congress']),
+                      bill_type=source['type'].lower(),
+                      bill_number=str(source['number']))
+           .one_or_none())
+    return row.bill_id if row else None
+
+
+def _amended_amendment_id(session, data):
+    source = data.get('amendedAmendment')
+    if not source:
+        return None
+    row = (session.query(Amendment.amendment_id)
+           .filter_by(congress=int(source['congress']),
+                      amendment_type=source['type'].lower(),
+                      amendment_number=int(source['number']))
+           .one_or_none())
+    return row.amendment_id if row else None
+
+
+def load_amendment(session, amendment_obj, roster=None):
+    """
+    Writes one amendment (a legislation.amendment that has been fetched) to
+    the database, replacing its actions and sponsors. Doesn't commit. New
+    sponsors and cosponsors are looked up in roster, if given (see
+    pipeline.bills.ensure_members).
+    """
+    data = amendment_obj.data['amendment']
+    congress = int(data['congress'])
+    amendment_type = data['type'].lower()
+    amendment_number = int(data['number'])
+    row = (session.query(Amendment)
+           .filter_by(congress=congress, amendment_type=amendment_type,
+                      amendment_number=amendment_number)
+           .one_or_none())
+    now = datetime.datetime.utcnow()
+    if row is None:
+        row = Amendment(congress=congress, amendment_type=amendment_type,
+                        amendment_number=amendment_number)
+        row.create_date = now
+        session.add(row)
+    latest = data.get('latestAction') or dict()
+    row.bill_id = _amended_bill_id(session, data)
+    row.amended_amendment_id = _amended_amendment_id(session, data)
+    row.chamber = (data.get('chamber') or '').lower() or None
+    row.description = data.get('description')
+    row.purpose = data.get('purpose')
+    row.proposed_date = parse_datetime(data.get('proposedDate'))
+    row.submitted_date = parse_date(data.get('submittedDate'))
+    row.latest_action_date = parse_date(latest.get('actionDate'))
+    row.latest_action_text = latest.get('text')
+    row.ext_update_date = parse_datetime(data.get('updateDate'))
+    row.update_date = now
+    session.flush()
+
+    session.query(Actions).filter_by(
+        amendment_id=row.amendment_id).delete()
+    if 'actions' in data:
+        session.add_all(action_row(None, item,
+                                   amendment_id=row.amendment_id)
+                        for item in amendment_obj.actions)
+
+    session.query(Sponsorship).filter_by(
+        amendment_id=row.amendment_id).delete()
+    sponsors = data.get('sponsors') or list()
+    cosponsors = (list(amendment_obj.cosponsors) if 'cosponsors' in data
+                  else list())
+    ensure_members(session, sponsors + cosponsors, congress=congress,
+                   roster=roster)
+    session.add_all(sponsorship_row(None, item, is_sponsor=True,
+                                    amendment_id=row.amendment_id)
+                    for item in sponsors)
+    session.add_all(sponsorship_row(None, item,
+                                    amendment_id=row.amendment_id)
+                    for item in cosponsors)
+    session.flush()
+    return row
+
+
+def sync_amendments(session, congress, since=None, max_workers=8,
+                    roster=None):
+    """
+    Loads every amendment in a congress that changed since the last
+    successful sync (or since the since timestamp, if given), committing as
+    it goes. The checkpoint only moves forward when every amendment loaded.
+    Sponsors are looked up in roster, MEMBER_ROSTER by default. Returns a
+    dict of loaded and failed counts.
+    """
+    roster = roster or MEMBER_ROSTER
+
+    def fetch(since):
+        return amendments(congress, list_amendments(congress, since=since),
+                          max_workers=max_workers, cached=False)
+
+    return sync_checkpointed(
+        session, 'amendments-{}'.format(congress), fetch,
+        lambda amendment_obj: load_amendment(session, amendment_obj,
+                                             roster=roster),
+        since=since)
@@ -0,0 +1,383 @@
+"""
+Loads bills from the Congress.gov API into the database: the Bill row, its
+actions and its sponsor and cosponsors, followed by its BillStatus.
+
+sync_congress() is incremental. It remembers (in SyncCheckpoint) when the
+last complete sync of a congress started and next time only asks the API for
+bills updated since then. Bills whose content didn't actually change
+aren't rewritten (see pipeline.changes):
+
+    from database import db_session
+    from pipeline.bills import sync_congress
+    sync_congress(db_session, 117)
+"""
+import datetime
+import logging
+from collections import defaultdict
+from sqlalchemy import tuple_
+from models.cdg.legislation import bills, list_bills
+from models.db.models import (Actions, Bill, ChangeFeed, Member, Related,
+                              Sponsorship, SyncCheckpoint)
+from pipeline.changes import content_digest, record_changes
+from pipeline.history import record_version
+from pipeline.status import refresh_status
+
+logger = logging.getLogger(__name__)
+
+TIMESTAMP_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+# Up to this many related bills in a congress are looked up by key, past it
+# the whole congress is read instead
+RELATED_LOOKUP_BATCH = 500
+# Related rows worked out here rather than listed by the API (see
+# analysis.similarity); reloading a bill leaves them alone
+DERIVED_RELATIONS = ('minhash',)
+
+
+def parse_date(value):
+    """
+    Turns the API's '2021-03-02' or '2021-03-02T17:27:07Z' into a date.
+    """
+    if not value:
+        return None
+    return datetime.date.fromisoformat(value[:10])
+
+
+def parse_datetime(value):
+    if not value:
+        return None
+    if len(value) == 10:
+        return datetime.datetime.fromisoformat(value)
+    return datetime.datetime.strptime(value[:19], '%Y-%m-%dT%H:%M:%S')
+
+
+def get_checkpoint(session, name):
+    row = session.get(SyncCheckpoint, name)
+    return row.value if row else None
+
+
+def set_checkpoint(session, name, value):
+    row = session.get(SyncCheckpoint, name)
+    if row is None:
+        row = SyncCheckpoint(name=name)
+        session.add(row)
+    row.value = value
+    row.update_date = datetime.datetime.utcnow()
+
+
+def action_row(bill_id, item, amendment_id=None, nomination_id=None):
+    source = item.get('sourceSystem') or dict()
+    return Actions(bill_id=bill_id,
+                   amendment_id=amendment_id,
+                   nomination_id=nomination_id,
+                   action_date=parse_date(item.get('actionDate')),
+                   action_text=item.get('text'),
+                   action_type=item.get('type'),
+                   action_code=item.get('actionCode'),
+                   source_system_code=source.get('code'),
+                   source_system_name=source.get('name'))
+
+
+def member_name(last_name, first_name=None, middle_name=None):
+    """
+    A member's full name as the member list gives it, 'Last, First Middle'.
+    Member.full_name is kept in this form whichever source a row came from.
+    """
+    if not last_name:
+        return None
+    first_names = ' '.join(name for name in (first_name, middle_name) if name)
+    if not first_names:
+        return last_name
+    return '{}, {}'.format(last_name, first_names)
+
+
+def sponsor_details(item):
+    """
+    Member column values from the member details the API puts on a sponsor
+    or cosponsor.
+    """
+    return {'bioguide_id': item.get('bioguideId'),
+            'full_name': member_name(item.get('lastName'),
+                                     item.get('firstName'),
+                                     item.get('middleName')),
+            'first_name': item.get('firstName'),
+            'middle_name': item.get('middleName'),
+            'last_name': item.get('lastName'),
+            'party': item.get('party'),
+            'state': item.get('state'),
+            'district': (str(item['district'])
+                         if item.get('district') is not None else None)}
+
+
+def ensure_members(session, items, congress=None, roster=None):
+    """
+    Adds a Member for each sponsor or cosponsor in items that isn't in the
+    database yet, and fills in any details missing from the ones that are,
+    with one query for the lot. Given a congress and a roster (see
+    pipeline.members.MEMBER_ROSTER), details come from the roster first and
+    from the sponsor details only for members it doesn't have. Details
+    already stored are left alone; pipeline.members keeps them up to date.
+    """
+    items = {item['bioguideId']: item for item in items
+             if item.get('bioguideId')}
+    if not items:
+        return 0
+    known = {row.bioguide_id: row for row in session.query(Member)
+             .filter(Member.bioguide_id.in_(list(items)))}
+    added = 0
+    for bioguide_id, item in items.items():
+        details = None
+        if roster is not None and congress is not None:
+            details = roster.get(bioguide_id, congress)
+        details = details or sponsor_details(item)
+        row = known.get(bioguide_id)
+        if row is None:
+            row = Member(bioguide_id=bioguide_id)
+            session.add(row)
+            added += 1
+        for column, value in details.items():
+            if getattr(row, column) is None:
+                setattr(row, column, value)
+    return added
+
+
+def sponsorship_row(bill_id, item, is_sponsor=False, amendment_id=None):
+    return Sponsorship(
+        bill_id=bill_id,
+        amendment_id=amendment_id,
+        is_sponsor=is_sponsor,
+        bioguide_id=item.get('bioguideId'),
+        sponsorship_date=parse_date(item.get('sponsorshipDate')),
+        is_original_cosponsor=item.get('isOriginalCosponsor'),
+        sponsorship_withdrawn_date=parse_date(
+            item.get('sponsorshipWithdrawnDate')))
+
+
+def related_keys(items):
+    """
+    (congress, bill_type, bill_number, relationship_type, identified_by)
+    for each relationship in a bill's relatedBills items.
+    """
+    keys = list()
+    for item in items:
+        for detail in item.get('relationshipDetails') or list():
+            keys.append((int(item['congress']), item['type'].lower(),
+                         str(item['number']), detail.get('type'),
+                         detail.get('identifiedBy')))
+    return keys
+
+
+def _bill_ids(session, keys):
+    """
+    bill_id for each (congress, bill_type, bill_number) in keys that's in
+    the database. A congress with a lot of keys is read in one go.
+    """
+    by_congress = defaultdict(set)
+    for congress, bill_type, number in keys:
+        by_congress[congress].add((bill_type, number))
+    found = dict()
+    for congress, pairs in by_congress.items():
+        query = (session.query(Bill.bill_id, Bill.congress, Bill.bill_type,
+                               Bill.bill_number)
+                 .filter(Bill.congress == congress))
+        if len(pairs) <= RELATED_LOOKUP_BATCH:
+            query = query.filter(tuple_(Bill.bill_type,
+                                        Bill.bill_number).in_(list(pairs)))
+        for row in query:
+            found[row.congress, row.bill_type, row.bill_number] = row.bill_id
+    return found
+
+
+def load_related(session, related):
+    """
+    Replaces the Related rows for each bill_id in related (a dict of
+    bill_id to related_keys()) with the ones whose other bill is in the
+    database. Relationships to bills that aren't loaded yet are skipped;
+    they're written from the other side when that bill loads. Returns the
+    number of rows written.
+    """
+    if not related:
+        return 0
+    bill_ids = _bill_ids(session, {key[:3] for keys in related.values()
+                                   for key in keys})
+    (session.query(Related)
+     .filter(Related.bill_id_1.in_(list(related)),
+             Related.identified_by.notin_(DERIVED_RELATIONS))
+     .delete(synchronize_session=False))
+    written = 0
+    missing = 0
+    for bill_id, keys in related.items():
+        for congress, bill_type, number, kind, identified_by in keys:
+            other = bill_ids.get((congress, bill_type, number))
+            if other is None:
+                missing += 1
+                continue
+            session.add(Related(bill_id, other, kind or 'Related bill',
+                                identified_by or 'unknown'))
+            written += 1
+    if missing:
+        logger.debug('Skipped {} related bills that aren\'t loaded'.format(
+            missing))
+    return written
+
+
+def load_bill(session, bill_obj, run_id=None, force=False, roster=None):
+    """
+    Writes one bill (a legislation.bill that has been fetched) to the
+    database and refreshes its BillStatus. Doesn't commit.
+
+    The bill's fields, actions, cosponsors and related bills are each hashed
+    (see pipeline.changes) and only the parts whose hash changed since the
+    last load are replaced, with a ChangeFeed row under run_id for each.
+    force rewrites every part regardless. When anything changed, the whole
+    record is also kept as a new version in the bill's history (see
+    pipeline.history). New sponsors and cosponsors are looked up in roster,
+    if given (see ensure_members).
+    """
+    data = bill_obj.data['bill']
+    congress = int(data['congress'])
+    bill_type = data['type'].lower()
+    bill_number = str(data['number'])
+    actions = list(bill_obj.actions) if 'actions' in data else list()
+    sponsors = data.get('sponsors') or list()
+    cosponsors = list(bill_obj.cosponsors) if 'cosponsors' in data else list()
+    digests = {'bill': content_digest(data),
+               'actions': content_digest(actions),
+               'cosponsors': content_digest(cosponsors)}
+    record = {'bill': data, 'actions': actions, 'cosponsors': cosponsors}
+    if 'relatedBills' in data:
+        related = list(bill_obj.related_bills)
+        digests['related'] = content_digest(related)
+        record['relatedBills'] = related
+
+    row = (session.query(Bill)
+           .filter_by(congress=congress, bill_type=bill_type,
+                      bill_number=bill_number)
+           .one_or_none())
+    now = datetime.datetime.utcnow()
+    update_date = parse_datetime(data.get('updateDate'))
+    if row is None:
+        row = Bill(congress=congress, bill_number=bill_number,
+                   bill_type=bill_type,
+                   introduced=parse_date(data.get('introducedDate')),
+                   ext_create=parse_datetime(data.get('createDate'))
+                   or update_date, ext_update=update_date)
+        row.create_date = now
+        session.add(row)
+        session.flush()
+    if 'related' not in digests and (
+            session.query(Related.related_id)
+            .filter(Related.bill_id_1 == row.bill_id,
+                    Related.identified_by.notin_(DERIVED_RELATIONS))
+            .first() is not None):
+        # The API has stopped listing the bill's related bills, so the ones
+        # loaded before are replaced with none
+        related = list()
+        digests['related'] = content_digest(related)
+    changed = record_changes(session, 'bill', row.bill_id, digests, run_id,
+                             force)
+    # Kept in step with the API even when nothing else changed, since
+    # updated-since queries go by it
+    row.ext_update_date = update_date
+    if not changed:
+        return row
+    record_version(session, row.bill_id, record, update_date)
+    row.update_date = now
+    if 'bill' in changed:
+        row.introduced_date = parse_date(data.get('introducedDate'))
+    session.flush()
+
+    if 'actions' in changed:
+        session.query(Actions).filter_by(bill_id=row.bill_id).delete()
+        session.add_all(action_row(row.bill_id, item) for item in actions)
+
+    if 'bill' in changed or 'cosponsors' in changed:
+        session.query(Sponsorship).filter_by(bill_id=row.bill_id).delete()
+        ensure_members(session, sponsors + cosponsors, congress=congress,
+                       roster=roster)
+        session.add_all(sponsorship_row(row.bill_id, item, is_sponsor=True)
+                        for item in sponsors)
+        session.add_all(sponsorship_row(row.bill_id, item)
+                        for item in cosponsors)
+    if 'related' in changed:
+        load_related(session, {row.bill_id: related_keys(related)})
+    session.flush()
+    if 'bill' in changed or 'actions' in changed:
+        refresh_status(session, [row.bill_id])
+    return row
+
+
+def sync_checkpointed(session, checkpoint, fetch, load, since=None,
+                      started=None, on_error=None):
+    """
+    The loop behind the sync_* functions. fetch(since) yields batch results,
+    (key, object, error) tuples such as the ones bills() yields, for
+    everything that changed since the checkpoint (or since the since
+    timestamp, if given). load(object) writes one of them without
+    committing. Each object is committed on its own and rolled back if it
+    fails to load, after which on_error(), if given, is called. The
+    checkpoint only moves forward to started (now by default) when every
+    object loaded, so failures get picked up again next time. Returns a
+    dict of loaded and failed counts.
+    """
+    since = since or get_checkpoint(session, checkpoint)
+    started = started or datetime.datetime.utcnow().strftime(
+        TIMESTAMP_FORMAT)
+    logger.info('Syncing {} since {}'.format(checkpoint, since))
+    loaded = 0
+    failed = 0
+    for key, obj, error in fetch(since):
+        if error is not None:
+            failed += 1
+            continue
+        try:
+            load(obj)
+            session.commit()
+            loaded += 1
+        except Exception as error:
+            session.rollback()
+            if on_error is not None:
+                on_error()
+            logger.warning('Could not load {} {}: {}'.format(
+                checkpoint, ' '.join(str(part) for part in key), error))
+            failed += 1
+    if not failed:
+        set_checkpoint(session, checkpoint, started)
+        session.commit()
+    return {'loaded': loaded, 'failed': failed}
+
+
+def sync_congress(session, congress, since=None, max_workers=8,
+                  roster=None):
+    """
+    Loads every bill in a congress that changed since the last successful
+    sync (or since the since timestamp, if given), committing as it goes.
+    The checkpoint only moves forward when every bill loaded, so a failed
+    bill gets picked up again next time. Returns a dict of loaded, changed
+    (bills with at least one part that changed) and failed counts, and the
+    run_id their ChangeFeed rows are under. Sponsors are looked up in roster,
+    MEMBER_ROSTER by default.
+    """
+    if roster is None:
+        # pipeline.members imports from this module, so it can't be imported
+        # at the top
+        from pipeline.members import MEMBER_ROSTER as roster
+    checkpoint = 'bills-{}'.format(congress)
+    started = datetime.datetime.utcnow().strftime(TIMESTAMP_FORMAT)
+    run_id = '{}@{}'.format(checkpoint, started)
+
+    def fetch(since):
+        return bills(congress, list_bills(congress, since=since),
+                     max_workers=max_workers, cached=False)
+
+    totals = sync_checkpointed(
+        session, checkpoint, fetch,
+        lambda bill_obj: load_bill(session, bill_obj, run_id=run_id,
+                                   roster=roster),
+        since=since, started=started)
+    totals['changed'] = (session.query(ChangeFeed.resource_id)
+                         .filter(ChangeFeed.run_id == run_id)
+                         .distinct().count())
+    totals['run_id'] = run_id
+    logger.info('{} of {} bills changed'.format(totals['changed'],
+                                                totals['loaded']))
+    return totals
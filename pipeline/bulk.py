@@ -0,0 +1,223 @@
+"""
+Bootstraps the database from govinfo's BILLSTATUS bulk data instead of the
+API.
+
+govinfo publishes every bill's status as one XML file, zipped up per
+congress and bill type (https://www.govinfo.gov/bulkdata/BILLSTATUS).
+load_archives() reads those zips from disk. Members are parsed on a process
+pool, and the results are written to Bill, Actions, Sponsorship,
+BillCommittee (creating Committee rows as needed) and Related, through the
+same load_bill() the API sync uses. Once a congress has been bootstrapped
+this way, sync_congress() only has to fetch what changed since:
+
+    from database import db_session
+    from pipeline.bulk import load_archives
+    load_archives(db_session, ['BILLSTATUS-117-hr.zip',
+                               'BILLSTATUS-117-s.zip'])
+
+Each XML file is parsed with iterparse, and every section is cleared as
+soon as it has been read. Only a couple of files per worker are in flight at
+once, so memory stays flat however big the archive is.
+"""
+import logging
+import os
+import xml.etree.ElementTree as ET
+import zipfile
+from concurrent.futures import (FIRST_COMPLETED, ProcessPoolExecutor,
+                                wait)
+from itertools import islice
+from models.db.models import BillCommittee
+from pipeline.bills import load_bill, load_related, parse_date, related_keys
+from pipeline.committees import committee_cache
+
+logger = logging.getLogger(__name__)
+
+
+def _to_python(elem):
+    """
+    Turns an element into what the API would have sent as JSON: a list for
+    anything holding <item>s, a dict for anything else with children and a
+    string (or None) for leaves. Siblings of the items, like the old
+    layout's actionTypeCounts next to the actions, are summaries the API
+    doesn't send and are dropped.
+    """
+    children = list(elem)
+    if not children:
+        text = (elem.text or '').strip()
+        return text or None
+    if any(child.tag == 'item' for child in children):
+        return [_to_python(child) for child in children
+                if child.tag == 'item']
+    return {child.tag: _to_python(child) for child in children}
+
+
+def _as_list(value):
+    if isinstance(value, dict):
+        return [value]
+    return value or list()
+
+
+def _action(item):
+    source = item.get('sourceSystem')
+    if source and source.get('code') is not None:
+        source['code'] = int(source['code'])
+    return item
+
+
+def _sponsor(item):
+    for key in ('isOriginalCosponsor', 'isByRequest'):
+        if key in item:
+            item[key] = item[key] == 'True'
+    return item
+
+
+def parse_bill_status(source):
+    """
+    Parses one BILLSTATUS XML file (a path or file object) into a dict with
+    the bill's data in the API's shape under 'bill', plus its 'actions',
+    'cosponsors', 'committees' and 'related' as lists. Handles both the
+    original billNumber/billType layout and the current number/type one.
+    """
+    sections = dict()
+    stack = list()
+    for event, elem in ET.iterparse(source, events=('start', 'end')):
+        if event == 'start':
+            stack.append(elem.tag)
+            continue
+        stack.pop()
+        if stack == ['billStatus', 'bill']:
+            sections[elem.tag] = _to_python(elem)
+            elem.clear()
+        elif len(stack) < 2:
+            elem.clear()
+    committees = sections.get('committees')
+    if isinstance(committees, dict):
+        committees = committees.get('billCommittees')
+    actions = [_action(item) for item in _as_list(sections.get('actions'))]
+    cosponsors = [_sponsor(item)
+                  for item in _as_list(sections.get('cosponsors'))]
+    data = {'congress': sections.get('congress'),
+            'type': sections.get('type') or sections.get('billType'),
+            'number': sections.get('number') or sections.get('billNumber'),
+            'introducedDate': sections.get('introducedDate'),
+            'createDate': sections.get('createDate'),
+            'updateDate': sections.get('updateDate'),
+            'sponsors': [_sponsor(item)
+                         for item in _as_list(sections.get('sponsors'))],
+            'actions': {'count': len(actions)},
+            'cosponsors': {'count': len(cosponsors)}}
+    return {'bill': data, 'actions': actions, 'cosponsors': cosponsors,
+            'committees': _as_list(committees),
+            'related': _as_list(sections.get('relatedBills'))}
+
+
+def _parse_member(path, name):
+    with zipfile.ZipFile(path) as archive:
+        with archive.open(name) as source:
+            return parse_bill_status(source)
+
+
+def archive_members(path):
+    with zipfile.ZipFile(path) as archive:
+        return [name for name in archive.namelist()
+                if name.lower().endswith('.xml')]
+
+
+def read_archives(paths, max_workers=None):
+    """
+    Generator that parses every XML file in the zip archives at paths on a
+    process pool and yields (member name, record) tuples as they finish, or
+    (member name, exception) if a file couldn't be parsed.
+    """
+    members = ((path, name) for path in paths
+               for name in archive_members(path))
+    max_workers = max_workers or os.cpu_count() or 1
+    pending = dict()
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+
+        def submit(count):
+            for path, name in islice(members, count):
+                pending[pool.submit(_parse_member, path, name)] = name
+
+        submit(max_workers * 2)
+        while pending:
+            done, not_done = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    yield name, future.result()
+                except Exception as error:
+                    yield name, error
+            submit(len(done))
+
+
+class bulk_bill():
+    """
+    Wraps a parsed BILLSTATUS record so load_bill() can take it like a
+    fetched legislation.bill.
+    """
+    def __init__(self, record):
+        self.data = {'bill': record['bill']}
+        self.actions = record['actions']
+        self.cosponsors = record['cosponsors']
+
+
+def load_committee_activity(session, bill_id, committees, cache,
+                            update_date):
+    """
+    Replaces a bill's BillCommittee rows with one per committee and
+    subcommittee activity in a parsed record.
+    """
+    session.query(BillCommittee).filter_by(bill_id=bill_id).delete()
+    for item in committees:
+        committee_id = cache.committee_id(item, update_date,
+                                          chamber=item.get('chamber'))
+        for activity in _as_list(item.get('activities')):
+            session.add(BillCommittee(
+                bill_id, committee_id, activity.get('name'),
+                parse_date(activity.get('date'))))
+        for sub in _as_list(item.get('subcommittees')):
+            sub_id = cache.committee_id(sub, update_date,
+                                        parent_code=item['systemCode'],
+                                        chamber=item.get('chamber'))
+            for activity in _as_list(sub.get('activities')):
+                session.add(BillCommittee(
+                    bill_id, sub_id, activity.get('name'),
+                    parse_date(activity.get('date'))))
+
+
+def load_archives(session, paths, max_workers=None, batch_size=500):
+    """
+    Loads every bill in the BILLSTATUS zip archives at paths, committing
+    every batch_size bills. Each bill is loaded in a savepoint, so one that
+    fails is skipped without losing the rest of its batch. Related bills are
+    written once every bill is in, so relationships within the archives all
+    resolve. Returns a dict of bills, related and failed counts.
+    """
+    cache = committee_cache(session)
+    related = dict()
+    totals = {'bills': 0, 'related': 0, 'failed': 0}
+    for name, record in read_archives(paths, max_workers=max_workers):
+        if isinstance(record, Exception):
+            logger.warning('Could not parse {}: {}'.format(name, record))
+            totals['failed'] += 1
+            continue
+        try:
+            with session.begin_nested():
+                row = load_bill(session, bulk_bill(record))
+                load_committee_activity(
+                    session, row.bill_id, record['committees'], cache,
+                    (row.ext_update_date or row.update_date).date())
+        except Exception as error:
+            cache = committee_cache(session)
+            logger.warning('Could not load {}: {}'.format(name, error))
+            totals['failed'] += 1
+            continue
+        related[row.bill_id] = related_keys(record['related'])
+        totals['bills'] += 1
+        if totals['bills'] % batch_size == 0:
+            session.commit()
+    session.commit()
+    totals['related'] = load_related(session, related)
+    session.commit()
+    return totals
@@ -0,0 +1,91 @@
+"""
+Content hashes for loaded resources, and a feed of what actually changed.
+
+The API bumps updateDate on plenty of bills whose content hasn't changed, so
+an incremental sync fetches them again anyway. Before rewriting a part of a
+resource (a bill's own fields, its actions, cosponsors, related bills...)
+the loader hashes it and compares the hash with the one stored in
+ContentHash last time. Parts with the same hash aren't written again and
+nothing downstream of them is recomputed. Parts that did change get a
+ChangeFeed row tagged with the run that loaded them:
+
+    sync_congress(db_session, 117)['run_id']
+    change_feed(db_session, run_id)
+"""
+import datetime
+import hashlib
+import json
+from models.db.models import ChangeFeed, ContentHash
+
+# Keys whose values move without the content changing
+VOLATILE_KEYS = ('updateDate', 'updateDateIncludingText')
+
+
+def _is_envelope(value):
+    """
+    A {'count': ..., 'url': ...} pointer to a sub-list, which gets hashed on
+    its own.
+    """
+    return isinstance(value, dict) and 'url' in value and 'count' in value
+
+
+def _stable(value):
+    if isinstance(value, dict):
+        return {key: _stable(item) for key, item in value.items()
+                if key not in VOLATILE_KEYS and not _is_envelope(item)}
+    if isinstance(value, (list, tuple)):
+        return [_stable(item) for item in value]
+    return value
+
+
+def content_digest(value):
+    """
+    A stable hash of JSON-like data. Key order, volatile keys and sub-list
+    pointers don't affect it.
+    """
+    encoded = json.dumps(_stable(value), sort_keys=True,
+                         separators=(',', ':'), default=str)
+    return hashlib.sha1(encoded.encode('utf-8')).hexdigest()
+
+
+def record_changes(session, resource_type, resource_id, digests, run_id=None,
+                   force=False):
+    """
+    Compares a dict of part to digest with the stored hashes for a resource,
+    stores the new ones and adds a ChangeFeed row for each part that's new
+    or different. With force, every part counts as changed. Doesn't commit.
+    Returns a dict of changed part to 'added' or 'changed'.
+    """
+    stored = {row.part: row for row in session.query(ContentHash).filter_by(
+        resource_type=resource_type, resource_id=resource_id)}
+    now = datetime.datetime.utcnow()
+    changed = dict()
+    for part, digest in digests.items():
+        row = stored.get(part)
+        if row is None:
+            session.add(ContentHash(resource_type, resource_id, part, digest,
+                                    now))
+            changed[part] = 'added'
+        elif row.digest != digest or force:
+            row.digest = digest
+            row.update_date = now
+            changed[part] = 'changed'
+    for part, change_type in changed.items():
+        session.add(ChangeFeed(run_id, resource_type, resource_id, part,
+                               change_type, now))
+    return changed
+
+
+def change_feed(session, run_id=None, resource_type=None, since=None):
+    """
+    ChangeFeed rows for one run (or every run since a datetime), oldest
+    first.
+    """
+    query = session.query(ChangeFeed)
+    if run_id is not None:
+        query = query.filter(ChangeFeed.run_id == run_id)
+    if resource_type is not None:
+        query = query.filter(ChangeFeed.resource_type == resource_type)
+    if since is not None:
+        query = query.filter(ChangeFeed.change_date >= since)
+    return query.order_by(ChangeFeed.change_id).all()
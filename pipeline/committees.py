@@ -0,0 +1,325 @@
+"""
+Loads committees, subcommittees and committee reports from the Congress.gov
+API, and keeps an in-memory index of the committee hierarchy.
+
+sync_committees() crawls every congress from CMTE_RPRT_MIN_CONGRESS to
+CURRENT_CONGRESS, a few congresses at a time, into the Committee and
+CommitteeReport tables. Reports are incremental per congress, like bills.
+Once committees are loaded, committee_index.from_db() answers parent, child
+and ancestor questions without going back to the API, and rollup() adds a
+subcommittee's activity into every committee above it:
+
+    from database import db_session
+    from pipeline.committees import sync_committees, committee_activity
+    sync_committees(db_session)
+    committee_activity(db_session, congress=117)['hsju00']
+"""
+import datetime
+import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from models.cdg.committees import list_committees, list_committee_reports
+from models.db.models import (Bill, BillCommittee, Committee,
+                              CommitteeReport)
+from pipeline.bills import (TIMESTAMP_FORMAT, get_checkpoint, parse_date,
+                            parse_datetime, set_checkpoint)
+from settings import CMTE_RPRT_MIN_CONGRESS, CURRENT_CONGRESS
+
+logger = logging.getLogger(__name__)
+
+
+class committee_index():
+    """
+    Parent/child index over committee codes. Every lookup is a dict access,
+    and ancestors are walked in memory, so rolling activity up the hierarchy
+    costs nothing beyond the one query that builds the index.
+
+    Functions
+        add - adds a committee and its parent (if it has one).
+
+        from_rows, from_db - builds an index from Committee rows.
+
+        parent, children, ancestors, descendants, root - hierarchy lookups.
+
+        rollup - totals a per-committee count up the hierarchy.
+    """
+    def __init__(self):
+        self._parent = dict()
+        self._children = defaultdict(set)
+        self.names = dict()
+
+    def __len__(self):
+        return len(self._parent)
+
+    def __contains__(self, code):
+        return code in self._parent
+
+    def __iter__(self):
+        return iter(self._parent)
+
+    def add(self, code, parent_code=None, name=None):
+        old_parent = self._parent.get(code)
+        if old_parent is not None and old_parent != parent_code:
+            self._children[old_parent].discard(code)
+        self._parent[code] = parent_code
+        if parent_code is not None:
+            self._children[parent_code].add(code)
+            self._parent.setdefault(parent_code, None)
+        if name is not None:
+            self.names[code] = name
+
+    @classmethod
+    def from_rows(cls, rows):
+        index = cls()
+        for row in rows:
+            index.add(row.committee_code, row.parent_committee_code or None,
+                      row.name)
+        return index
+
+    @classmethod
+    def from_db(cls, session):
+        return cls.from_rows(session.query(
+            Committee.committee_code, Committee.parent_committee_code,
+            Committee.name))
+
+    def _check(self, code):
+        if code not in self._parent:
+            raise KeyError(code)
+
+    def parent(self, code):
+        self._check(code)
+        return self._parent[code]
+
+    def children(self, code):
+        self._check(code)
+        return sorted(self._children.get(code, ()))
+
+    def ancestors(self, code):
+        """
+        The committee's parent, grandparent and so on, nearest first.
+        """
+        self._check(code)
+        found = list()
+        parent = self._parent[code]
+        while parent is not None and parent not in found:
+            found.append(parent)
+            parent = self._parent.get(parent)
+        return found
+
+    def descendants(self, code):
+        """
+        Every subcommittee below the committee, at any depth.
+        """
+        self._check(code)
+        found = list()
+        stack = [code]
+        while stack:
+            for child in sorted(self._children.get(stack.pop(), ())):
+                if child not in found:
+                    found.append(child)
+                    stack.append(child)
+        return found
+
+    def root(self, code):
+        ancestors = self.ancestors(code)
+        return ancestors[-1] if ancestors else code
+
+    def rollup(self, counts):
+        """
+        Takes a mapping (or pandas Series) of committee code to a number and
+        returns a dict where each committee's total includes everything
+        recorded against its subcommittees. Codes the index doesn't know are
+        kept as they are.
+        """
+        totals = defaultdict(int)
+        for code, value in counts.items():
+            totals[code] += value
+            if code in self._parent:
+                for ancestor in self.ancestors(code):
+                    totals[ancestor] += value
+        return dict(totals)
+
+
+class committee_cache():
+    """
+    committee_code to committee_id for every committee in the database.
+    Committees a bill or nomination mentions that aren't there yet are
+    added.
+    """
+    def __init__(self, session):
+        self.session = session
+        self.reload()
+
+    def reload(self):
+        """
+        Rereads the ids from the database, e.g. after a rollback threw away
+        committees the cache added.
+        """
+        self.ids = {row.committee_code: row.committee_id for row in
+                    self.session.query(Committee.committee_code,
+                                       Committee.committee_id)}
+
+    def committee_id(self, item, update_date, parent_code=None, chamber=None):
+        code = item['systemCode']
+        if code not in self.ids:
+            row = Committee(committee_code=code,
+                            parent_committee_code=parent_code,
+                            name=item.get('name') or code,
+                            comm_type=item.get('type') or '',
+                            ext_update_date=update_date,
+                            chamber=(chamber or '').lower() or None)
+            self.session.add(row)
+            self.session.flush()
+            self.ids[code] = row.committee_id
+        return self.ids[code]
+
+
+def committee_activity(session, congress=None, activity_name=None,
+                       index=None):
+    """
+    Number of distinct bills with activity in each committee, rolled up so
+    that a full committee counts the bills its subcommittees handled too.
+    Pass activity_name (e.g. 'Referred To') to count one kind of activity.
+    """
+    index = index or committee_index.from_db(session)
+    query = (session.query(Committee.committee_code, BillCommittee.bill_id)
+             .join(BillCommittee,
+                   BillCommittee.committee_id == Committee.committee_id))
+    if congress is not None:
+        query = (query.join(Bill, Bill.bill_id == BillCommittee.bill_id)
+                 .filter(Bill.congress == congress))
+    if activity_name is not None:
+        query = query.filter(BillCommittee.activity_name == activity_name)
+    bill_sets = defaultdict(set)
+    for code, bill_id in query:
+        bill_sets[code].add(bill_id)
+        for ancestor in index.ancestors(code) if code in index else ():
+            bill_sets[ancestor].add(bill_id)
+    return {code: len(bill_ids) for code, bill_ids in bill_sets.items()}
+
+
+def _chamber(item):
+    chamber = item.get('chamber')
+    return chamber.lower() if chamber else None
+
+
+def _upsert_committee(session, rows, code, **values):
+    row = rows.get(code)
+    if row is None:
+        row = Committee(committee_code=code)
+        session.add(row)
+        rows[code] = row
+    for key, value in values.items():
+        if value is not None:
+            setattr(row, key, value)
+    return row
+
+
+def load_committees(session, items, current=False):
+    """
+    Writes committee list entries (and the subcommittees they list) to the
+    Committee table, updating committees already stored under the same code.
+    current says items is the current congress's full list, so the
+    committees in it are marked current and every other stored committee is
+    marked not current. Doesn't commit. Returns the number of committees
+    written.
+    """
+    rows = {row.committee_code: row for row in session.query(Committee)}
+    written = set()
+    for item in items:
+        parent = item.get('parent') or dict()
+        code = item['systemCode']
+        _upsert_committee(
+            session, rows, code,
+            parent_committee_code=parent.get('systemCode'),
+            name=item.get('name'), chamber=_chamber(item),
+            comm_type=item.get('committeeTypeCode'),
+            ext_update_date=parse_date(item.get('updateDate')))
+        written.add(code)
+        for sub in item.get('subcommittees') or ():
+            _upsert_committee(
+                session, rows, sub['systemCode'], parent_committee_code=code,
+                name=sub.get('name'), chamber=_chamber(item),
+                comm_type=item.get('committeeTypeCode'),
+                ext_update_date=parse_date(item.get('updateDate')))
+            written.add(sub['systemCode'])
+    for code, row in rows.items():
+        if current:
+            row.is_current = code in written
+        elif row.is_current is None:
+            row.is_current = False
+    return len(written)
+
+
+def load_committee_reports(session, items):
+    """
+    Writes committee report list entries to the CommitteeReport table,
+    replacing reports already stored under the same congress, type, number
+    and part. Doesn't commit. Returns the number of reports written.
+    """
+    items = list(items)
+    congresses = {int(item['congress']) for item in items}
+    rows = {(row.congress, row.report_type, row.report_number, row.part): row
+            for row in session.query(CommitteeReport)
+            .filter(CommitteeReport.congress.in_(congresses))}
+    written = 0
+    for item in items:
+        key = (int(item['congress']), item['type'].lower(),
+               int(item['number']), int(item.get('part') or 1))
+        row = rows.get(key)
+        if row is None:
+            congress, report_type, number, part = key
+            row = CommitteeReport(congress=congress, report_type=report_type,
+                                  report_number=number, part=part)
+            session.add(row)
+            rows[key] = row
+        row.chamber = _chamber(item)
+        row.citation = item.get('citation')
+        row.url = item.get('url')
+        row.ext_update_date = parse_datetime(item.get('updateDate'))
+        written += 1
+    return written
+
+
+def _crawl_congress(congress, since):
+    return (list(list_committees(congress=congress)),
+            list(list_committee_reports(congress, since=since)))
+
+
+def sync_committees(session, first=None, last=None, max_workers=4):
+    """
+    Loads every committee, subcommittee and committee report from first to
+    last congress (CMTE_RPRT_MIN_CONGRESS to CURRENT_CONGRESS by default),
+    fetching up to max_workers congresses at once and committing after each.
+    A congress's report checkpoint only moves forward when it loaded without
+    errors. Returns a dict of committees, reports and failed counts.
+    """
+    first = first or CMTE_RPRT_MIN_CONGRESS
+    last = last or CURRENT_CONGRESS
+    congresses = range(first, last + 1)
+    started = datetime.datetime.utcnow().strftime(TIMESTAMP_FORMAT)
+    checkpoints = {congress: get_checkpoint(
+        session, 'committee-reports-{}'.format(congress))
+        for congress in congresses}
+    totals = {'committees': 0, 'reports': 0, 'failed': 0}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [(congress, pool.submit(_crawl_congress, congress,
+                                          checkpoints[congress]))
+                   for congress in congresses]
+        for congress, future in futures:
+            try:
+                committees, reports = future.result()
+                totals['committees'] += load_committees(
+                    session, committees,
+                    current=congress == CURRENT_CONGRESS)
+                totals['reports'] += load_committee_reports(session, reports)
+                set_checkpoint(session,
+                               'committee-reports-{}'.format(congress),
+                               started)
+                session.commit()
+            except Exception as error:
+                session.rollback()
+                logger.warning('Could not load committees for the {} '
+                               'congress: {}'.format(congress, error))
+                totals['failed'] += 1
+    return totals
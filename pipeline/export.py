@@ -0,0 +1,133 @@
+"""
+Streams whole congresses out as newline-delimited JSON, one fully hydrated
+bill per line, for downstream ETL.
+
+Each bill is written the moment its worker finishes and is then dropped, so
+memory use depends on the number of workers rather than the size of the
+congress. Output can be gzip or zstd compressed and split across files:
+
+    from pipeline.export import ndjson_writer, export_congress
+
+    with ndjson_writer('out/bills-117-{part:04d}.ndjson',
+                       compression='gzip', max_lines=5000) as writer:
+        export_congress(117, writer)
+"""
+import gzip
+import json
+import logging
+import os
+from models.cdg.legislation import bills, list_bills
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIONS = {None: '', 'gzip': '.gz', 'zstd': '.zst'}
+
+
+class ndjson_writer():
+    """
+    Writes one JSON document per line, rotating to a new file once the
+    current one has max_lines records or max_bytes of (uncompressed) output.
+    path_template needs a {part} field if rotation is used, e.g.
+    'bills-{part:04d}.ndjson'; the compression's extension is added for you.
+    """
+    def __init__(self, path_template, compression=None, max_lines=None,
+                 max_bytes=None):
+        if compression not in COMPRESSIONS:
+            raise ValueError('{} is not a valid compression, use one of {}'
+                             .format(compression, list(COMPRESSIONS)))
+        if (max_lines or max_bytes) and '{part' not in path_template:
+            raise ValueError('path_template needs a {part} field to rotate')
+        self.path_template = path_template
+        self.compression = compression
+        self.max_lines = max_lines
+        self.max_bytes = max_bytes
+        self.files = list()
+        self.records = 0
+        self._file = None
+        self._lines = 0
+        self._bytes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _open(self):
+        path = (self.path_template.format(part=len(self.files))
+                + COMPRESSIONS[self.compression])
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if self.compression == 'gzip':
+            self._file = gzip.open(path, 'wb')
+        elif self.compression == 'zstd':
+            try:
+                import zstandard
+            except ImportError:
+                raise ImportError('zstd compression needs the zstandard '
+                                  'package, pip install zstandard')
+            self._raw = open(path, 'wb')
+            self._file = zstandard.ZstdCompressor().stream_writer(self._raw)
+        else:
+            self._file = open(path, 'wb')
+        self.files.append(path)
+        self._lines = 0
+        self._bytes = 0
+        logger.debug('Writing to {}'.format(path))
+
+    def _full(self):
+        return ((self.max_lines and self._lines >= self.max_lines)
+                or (self.max_bytes and self._bytes >= self.max_bytes))
+
+    def write(self, record):
+        line = json.dumps(record, separators=(',', ':'), default=str)
+        data = line.encode('utf-8') + b'\n'
+        if self._file is not None and self._full():
+            self.close()
+        if self._file is None:
+            self._open()
+        self._file.write(data)
+        self._lines += 1
+        self._bytes += len(data)
+        self.records += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            if self.compression == 'zstd':
+                self._raw.close()
+            self._file = None
+
+
+def bill_record(bill_obj):
+    """
+    The record written for a bill: the API's bill object with every
+    sub-resource list embedded. Expects fetch_all() to have been run.
+    """
+    return bill_obj.data['bill']
+
+
+def export_congress(congress, writer, bill_types=None, max_workers=8):
+    """
+    Writes every bill in a congress (or just the given bill types) to writer,
+    fully hydrated. Bills that fail are logged and skipped. Returns a dict of
+    written and failed counts.
+    """
+    def keys():
+        for bill_type in bill_types or [None]:
+            for key in list_bills(congress, bill_type):
+                yield key
+
+    written = 0
+    failed = 0
+    for result in bills(congress, keys(), max_workers=max_workers,
+                        cached=False, fetch_all=True):
+        if result.error is not None:
+            failed += 1
+            continue
+        writer.write(bill_record(result.bill))
+        written += 1
+    logger.info('Exported {} bills from the {} congress, {} failed'.format(
+        written, congress, failed))
+    return {'written': written, 'failed': failed}
@@ -0,0 +1,184 @@
+"""
+Every past version of a bill's record, stored as compressed deltas.
+
+load_bill() hands the whole record it loaded (the bill's fields plus its
+actions, cosponsors and related bills) to record_version() whenever any part
+of it changed. Most versions are stored as a delta against the version
+before: the keys set or removed, and lists patched by replacing the run of
+items between their common head and tail, so a new action costs one action.
+Every BILL_HISTORY_KEYFRAME_INTERVAL versions the whole record is stored
+instead, so rebuilding any version means decoding at most that many rows:
+
+    from pipeline.history import bill_as_of
+    bill_as_of(db_session, bill_id, datetime.date(2021, 3, 1))
+
+Versions are dated by the API's updateDate, falling back to when they were
+loaded, and never earlier than the version before them, so later versions
+always have a later (or equal) valid_from.
+"""
+import datetime
+import json
+import zlib
+from models.db.models import BillVersion
+from settings import BILL_HISTORY_KEYFRAME_INTERVAL
+
+
+def encode(value):
+    return zlib.compress(json.dumps(value, sort_keys=True,
+                                    separators=(',', ':'),
+                                    default=str).encode('utf-8'))
+
+
+def decode(payload):
+    return json.loads(zlib.decompress(payload).decode('utf-8'))
+
+
+def diff(old, new, path=()):
+    """
+    A list of operations that turn old into new:
+
+        ['set', path, value]
+        ['del', path]
+        ['splice', path, start, stop, items] - list[start:stop] = items
+    """
+    if old == new:
+        return list()
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = [['del', list(path) + [key]] for key in old if key not in new]
+        for key, value in new.items():
+            if key not in old:
+                ops.append(['set', list(path) + [key], value])
+            else:
+                ops.extend(diff(old[key], value, path + (key,)))
+        return ops
+    if isinstance(old, list) and isinstance(new, list):
+        head = 0
+        limit = min(len(old), len(new))
+        while head < limit and old[head] == new[head]:
+            head += 1
+        tail = 0
+        while (tail < limit - head
+               and old[len(old) - 1 - tail] == new[len(new) - 1 - tail]):
+            tail += 1
+        return [['splice', list(path), head, len(old) - tail,
+                 new[head:len(new) - tail]]]
+    return [['set', list(path), new]]
+
+
+def _walk(record, path):
+    for key in path:
+        record = record[key]
+    return record
+
+
+def patch(record, ops):
+    """
+    Applies diff() operations to a record in place and returns it.
+    """
+    for op in ops:
+        path = op[1]
+        if op[0] == 'splice':
+            _walk(record, path)[op[2]:op[3]] = op[4]
+        elif not path:
+            record = op[2] if op[0] == 'set' else None
+        elif op[0] == 'set':
+            _walk(record, path[:-1])[path[-1]] = op[2]
+        else:
+            del _walk(record, path[:-1])[path[-1]]
+    return record
+
+
+def _rebuild(session, bill_id, version):
+    """
+    The record as of a version number, from the nearest keyframe at or
+    before it.
+    """
+    keyframe = (session.query(BillVersion)
+                .filter(BillVersion.bill_id == bill_id,
+                        BillVersion.version <= version,
+                        BillVersion.is_keyframe.is_(True))
+                .order_by(BillVersion.version.desc())
+                .first())
+    if keyframe is None:
+        raise ValueError('No keyframe for bill {} at or before version '
+                         '{}'.format(bill_id, version))
+    record = decode(keyframe.payload)
+    for row in (session.query(BillVersion)
+                .filter(BillVersion.bill_id == bill_id,
+                        BillVersion.version > keyframe.version,
+                        BillVersion.version <= version)
+                .order_by(BillVersion.version)):
+        record = patch(record, decode(row.payload))
+    return record
+
+
+def latest_version(session, bill_id):
+    return (session.query(BillVersion)
+            .filter(BillVersion.bill_id == bill_id)
+            .order_by(BillVersion.version.desc())
+            .first())
+
+
+def record_version(session, bill_id, record, valid_from=None,
+                   keyframe_interval=BILL_HISTORY_KEYFRAME_INTERVAL):
+    """
+    Stores record as the bill's next version, unless it's the same as the
+    latest one. Doesn't commit. Returns the new BillVersion, or None.
+
+    A valid_from older than the latest version's (a re-sync of an older
+    record, say) is moved up to it, so bill_as_of() never finds a version
+    that was stored after one dated later.
+    """
+    now = datetime.datetime.utcnow()
+    valid_from = valid_from or now
+    record = json.loads(json.dumps(record, default=str))
+    latest = latest_version(session, bill_id)
+    if latest is None:
+        number = 1
+        ops = None
+    else:
+        number = latest.version + 1
+        ops = diff(_rebuild(session, bill_id, latest.version), record)
+        if not ops:
+            return None
+        valid_from = max(valid_from, latest.valid_from)
+    is_keyframe = ops is None or (number - 1) % keyframe_interval == 0
+    row = BillVersion(bill_id, number, valid_from, is_keyframe,
+                      encode(record if is_keyframe else ops), now)
+    session.add(row)
+    session.flush()
+    return row
+
+
+def bill_history(session, bill_id):
+    """
+    (version, valid_from) for every stored version of a bill, oldest first.
+    """
+    return [(row.version, row.valid_from) for row in
+            session.query(BillVersion.version, BillVersion.valid_from)
+            .filter(BillVersion.bill_id == bill_id)
+            .order_by(BillVersion.version)]
+
+
+def bill_version(session, bill_id, version):
+    """
+    The bill's record as of a version number.
+    """
+    return _rebuild(session, bill_id, version)
+
+
+def bill_as_of(session, bill_id, when):
+    """
+    The bill's record as it stood at when (a date counts as the end of that
+    day), or None if the bill has no version that old.
+    """
+    if not isinstance(when, datetime.datetime):
+        when = datetime.datetime.combine(when, datetime.time.max)
+    row = (session.query(BillVersion.version)
+           .filter(BillVersion.bill_id == bill_id,
+                   BillVersion.valid_from <= when)
+           .order_by(BillVersion.version.desc())
+           .first())
+    if row is None:
+        return None
+    return _rebuild(session, bill_id, row.version)
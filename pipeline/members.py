@@ -0,0 +1,152 @@
+"""
+Loads members of Congress into the Member table and keeps each congress's
+roster in memory.
+
+MEMBER_ROSTER fetches a congress's member list from the API the first time
+it's asked for and hands back the same dict of bioguide_id to member details
+after that, so looking a member up never costs a call of its own.
+sync_members() writes a roster to the Member table, filling in or updating
+the members that bill loads added from sponsor details:
+
+    from database import db_session
+    from pipeline.members import MEMBER_ROSTER, sync_members
+    sync_members(db_session, 117)
+    MEMBER_ROSTER.get('N000002', 117)['party']
+"""
+import datetime
+import logging
+import threading
+from models.cdg.members import list_members
+from models.db.models import Member
+from pipeline.bills import member_name, parse_datetime
+
+logger = logging.getLogger(__name__)
+
+PARTY_CODES = {'Democratic': 'D', 'Republican': 'R', 'Independent': 'I',
+               'Libertarian': 'L'}
+STATE_CODES = {
+    'Alabama': 'AL', 'Alaska': 'AK', 'American Samoa': 'AS', 'Arizona': 'AZ',
+    'Arkansas': 'AR', 'California': 'CA', 'Colorado': 'CO',
+    'Connecticut': 'CT', 'Delaware': 'DE', 'District of Columbia': 'DC',
+    'Florida': 'FL', 'Georgia': 'GA', 'Guam': 'GU', 'Hawaii': 'HI',
+    'Idaho': 'ID', 'Illinois': 'IL', 'Indiana': 'IN', 'Iowa': 'IA',
+    'Kansas': 'KS', 'Kentucky': 'KY', 'Louisiana': 'LA', 'Maine': 'ME',
+    'Maryland': 'MD', 'Massachusetts': 'MA', 'Michigan': 'MI',
+    'Minnesota': 'MN', 'Mississippi': 'MS', 'Missouri': 'MO',
+    'Montana': 'MT', 'Nebraska': 'NE', 'Nevada': 'NV',
+    'New Hampshire': 'NH', 'New Jersey': 'NJ', 'New Mexico': 'NM',
+    'New York': 'NY', 'North Carolina': 'NC', 'North Dakota': 'ND',
+    'Northern Mariana Islands': 'MP', 'Ohio': 'OH', 'Oklahoma': 'OK',
+    'Oregon': 'OR', 'Pennsylvania': 'PA', 'Puerto Rico': 'PR',
+    'Rhode Island': 'RI', 'South Carolina': 'SC', 'South Dakota': 'SD',
+    'Tennessee': 'TN', 'Texas': 'TX', 'Utah': 'UT', 'Vermont': 'VT',
+    'Virgin Islands': 'VI', 'Virginia': 'VA', 'Washington': 'WA',
+    'West Virginia': 'WV', 'Wisconsin': 'WI', 'Wyoming': 'WY'}
+CHAMBERS = {'House of Representatives': 'house', 'Senate': 'senate'}
+
+
+def member_details(item):
+    """
+    Member column values from a member list entry. The list gives names as
+    'Last, First Middle' and full party and state names, which are turned
+    into the codes sponsors carry.
+    """
+    last_name, _, first_names = (item.get('name') or '').partition(', ')
+    first_name, _, middle_name = first_names.partition(' ')
+    terms = item.get('terms') or list()
+    if isinstance(terms, dict):
+        terms = terms.get('item') or list()
+    party = item.get('partyName')
+    state = item.get('state')
+    district = item.get('district')
+    return {'bioguide_id': item['bioguideId'],
+            'full_name': member_name(last_name, first_name, middle_name),
+            'first_name': first_name or None,
+            'middle_name': middle_name or None,
+            'last_name': last_name or None,
+            'party': PARTY_CODES.get(party, party[:1] if party else None),
+            'state': STATE_CODES.get(state, state),
+            'district': str(district) if district is not None else None,
+            'chamber': (CHAMBERS.get(terms[-1].get('chamber'))
+                        if terms else None),
+            'ext_update_date': parse_datetime(item.get('updateDate'))}
+
+
+class member_roster():
+    """
+    Per-congress member rosters, each fetched once and then served from
+    memory. Safe to share between threads: each congress has its own lock,
+    so fetching one roster doesn't hold up threads asking about another.
+    """
+    def __init__(self):
+        self._rosters = dict()
+        self._fetching = dict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, congress):
+        return congress in self._rosters
+
+    def _congress_lock(self, congress):
+        with self._lock:
+            return self._fetching.setdefault(congress, threading.Lock())
+
+    def congress(self, congress):
+        """
+        dict of bioguide_id to member_details() for everyone who served in
+        a congress.
+        """
+        roster = self._rosters.get(congress)
+        if roster is not None:
+            return roster
+        with self._congress_lock(congress):
+            roster = self._rosters.get(congress)
+            if roster is None:
+                logger.debug('Fetching the {} congress roster'.format(
+                    congress))
+                roster = {item['bioguideId']: member_details(item)
+                          for item in list_members(congress=congress)}
+                with self._lock:
+                    self._rosters[congress] = roster
+            return roster
+
+    def get(self, bioguide_id, congress):
+        return self.congress(congress).get(bioguide_id)
+
+    def clear(self):
+        with self._lock:
+            self._rosters.clear()
+
+
+MEMBER_ROSTER = member_roster()
+
+
+def load_members(session, details):
+    """
+    Writes member_details() dicts to the Member table, updating members
+    already stored. Doesn't commit. Returns the number written.
+    """
+    details = {item['bioguide_id']: item for item in details}
+    rows = {row.bioguide_id: row for row in session.query(Member)
+            .filter(Member.bioguide_id.in_(list(details)))}
+    now = datetime.datetime.utcnow()
+    for bioguide_id, item in details.items():
+        row = rows.get(bioguide_id)
+        if row is None:
+            row = Member(bioguide_id=bioguide_id)
+            session.add(row)
+        for key, value in item.items():
+            if value is not None:
+                setattr(row, key, value)
+        row.update_date = now
+    return len(details)
+
+
+def sync_members(session, congress, roster=None):
+    """
+    Loads a congress's roster into the Member table and commits. Returns the
+    number of members written.
+    """
+    roster = roster or MEMBER_ROSTER
+    written = load_members(session, roster.congress(congress).values())
+    session.commit()
+    return written
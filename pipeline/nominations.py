@@ -0,0 +1,134 @@
+"""
+Loads nominations from the Congress.gov API into the Nomination, Nominee and
+NominationCommittee tables, with their actions as Actions rows carrying a
+nomination_id.
+
+Nominations are fetched with nominations.nominations() on the same bounded
+thread pool as bills, and each congress is checkpointed the same way as
+sync_congress(). sync_all_nominations() works through every congress the
+API has nominations for:
+
+    from database import db_session
+    from pipeline.nominations import sync_all_nominations
+    sync_all_nominations(db_session)
+"""
+import datetime
+import logging
+from models.cdg.nominations import list_nominations, nominations
+from models.db.models import (Actions, Nomination, NominationCommittee,
+                              Nominee)
+from pipeline.bills import (action_row, parse_date, parse_datetime,
+                            sync_checkpointed)
+from pipeline.committees import committee_cache
+from settings import CURRENT_CONGRESS, NOM_MIN_CONGRESS
+
+logger = logging.getLogger(__name__)
+
+
+def nominee_row(nomination_id, position, item):
+    return Nominee(nomination_id=nomination_id,
+                   ordinal=int(position['ordinal']),
+                   position_title=position.get('positionTitle'),
+                   organization=position.get('organization'),
+                   first_name=item.get('firstName'),
+                   middle_name=item.get('middleName'),
+                   last_name=item.get('lastName'),
+                   prefix=item.get('prefix'),
+                   suffix=item.get('suffix'),
+                   state=item.get('state'),
+                   effective_date=parse_date(item.get('effectiveDate')),
+                   predecessor_name=item.get('predecessorName'))
+
+
+def load_nomination(session, nomination_obj, cache=None):
+    """
+    Writes one nomination (a nominations.nomination that has been fetched)
+    to the database, replacing its nominees, actions and committee
+    referrals. Committees it was referred to that aren't in the database yet
+    are added. Doesn't commit.
+    """
+    cache = cache or committee_cache(session)
+    data = nomination_obj.data['nomination']
+    congress = int(data['congress'])
+    number = int(data['number'])
+    row = (session.query(Nomination)
+           .filter_by(congress=congress, number=number)
+           .one_or_none())
+    now = datetime.datetime.utcnow()
+    if row is None:
+        row = Nomination(congress=congress, number=number)
+        row.create_date = now
+        session.add(row)
+    latest = data.get('latestAction') or dict()
+    row.citation = data.get('citation')
+    row.description = data.get('description')
+    row.organization = data.get('organization')
+    row.received_date = parse_date(data.get('receivedDate'))
+    row.authority_date = parse_date(data.get('authorityDate'))
+    row.is_privileged = data.get('isPrivileged')
+    row.is_civilian = data.get('isCivilian')
+    row.latest_action_date = parse_date(latest.get('actionDate'))
+    row.latest_action_text = latest.get('text')
+    row.ext_update_date = parse_datetime(data.get('updateDate'))
+    row.update_date = now
+    session.flush()
+
+    session.query(Nominee).filter_by(nomination_id=row.nomination_id).delete()
+    for position in nomination_obj.positions:
+        session.add_all(nominee_row(row.nomination_id, position, item)
+                        for item in nomination_obj.nominees(
+                            position['ordinal']))
+
+    session.query(Actions).filter_by(
+        nomination_id=row.nomination_id).delete()
+    if 'actions' in data:
+        session.add_all(action_row(None, item,
+                                   nomination_id=row.nomination_id)
+                        for item in nomination_obj.actions)
+
+    session.query(NominationCommittee).filter_by(
+        nomination_id=row.nomination_id).delete()
+    if 'committees' in data:
+        update_date = (row.ext_update_date or now).date()
+        for item in nomination_obj.committees:
+            committee_id = cache.committee_id(item, update_date,
+                                              chamber=item.get('chamber'))
+            for activity in item.get('activities') or list():
+                session.add(NominationCommittee(
+                    row.nomination_id, committee_id, activity.get('name'),
+                    parse_date(activity.get('date'))))
+    session.flush()
+    return row
+
+
+def sync_nominations(session, congress, since=None, max_workers=8):
+    """
+    Loads every nomination in a congress that changed since the last
+    successful sync (or since the since timestamp, if given), committing as
+    it goes. The checkpoint only moves forward when every nomination
+    loaded. Returns a dict of loaded and failed counts.
+    """
+    cache = committee_cache(session)
+
+    def fetch(since):
+        return nominations(congress, list_nominations(congress, since=since),
+                           max_workers=max_workers, cached=False)
+
+    return sync_checkpointed(
+        session, 'nominations-{}'.format(congress), fetch,
+        lambda nomination_obj: load_nomination(session, nomination_obj,
+                                               cache),
+        since=since, on_error=cache.reload)
+
+
+def sync_all_nominations(session, first=None, last=None, max_workers=8):
+    """
+    Runs sync_nominations() for every congress from first to last
+    (NOM_MIN_CONGRESS to CURRENT_CONGRESS by default). Returns a dict of
+    congress to its loaded and failed counts.
+    """
+    first = first or NOM_MIN_CONGRESS
+    last = last or CURRENT_CONGRESS
+    return {congress: sync_nominations(session, congress,
+                                       max_workers=max_workers)
+            for congress in range(first, last + 1)}
@@ -0,0 +1,151 @@
+"""
+Materialized bill status: the date each bill reached each stage (introduced,
+reported, passed the House or Senate, enrolled, vetoed, became law), worked
+out once from its actions and kept in the BillStatus table.
+
+refresh_status() is called by the loader for every bill it writes, so the
+table stays current through incremental syncs and questions like "which bills
+passed the House in the 117th" become an indexed query:
+
+    from pipeline.status import bills_passed
+    bills_passed(session, 117, 'house')
+"""
+import datetime
+import re
+from collections import defaultdict
+from models.db.models import Actions, Bill, BillStatus
+
+# Action codes from the Library of Congress's action code list, plus a text
+# pattern for actions that come from systems that don't use those codes.
+STAGE_RULES = (
+    ('introduced', {'1000', '10000', 'Intro-H', 'Intro-S'},
+     re.compile(r'^Introduced in (the )?(House|Senate)', re.I)),
+    ('reported', {'5000', '14000'},
+     re.compile(r'^Reported (to|by|with)', re.I)),
+    ('passed_house', {'8000'},
+     re.compile(r'^Passed/agreed to in (the )?House', re.I)),
+    ('passed_senate', {'17000'},
+     re.compile(r'^Passed/agreed to in (the )?Senate', re.I)),
+    ('enrolled', {'28000'},
+     re.compile(r'^Presented to President', re.I)),
+    ('vetoed', {'31000'},
+     re.compile(r'^Vetoed by President', re.I)),
+    ('became_law', {'36000'},
+     re.compile(r'^Became (Public|Private) Law', re.I)),
+)
+STAGES = ('introduced', 'reported', 'passed_house', 'passed_senate',
+          'passed_both', 'enrolled', 'vetoed', 'law')
+CHAMBERS = {'house': BillStatus.passed_house_date,
+            'senate': BillStatus.passed_senate_date}
+
+
+def action_stage(action_code=None, action_text=None):
+    """
+    Returns the stage an action marks, or None for everything else
+    (referrals, hearings, calendar entries, etc.).
+    """
+    for stage, codes, pattern in STAGE_RULES:
+        if action_code in codes:
+            return stage
+    if action_text:
+        for stage, codes, pattern in STAGE_RULES:
+            if pattern.match(action_text):
+                return stage
+    return None
+
+
+def derive_status(actions):
+    """
+    Works out a bill's timeline from its actions. actions is an iterable of
+    Actions rows (or anything with action_date, action_code and action_text).
+    Returns a dict with a <stage>_date entry per stage, the latest action and
+    the furthest stage reached.
+    """
+    dates = defaultdict(lambda: None)
+    latest = None
+    for action in actions:
+        if action.action_date is None:
+            continue
+        if latest is None or action.action_date >= latest.action_date:
+            latest = action
+        stage = action_stage(action.action_code, action.action_text)
+        if stage and (dates[stage] is None
+                      or action.action_date < dates[stage]):
+            dates[stage] = action.action_date
+    status = {'{}_date'.format(stage): dates[stage]
+              for stage, codes, pattern in STAGE_RULES}
+    status['latest_action_date'] = latest.action_date if latest else None
+    status['latest_action_text'] = latest.action_text if latest else None
+    if dates['became_law']:
+        status['stage'] = 'law'
+    elif dates['vetoed']:
+        status['stage'] = 'vetoed'
+    elif dates['enrolled']:
+        status['stage'] = 'enrolled'
+    elif dates['passed_house'] and dates['passed_senate']:
+        status['stage'] = 'passed_both'
+    elif dates['passed_house']:
+        status['stage'] = 'passed_house'
+    elif dates['passed_senate']:
+        status['stage'] = 'passed_senate'
+    elif dates['reported']:
+        status['stage'] = 'reported'
+    else:
+        status['stage'] = 'introduced'
+    return status
+
+
+def refresh_status(session, bill_ids):
+    """
+    Recomputes BillStatus for the given bills from their Actions rows. Only
+    those bills are touched, so this is cheap to run after every load.
+    """
+    bill_ids = list(bill_ids)
+    if not bill_ids:
+        return 0
+    actions = defaultdict(list)
+    for action in (session.query(Actions)
+                   .filter(Actions.bill_id.in_(bill_ids))):
+        actions[action.bill_id].append(action)
+    bills = session.query(Bill).filter(Bill.bill_id.in_(bill_ids))
+    existing = {row.bill_id: row for row in
+                session.query(BillStatus)
+                .filter(BillStatus.bill_id.in_(bill_ids))}
+    now = datetime.datetime.utcnow()
+    for bill_row in bills:
+        status = derive_status(actions[bill_row.bill_id])
+        if status['introduced_date'] is None:
+            status['introduced_date'] = bill_row.introduced_date
+        row = existing.get(bill_row.bill_id)
+        if row is None:
+            row = BillStatus(bill_id=bill_row.bill_id,
+                             congress=bill_row.congress)
+            session.add(row)
+        for key, value in status.items():
+            setattr(row, key, value)
+        row.update_date = now
+    return len(bill_ids)
+
+
+def bills_at_stage(session, congress, stage):
+    """
+    Query for the BillStatus rows of a congress whose furthest stage is
+    stage.
+    """
+    if stage not in STAGES:
+        raise ValueError('{} is not a valid stage, use one of {}'.format(
+            stage, STAGES))
+    return session.query(BillStatus).filter(BillStatus.congress == congress,
+                                            BillStatus.stage == stage)
+
+
+def bills_passed(session, congress, chamber):
+    """
+    Query for the BillStatus rows of every bill in a congress that passed
+    chamber ('house' or 'senate'), whatever happened to it afterwards.
+    """
+    if chamber not in CHAMBERS:
+        raise ValueError('{} is not a valid chamber, use house or senate'
+                         .format(chamber))
+    return session.query(BillStatus).filter(
+        BillStatus.congress == congress, CHAMBERS[chamber].isnot(None))
@@ -0,0 +1,104 @@
+"""
+Downloads bill text into the BillText table, so text analysis (such as
+analysis.similarity) can run over a whole congress without going back to
+congress.gov.
+
+sync_texts() fetches text for the bills of a congress on a bounded thread
+pool. By default it only fetches bills that don't have any text stored yet,
+and only their latest version:
+
+    from database import db_session
+    from pipeline.texts import sync_texts
+    sync_texts(db_session, 117)
+"""
+import datetime
+import logging
+from collections import namedtuple
+from analysis.textdiff import digest, sorted_versions
+from models.cdg import core
+from models.cdg.legislation import bill
+from models.db.models import Bill, BillText
+from pipeline.bills import parse_datetime
+
+logger = logging.getLogger(__name__)
+
+text_result = namedtuple('text_result', ['key', 'versions', 'error'])
+version_text = namedtuple('version_text', ['version_type', 'date', 'text'])
+
+
+def fetch_texts(bill_obj, text_format='Formatted Text', latest_only=True):
+    """
+    Returns a list of version_text tuples for a bill, oldest first, skipping
+    versions that aren't available in text_format.
+    """
+    versions = [core.text_version(item, text_format=text_format)
+                for item in sorted_versions(bill_obj.texts or list())]
+    versions = [item for item in versions if item.url]
+    if latest_only:
+        versions = versions[-1:]
+    return [version_text(item.version_type, item.date, item.text)
+            for item in versions]
+
+
+def load_texts(session, bill_id, versions, text_format='Formatted Text'):
+    """
+    Writes version_text tuples for a bill to BillText, updating versions
+    already stored when their text changed. Doesn't commit. Returns the
+    number of versions added or changed.
+    """
+    rows = {row.version_type: row for row in session.query(BillText)
+            .filter_by(bill_id=bill_id, text_format=text_format)}
+    now = datetime.datetime.utcnow()
+    changed = 0
+    for version in versions:
+        text_digest = digest(version.text)
+        row = rows.get(version.version_type)
+        if row is None:
+            row = BillText(bill_id=bill_id, version_type=version.version_type,
+                           text_format=text_format)
+            session.add(row)
+            rows[version.version_type] = row
+        elif row.digest == text_digest:
+            continue
+        row.version_date = parse_datetime(version.date)
+        row.text = version.text
+        row.digest = text_digest
+        row.update_date = now
+        changed += 1
+    return changed
+
+
+def sync_texts(session, congress, text_format='Formatted Text',
+               latest_only=True, missing_only=True, max_workers=8):
+    """
+    Fetches and stores text for the bills of a congress that are in the
+    database, committing as it goes. Returns a dict of loaded and failed
+    counts.
+    """
+    bills = session.query(Bill.bill_id, Bill.bill_type, Bill.bill_number)
+    bills = bills.filter(Bill.congress == congress)
+    if missing_only:
+        bills = bills.filter(~Bill.bill_id.in_(
+            session.query(BillText.bill_id)
+            .filter(BillText.text_format == text_format)
+            .scalar_subquery()))
+    bill_ids = {(row.bill_type, int(row.bill_number)): row.bill_id
+                for row in bills}
+
+    def hydrate(key):
+        bill_obj = core.hydrate(bill, False, congress=congress,
+                                bill_type=key[0], bill_num=key[1])
+        return fetch_texts(bill_obj, text_format, latest_only)
+
+    loaded = 0
+    failed = 0
+    for result in core.fetch_batch(congress, list(bill_ids), hydrate,
+                                   text_result, max_workers):
+        if result.error is not None:
+            failed += 1
+            continue
+        load_texts(session, bill_ids[result.key], result.versions,
+                   text_format)
+        session.commit()
+        loaded += 1
+    return {'loaded': loaded, 'failed': failed}
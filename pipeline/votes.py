@@ -0,0 +1,185 @@
+"""
+Loads roll call votes into the Vote table.
+
+Votes are fetched concurrently, a window of roll numbers at a time, until a
+chamber runs out of votes for the session. Positions are stored compactly:
+each chamber and congress gets a VoteRoster that gives every member a fixed
+index, and each Vote row keeps its positions as one signed byte per member in
+roster order. analysis.votes turns those straight into a members x votes
+matrix.
+
+    from database import db_session
+    from pipeline.votes import sync_votes
+    sync_votes(db_session, 'house', 117, 1)
+"""
+import logging
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from models.db.models import Bill, Vote, VoteRoster
+from models.rollcall.votes import houseVote, senateVote
+
+logger = logging.getLogger(__name__)
+
+CHAMBERS = {'house': houseVote, 'senate': senateVote}
+
+# Codes stored in Vote.positions
+YEA = 1
+NAY = -1
+NOT_VOTING = 0
+PRESENT = 2
+OTHER = 3
+ABSENT = -2
+POSITION_CODES = {'yea': YEA, 'aye': YEA, 'nay': NAY, 'no': NAY,
+                  'present': PRESENT, 'not voting': NOT_VOTING}
+
+
+def position_code(vote):
+    """
+    Code for a vote as the chamber wrote it. Anything that isn't yea, nay,
+    present or not voting (e.g. a name in an election for Speaker) is OTHER.
+    """
+    return POSITION_CODES.get(vote.strip().lower(), OTHER)
+
+
+def _fetch(chamber, congress, session, roll_num):
+    vote = CHAMBERS[chamber](congress=congress, session=session,
+                             roll_num=roll_num)
+    return vote.metadata, vote.positions
+
+
+def fetch_votes(chamber, congress, session, start=1, max_workers=8):
+    """
+    Generator that fetches every roll call vote in a session from start on,
+    max_workers * 2 roll numbers at a time, and yields (metadata, positions)
+    tuples in roll number order. Stops at the first roll number that
+    doesn't exist.
+    """
+    if chamber not in CHAMBERS:
+        raise ValueError('{} is not a valid chamber, use house or senate'
+                         .format(chamber))
+    window = max_workers * 2
+    roll_num = start
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while True:
+            futures = [pool.submit(_fetch, chamber, congress, session, item)
+                       for item in range(roll_num, roll_num + window)]
+            for offset, future in enumerate(futures):
+                try:
+                    yield future.result()
+                except Exception as error:
+                    status = getattr(getattr(error, 'response', None),
+                                     'status_code', None)
+                    if status != 404:
+                        raise
+                    for other in futures:
+                        other.cancel()
+                    logger.info('Reached the end of {} votes at {}'.format(
+                        chamber, roll_num + offset))
+                    return
+            roll_num += window
+
+
+class roster():
+    """
+    In-memory copy of a chamber's VoteRoster for one congress. Members the
+    roster hasn't seen are added to the end as they show up.
+    """
+    def __init__(self, session, congress, chamber):
+        self.session = session
+        self.congress = congress
+        self.chamber = chamber
+        rows = (session.query(VoteRoster)
+                .filter_by(congress=congress, chamber=chamber)
+                .order_by(VoteRoster.roster_index))
+        self.index = {row.member_id: row.roster_index for row in rows}
+
+    def __len__(self):
+        return len(self.index)
+
+    def member_index(self, position):
+        member_id = position['member_id']
+        if member_id not in self.index:
+            self.index[member_id] = len(self.index)
+            self.session.add(VoteRoster(
+                congress=self.congress, chamber=self.chamber,
+                roster_index=self.index[member_id], member_id=member_id,
+                name=position.get('name'), party=position.get('party'),
+                state=position.get('state')))
+        return self.index[member_id]
+
+
+def pack_positions(positions, member_roster):
+    """
+    Packs a vote's positions into bytes, one signed byte per roster member.
+    Members of the roster who weren't on this vote are ABSENT.
+    """
+    indexes = [member_roster.member_index(item) for item in positions]
+    packed = np.full(len(member_roster), ABSENT, dtype=np.int8)
+    packed[indexes] = [position_code(item['vote']) for item in positions]
+    return packed.tobytes()
+
+
+def load_votes(session, votes):
+    """
+    Writes (metadata, positions) tuples to the Vote table, replacing any
+    vote already stored under the same chamber, congress, session and roll
+    number. Links each vote to its Bill when the bill is in the database.
+    Doesn't commit. Returns the number of votes written.
+    """
+    rosters = dict()
+    bill_ids = dict()
+    written = 0
+    for metadata, positions in votes:
+        congress, chamber = metadata['congress'], metadata['chamber']
+        if (congress, chamber) not in rosters:
+            rosters[congress, chamber] = roster(session, congress, chamber)
+        if congress not in bill_ids:
+            bill_ids[congress] = {
+                (row.bill_type, int(row.bill_number)): row.bill_id
+                for row in session.query(Bill.bill_id, Bill.bill_type,
+                                         Bill.bill_number)
+                .filter(Bill.congress == congress)}
+        row = (session.query(Vote)
+               .filter_by(congress=congress, chamber=chamber,
+                          session=metadata['session'],
+                          roll_number=metadata['roll_number'])
+               .one_or_none())
+        if row is None:
+            row = Vote(congress=congress, chamber=chamber,
+                       session=metadata['session'],
+                       roll_num=metadata['roll_number'])
+            session.add(row)
+        row.url = metadata['url']
+        row.date = metadata['date']
+        row.question = metadata['question']
+        row.result = metadata['result']
+        row.bill_id = bill_ids[congress].get(metadata['bill'])
+        row.positions = pack_positions(positions, rosters[congress, chamber])
+        written += 1
+    return written
+
+
+def sync_votes(session, chamber, congress, vote_session, max_workers=8,
+               batch_size=100):
+    """
+    Fetches and loads every vote in a session that isn't already stored,
+    committing every batch_size votes. Returns the number of votes loaded.
+    """
+    latest = (session.query(Vote.roll_number)
+              .filter_by(chamber=chamber, congress=congress,
+                         session=vote_session)
+              .order_by(Vote.roll_number.desc())
+              .first())
+    start = latest.roll_number + 1 if latest else 1
+    loaded = 0
+    batch = list()
+    for item in fetch_votes(chamber, congress, vote_session, start=start,
+                            max_workers=max_workers):
+        batch.append(item)
+        if len(batch) >= batch_size:
+            loaded += load_votes(session, batch)
+            session.commit()
+            batch = list()
+    loaded += load_votes(session, batch)
+    session.commit()
+    return loaded
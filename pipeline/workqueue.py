@@ -0,0 +1,294 @@
+"""
+Durable work queue in the WorkItem table, so several worker processes (on
+one host or many, pointed at the same SQLite file or PostgreSQL database)
+can split a crawl between them.
+
+Each item is a (congress, type, number) key on a named queue. A worker
+leases a few items at a time. A lease lasts visibility_timeout seconds, and
+an item whose lease runs out goes back on the queue for someone else, so a
+worker that dies doesn't lose work. A failed item is retried after a delay
+that doubles each attempt, until it runs out of attempts.
+
+Claiming an item is a conditional UPDATE that only succeeds if the item is
+still free, so two workers never hold the same lease even on SQLite. On
+PostgreSQL the candidate SELECT also skips rows other workers have locked.
+Loading a bill replaces whatever was stored for it before, so if a lease
+does run out mid-load, a second load of the same bill is harmless.
+
+    # once, from anywhere
+    enqueue_congress(db_session, 117)
+    # on each node, each with its own key
+    run_worker(db_session, api_key='...')
+"""
+import datetime
+import logging
+import os
+import socket
+import time
+from collections import defaultdict
+from sqlalchemy import and_, func, or_
+from models.cdg.legislation import bills, list_bills
+from models.db.models import WorkItem
+from pipeline.bills import TIMESTAMP_FORMAT, load_bill
+from settings import set_api_key
+
+logger = logging.getLogger(__name__)
+
+BILL_QUEUE = 'bills'
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+
+
+def default_worker_id():
+    return '{}:{}'.format(socket.gethostname(), os.getpid())
+
+
+class work_queue():
+    """
+    One named queue in the WorkItem table.
+
+    Functions
+        enqueue - adds keys to the queue, skipping ones already there.
+
+        lease - claims up to count items for a worker.
+
+        heartbeat - extends a worker's lease on an item.
+
+        complete - marks a leased item done.
+
+        fail - puts a leased item back for a retry, or marks it failed once
+        it's out of attempts.
+
+        counts - number of items in each status.
+    """
+    def __init__(self, session, name=BILL_QUEUE, visibility_timeout=600,
+                 max_attempts=5, retry_delay=60):
+        self.session = session
+        self.name = name
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+
+    def _items(self):
+        return self.session.query(WorkItem).filter(WorkItem.queue == self.name)
+
+    def enqueue(self, congress, keys, requeue=False):
+        """
+        Adds (type, number) keys for a congress and commits. Keys already on
+        the queue are left alone, unless requeue is set, in which case done
+        and failed ones go back to pending. Returns the number of items
+        added or requeued.
+        """
+        now = datetime.datetime.utcnow()
+        existing = {(row.item_type, row.item_number): row for row in
+                    self._items().filter(WorkItem.congress == congress)}
+        changed = 0
+        for item_type, number in keys:
+            key = (item_type.lower(), int(number))
+            row = existing.get(key)
+            if row is None:
+                row = WorkItem(self.name, congress, key[0], key[1],
+                               available_date=now, create_date=now)
+                self.session.add(row)
+                existing[key] = row
+            elif requeue and row.status in (DONE, FAILED):
+                row.status = PENDING
+                row.attempts = 0
+                row.last_error = None
+                row.available_date = now
+                row.update_date = now
+            else:
+                continue
+            changed += 1
+        self.session.commit()
+        return changed
+
+    def _release_expired(self, now):
+        expired = and_(WorkItem.queue == self.name,
+                       WorkItem.status == LEASED,
+                       WorkItem.lease_expires < now)
+        self.session.query(WorkItem).filter(
+            expired, WorkItem.attempts >= self.max_attempts).update(
+            {'status': FAILED, 'lease_owner': None, 'lease_expires': None,
+             'last_error': 'Lease expired', 'update_date': now},
+            synchronize_session=False)
+        self.session.query(WorkItem).filter(
+            expired, WorkItem.attempts < self.max_attempts).update(
+            {'status': PENDING, 'lease_owner': None, 'lease_expires': None,
+             'available_date': now, 'update_date': now},
+            synchronize_session=False)
+
+    def lease(self, worker_id, count=1):
+        """
+        Claims up to count available items for worker_id, oldest first, and
+        commits. Returns the leased WorkItem rows.
+        """
+        now = datetime.datetime.utcnow()
+        self._release_expired(now)
+        available = and_(WorkItem.queue == self.name,
+                         WorkItem.status == PENDING,
+                         or_(WorkItem.available_date.is_(None),
+                             WorkItem.available_date <= now))
+        candidates = [row.work_item_id for row in
+                      self.session.query(WorkItem.work_item_id)
+                      .filter(available)
+                      .order_by(WorkItem.work_item_id)
+                      .limit(count)
+                      .with_for_update(skip_locked=True)]
+        expires = now + datetime.timedelta(seconds=self.visibility_timeout)
+        claimed = list()
+        for work_item_id in candidates:
+            updated = self.session.query(WorkItem).filter(
+                WorkItem.work_item_id == work_item_id, available).update(
+                {'status': LEASED, 'lease_owner': worker_id,
+                 'lease_expires': expires,
+                 'attempts': WorkItem.attempts + 1, 'update_date': now},
+                synchronize_session=False)
+            if updated:
+                claimed.append(work_item_id)
+        self.session.commit()
+        if not claimed:
+            return list()
+        return (self._items().filter(WorkItem.work_item_id.in_(claimed))
+                .order_by(WorkItem.work_item_id).all())
+
+    def _owned(self, item, worker_id):
+        return self.session.query(WorkItem).filter(
+            WorkItem.work_item_id == item.work_item_id,
+            WorkItem.status == LEASED,
+            WorkItem.lease_owner == worker_id)
+
+    def heartbeat(self, item, worker_id):
+        """
+        Extends worker_id's lease on item by visibility_timeout and commits.
+        Returns False if the worker doesn't hold the lease any more.
+        """
+        now = datetime.datetime.utcnow()
+        expires = now + datetime.timedelta(seconds=self.visibility_timeout)
+        updated = self._owned(item, worker_id).update(
+            {'lease_expires': expires, 'update_date': now},
+            synchronize_session=False)
+        self.session.commit()
+        return bool(updated)
+
+    def complete(self, item, worker_id):
+        """
+        Marks item done if worker_id still holds its lease. Doesn't commit,
+        so the result and the completion go in the same transaction. Returns
+        False if the lease was lost.
+        """
+        now = datetime.datetime.utcnow()
+        updated = self._owned(item, worker_id).update(
+            {'status': DONE, 'lease_owner': None, 'lease_expires': None,
+             'last_error': None, 'update_date': now},
+            synchronize_session=False)
+        return bool(updated)
+
+    def fail(self, item, worker_id, error=None):
+        """
+        Gives up worker_id's lease on item after an error and commits. The
+        item is retried after retry_delay * 2 ** (attempts - 1) seconds, or
+        marked failed once it has had max_attempts.
+        """
+        now = datetime.datetime.utcnow()
+        attempts = self.session.query(WorkItem.attempts).filter(
+            WorkItem.work_item_id == item.work_item_id).scalar() or 0
+        values = {'lease_owner': None, 'lease_expires': None,
+                  'last_error': str(error) if error is not None else None,
+                  'update_date': now}
+        if attempts >= self.max_attempts:
+            values['status'] = FAILED
+        else:
+            values['status'] = PENDING
+            values['available_date'] = now + datetime.timedelta(
+                seconds=self.retry_delay * 2 ** max(attempts - 1, 0))
+        updated = self._owned(item, worker_id).update(
+            values, synchronize_session=False)
+        self.session.commit()
+        return bool(updated)
+
+    def counts(self):
+        return dict(self.session.query(WorkItem.status, func.count())
+                    .filter(WorkItem.queue == self.name)
+                    .group_by(WorkItem.status))
+
+
+def enqueue_congress(session, congress, since=None, bill_type=None,
+                     requeue=False):
+    """
+    Puts every bill in a congress (or one type, or those updated since a
+    timestamp) on the bill queue. Returns the number of items added.
+    """
+    queue = work_queue(session)
+    return queue.enqueue(congress, list_bills(congress, bill_type=bill_type,
+                                              since=since),
+                         requeue=requeue)
+
+
+def work_batch(session, queue, items, worker_id, max_workers=8,
+               run_id=None):
+    """
+    Fetches and loads a batch of leased bills, completing each one that
+    loads and failing the rest. Changes go in the change feed under run_id.
+    Returns a dict of loaded and failed counts.
+    """
+    by_congress = defaultdict(dict)
+    for item in items:
+        by_congress[item.congress][item.key] = item
+    loaded = 0
+    failed = 0
+    for congress, batch in by_congress.items():
+        for result in bills(congress, list(batch), max_workers=max_workers,
+                            cached=False):
+            item = batch[result.key]
+            if result.error is not None:
+                queue.fail(item, worker_id, result.error)
+                failed += 1
+                continue
+            try:
+                load_bill(session, result.bill, run_id=run_id)
+                if not queue.complete(item, worker_id):
+                    logger.info('Lost the lease on {!r}, loaded it '
+                                'anyway'.format(item))
+                session.commit()
+                loaded += 1
+            except Exception as error:
+                session.rollback()
+                logger.warning('Could not load {!r}: {}'.format(item, error))
+                queue.fail(item, worker_id, error)
+                failed += 1
+    return {'loaded': loaded, 'failed': failed}
+
+
+def run_worker(session, worker_id=None, api_key=None, batch_size=16,
+               max_workers=8, wait=False, poll_interval=30, queue=None):
+    """
+    Leases bills off the queue batch_size at a time and loads them until
+    the queue is empty (or, with wait, forever, checking every
+    poll_interval seconds). api_key, if given, is used for every call this
+    process makes, so each worker can run against its own quota. Changes go
+    in the change feed under '<worker_id>@<start time>'. Returns a dict of
+    loaded and failed counts.
+    """
+    worker_id = worker_id or default_worker_id()
+    queue = queue or work_queue(session)
+    run_id = '{}@{}'.format(worker_id, datetime.datetime.utcnow().strftime(
+        TIMESTAMP_FORMAT))
+    if api_key is not None:
+        set_api_key(api_key)
+    totals = {'loaded': 0, 'failed': 0}
+    while True:
+        items = queue.lease(worker_id, batch_size)
+        if not items:
+            if not wait:
+                break
+            time.sleep(poll_interval)
+            continue
+        logger.info('{} leased {} items'.format(worker_id, len(items)))
+        counts = work_batch(session, queue, items, worker_id, max_workers,
+                            run_id)
+        for name, value in counts.items():
+            totals[name] += value
+    return totals
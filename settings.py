@@ -1,8 +1,128 @@
-from keys import API_KEY
+import configparser
+import logging
+import os
+from threading import Lock
+
+logger = logging.getLogger(__name__)
 
 CURRENT_CONGRESS = 117
 MIN_CONGRESS = 93
 NOM_MIN_CONGRESS = 97
 CMTE_RPRT_MIN_CONGRESS = 104
 
+# Number of text version comparisons kept by analysis.textdiff
+TEXT_DIFF_CACHE_SIZE = 256
+
+# Pages of a sub-resource (titles, actions, etc.) kept in memory at once
+SUB_LIST_MAX_PAGES = 4
+
+# Every this many versions of a bill, pipeline.history stores the whole
+# record instead of a delta
+BILL_HISTORY_KEYFRAME_INTERVAL = 20
+
+# Bills, committees, etc. kept in APIConnectors.IDENTITY_MAP
+IDENTITY_CACHE_SIZE = 1024
+
+# Connections kept open per host by the shared requests session
+HTTP_POOL_SIZE = 16
+
+# api.data.gov allows each key API_RATE_LIMIT requests per API_RATE_PERIOD
+# seconds
+API_RATE_LIMIT = 5000
+API_RATE_PERIOD = 3600
+# Hosts whose requests count against that limit. Others (the House Clerk and
+# Senate vote files, a local mirror) don't spend the key's tokens
+API_RATE_LIMITED_HOSTS = ('api.data.gov', 'api.congress.gov',
+                          'api.govinfo.gov')
+
+# How connectors reach the API: 'live', 'record' (live, saving responses to
+# CASSETTE_DIR) or 'replay' (served from CASSETTE_DIR, no network)
+TRANSPORT = os.environ.get('CDG_TRANSPORT', 'live')
+CASSETTE_DIR = os.environ.get('CDG_CASSETTE_DIR',
+                              os.path.join(os.path.dirname(__file__), 'tests',
+                                           'cassettes'))
+
+# Where cdgAPI sends its requests. Point CDG_BASE_URL at a mirror (see
+# mirror.py) to read from a local database instead of api.data.gov
+CDG_BASE_URL = os.environ.get('CDG_BASE_URL',
+                              'http://api.data.gov/congress/v2/')
+
+# mirror.py listens on MIRROR_HOST:MIRROR_PORT and keeps up to
+# MIRROR_CACHE_SIZE responses for MIRROR_CACHE_TTL seconds
+MIRROR_HOST = os.environ.get('CDG_MIRROR_HOST', '127.0.0.1')
+MIRROR_PORT = int(os.environ.get('CDG_MIRROR_PORT', 8080))
+MIRROR_CACHE_SIZE = 1024
+MIRROR_CACHE_TTL = 60
+
+# Largest page each API will hand back in one call
+CDG_MAX_PAGE_SIZE = 250
+GOVINFO_MAX_PAGE_SIZE = 1000
+
+# Let lists pick their own page size from the count, observed latency and
+# response size (see APIConnectors.page_size_tuner), without letting a single
+# page go over these limits
+ADAPTIVE_PAGE_SIZE = os.environ.get('CDG_ADAPTIVE_PAGE_SIZE', '') == '1'
+ADAPTIVE_MAX_PAGE_BYTES = 4 * 1024 * 1024
+ADAPTIVE_TARGET_LATENCY = 5.0
+
+# Decode API responses with msgspec when it's installed (see
+# APIConnectors.decode_json and models.cdg.schema); set CDG_FAST_JSON=0 to
+# stick to the stdlib json module
+FAST_JSON = os.environ.get('CDG_FAST_JSON', '1') != '0'
+
+# Where to look for the api.data.gov key, see get_api_key()
+API_KEY_ENV = 'CDG_API_KEY'
+CONFIG_FILE = os.environ.get('CDG_CONFIG',
+                             os.path.join(os.path.expanduser('~'), '.config',
+                                          'cdg_api', 'config.ini'))
+
+# Until the first lookup, so a missing key is only searched for (and warned
+# about) once
+_NOT_LOOKED_UP = object()
+_api_key = _NOT_LOOKED_UP
+_api_key_lock = Lock()
+
+
+def _find_api_key():
+    key = os.environ.get(API_KEY_ENV)
+    if key:
+        return key
+    if os.path.exists(CONFIG_FILE):
+        config = configparser.ConfigParser()
+        config.read(CONFIG_FILE)
+        key = config.get('api', 'key', fallback=None)
+        if key:
+            return key
+    try:
+        from keys import API_KEY
+        return API_KEY
+    except ImportError:
+        return None
+
+
+def get_api_key():
+    """
+    Returns the api.data.gov key, looking it up the first time it's asked
+    for. Checks, in order, the CDG_API_KEY environment variable, the key
+    setting in the [api] section of CONFIG_FILE and the API_KEY in a local
+    keys.py. Returns None (and logs a warning, once) if there isn't one
+    anywhere.
+    """
+    global _api_key
+    with _api_key_lock:
+        if _api_key is _NOT_LOOKED_UP:
+            _api_key = _find_api_key()
+            if _api_key is None:
+                logger.warning('No API key found, set {} or add one to {}'
+                               .format(API_KEY_ENV, CONFIG_FILE))
+        return _api_key
+
 
+def set_api_key(key):
+    """
+    Uses key for every call this process makes from now on, e.g. for a
+    queue worker (see pipeline.workqueue) running with its own key.
+    """
+    global _api_key
+    with _api_key_lock:
+        _api_key = key
@@ -0,0 +1,19 @@
+"""
+Reports the API tests that were skipped for want of a cassette, so a replay
+run can't pass while quietly covering nothing.
+"""
+from tests.helpers import RECORD_HINT, missing_cassettes
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not missing_cassettes:
+        return
+    keys = sorted(set(missing_cassettes))
+    terminalreporter.section('unrecorded API responses')
+    terminalreporter.write_line(
+        '{} tests were skipped because these {} requests have no cassette:'
+        .format(len(missing_cassettes), len(keys)))
+    for key in keys:
+        terminalreporter.write_line('    {}'.format(key))
+    terminalreporter.write_line('Record them with {} or run them with '
+                                'CDG_TRANSPORT=live.'.format(RECORD_HINT))
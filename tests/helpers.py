@@ -0,0 +1,122 @@
+"""
+Shared fixtures for the test suite.
+"""
+import json
+import os
+import unittest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from APIConnectors import cassette_response, replay_transport, set_transport
+from database import Base
+
+SPONSOR = {'bioguideId': 'A000001', 'fullName': 'Rep. A'}
+API_URL = 'https://api.data.gov/congress/v2/'
+RECORD_HINT = 'CDG_TRANSPORT=record python -m pytest tests'
+
+# Requests that had no cassette during this run, reported at the end by
+# tests/conftest.py.
+missing_cassettes = list()
+
+
+class skipping_replay_transport(replay_transport):
+    """
+    Replays cassettes, but skips the test asking for a response that was
+    never recorded instead of failing it. Each miss is kept in
+    missing_cassettes so the run can say what wasn't covered.
+    """
+    def get(self, url, params=None):
+        try:
+            return super().get(url, params=params)
+        except LookupError:
+            path, key = self.path_for(url, params)
+            missing_cassettes.append(key)
+            raise unittest.SkipTest('no cassette for {}, record it with {}'
+                                    .format(key, RECORD_HINT))
+
+
+class recorded_case(unittest.TestCase):
+    """
+    Base class for tests that talk to the API. They run against the
+    cassettes in settings.CASSETTE_DIR, and are skipped (with the missing
+    request as the reason) where a response hasn't been recorded, unless
+    CDG_TRANSPORT is set, in which case they use that transport (e.g.
+    CDG_TRANSPORT=record to record them).
+    """
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        if 'CDG_TRANSPORT' not in os.environ:
+            set_transport(skipping_replay_transport())
+
+    @classmethod
+    def tearDownClass(cls):
+        set_transport(None)
+        super().tearDownClass()
+
+
+def memory_engine(shared=False):
+    """
+    A fresh in-memory SQLite database with every table created. shared
+    keeps a single connection that any thread can use, for tests that run a
+    server against it.
+    """
+    if shared:
+        engine = create_engine('sqlite://', poolclass=StaticPool,
+                               connect_args={'check_same_thread': False})
+    else:
+        engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def memory_session():
+    return sessionmaker(bind=memory_engine())()
+
+
+class fakeResponse(cassette_response):
+    """
+    A response carrying payload as JSON, or content as it is.
+    """
+    def __init__(self, payload=None, status_code=200, url=None,
+                 content=None):
+        if content is None:
+            content = json.dumps(payload).encode()
+        super().__init__(url=url, status_code=status_code,
+                         headers={'Content-Type': 'application/json'},
+                         content=content)
+
+
+class fakeBill():
+    """
+    Stands in for a fetched legislation.bill when testing the loaders.
+    cosponsors are bioguide ids, related is a list of (type, number,
+    relationship) tuples and anything else goes into the bill's data as
+    it is, e.g. title='A bill'.
+    """
+    def __init__(self, number=1, actions=(), cosponsors=(), related=None,
+                 bill_type='HR', update_date='2021-06-01T12:00:00Z',
+                 sponsors=(SPONSOR,), **fields):
+        url = '{}bill/117/{}/{}/'.format(API_URL, bill_type.lower(), number)
+        self.data = {'bill': {
+            'congress': 117, 'type': bill_type, 'number': number,
+            'introducedDate': '2021-01-04',
+            'updateDate': update_date,
+            'sponsors': list(sponsors),
+            'actions': {'count': len(actions), 'url': url + 'actions'},
+            'cosponsors': {'count': len(cosponsors),
+                           'url': url + 'cosponsors'}}}
+        self.data['bill'].update(fields)
+        self.actions = list(actions)
+        self.cosponsors = [{'bioguideId': item,
+                            'sponsorshipDate': '2021-01-05',
+                            'isOriginalCosponsor': True}
+                           for item in cosponsors]
+        if related is not None:
+            self.data['bill']['relatedBills'] = {'count': len(related),
+                                                 'url': url + 'relatedBills'}
+            self.related_bills = [
+                {'congress': 117, 'type': other_type, 'number': other_number,
+                 'relationshipDetails': [{'type': kind,
+                                          'identifiedBy': 'House'}]}
+                for other_type, other_number, kind in related]
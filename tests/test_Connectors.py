@@ -1,8 +1,18 @@
+import os
+import tempfile
 import unittest
-from APIConnectors import cdgAPI, baseAPI, govInfoAPI
+from unittest import mock
+import APIConnectors
+from APIConnectors import (cdgAPI, baseAPI, govInfoAPI, canonical_url,
+                           identity_map, IDENTITY_MAP, rate_limiter,
+                           cassette_key, cassette_response,
+                           recording_transport, replay_transport,
+                           set_transport, transfer_stats, wire_size,
+                           endpoint_key, page_size_tuner, http_transport)
+from tests.helpers import recorded_case
 
 
-class testBaseAPI(unittest.TestCase):
+class testBaseAPI(recorded_case):
 
     def setUp(self):
         self.api = baseAPI()
@@ -30,7 +40,7 @@ class testBaseAPI(unittest.TestCase):
         self.assertFalse(self.api.validate_time(time))
 
 
-class testCDGAPIConnector(unittest.TestCase):
+class testCDGAPIConnector(recorded_case):
 
     def setUp(self):
         self.mixin = cdgAPI()
@@ -89,6 +99,14 @@ class testCDGAPIConnector(unittest.TestCase):
         self.assertEqual(self.mixin.params['toDateTime'],
                          '2020-01-01T00:00:00Z')
 
+    # format tests
+    def test_format_default(self):
+        self.assertEqual(self.mixin.params['format'], 'json')
+
+    def test_format_setter_bad(self):
+        with self.assertRaises(ValueError):
+            self.mixin.format = 'csv'
+
     # create_url_from_parts
     def test_create_url_from_parts(self):
         self.mixin._url_parts = ['nomination', 116, 74]
@@ -166,4 +184,189 @@ class testGovInfoApiConnector(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.api.page_size = self.psize_bad
 
+    def test_page_size_in_params(self):
+        self.api.api_key = 'DEMO_KEY'
+        self.api.page_size = self.psize_good
+        self.assertEqual(self.api.params['pageSize'], self.psize_good)
+
     # to-do: add test for pagination.
+
+
+class testIdentityMap(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = identity_map(maxsize=2)
+
+    def tearDown(self):
+        IDENTITY_MAP.clear()
+
+    def test_canonical_url(self):
+        self.assertEqual(
+            canonical_url('http://api.data.gov/congress/v2/bill/116/HR/1/'),
+            canonical_url('https://api.data.gov/congress/v2/bill/116/hr/1'
+                          '?format=json'))
+        self.assertEqual(
+            canonical_url('https://api.data.gov/congress/v2/bill/116/hr/1'),
+            'bill/116/hr/1')
+
+    def test_add_returns_existing(self):
+        first = object()
+        self.assertIs(self.cache.add('a', first), first)
+        self.assertIs(self.cache.add('a', object()), first)
+
+    def test_lru_eviction(self):
+        self.cache.add('a', 1)
+        self.cache.add('b', 2)
+        self.cache.get('a')
+        self.cache.add('c', 3)
+        self.assertIn('a', self.cache)
+        self.assertNotIn('b', self.cache)
+
+    def test_resize(self):
+        self.cache.add('a', 1)
+        self.cache.add('b', 2)
+        self.cache.resize(1)
+        self.assertEqual(len(self.cache), 1)
+
+    def test_cached(self):
+        url = 'https://api.data.gov/congress/v2/bill/116/hr/2546'
+        first = cdgAPI.cached(url=url)
+        self.assertIs(cdgAPI.cached(url=url + '?format=json'), first)
+
+
+class testRateLimiter(unittest.TestCase):
+
+    def test_acquire_spends_tokens(self):
+        limiter = rate_limiter(rate=5, period=3600)
+        for i in range(3):
+            limiter.acquire()
+        self.assertEqual(limiter.remaining, 2)
+
+    def test_only_api_hosts_spend_tokens(self):
+        limiter = rate_limiter(rate=5, period=3600)
+        session = mock.Mock()
+        session.get.return_value = cassette_response(status_code=200,
+                                                     content=b'<vote/>')
+        with mock.patch.object(APIConnectors, 'RATE_LIMITER', limiter), \
+                mock.patch.object(APIConnectors, '_session', session):
+            transport = http_transport(stats=transfer_stats())
+            transport.get('https://clerk.house.gov/evs/2021/roll010.xml')
+            self.assertEqual(limiter.remaining, 5)
+            transport.get('https://api.data.gov/congress/v2/bill')
+            self.assertEqual(limiter.remaining, 4)
+
+
+class fakeTransport():
+
+    def __init__(self):
+        self.calls = 0
+
+    def get(self, url, params=None):
+        self.calls += 1
+        return cassette_response(url=url, status_code=200,
+                                 headers={'Content-Type': 'application/json'},
+                                 content=b'{"bills": [1, 2]}')
+
+
+class testCassettes(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.inner = fakeTransport()
+        self.recorder = recording_transport(self.tempdir.name,
+                                            inner=self.inner)
+        self.replayer = replay_transport(self.tempdir.name)
+        self.url = 'https://api.data.gov/congress/v2/bill?format=json'
+
+    def tearDown(self):
+        set_transport(None)
+        self.tempdir.cleanup()
+
+    def test_key_drops_api_key(self):
+        self.assertEqual(
+            cassette_key(self.url, {'api_key': 'secret', 'limit': 20}),
+            'https://api.data.gov/congress/v2/bill?format=json&limit=20')
+
+    def test_key_ignores_param_order(self):
+        self.assertEqual(cassette_key(self.url, {'offset': 20, 'limit': 20}),
+                         cassette_key(self.url, {'limit': 20, 'offset': 20}))
+
+    def test_record_then_replay(self):
+        params = {'api_key': 'secret', 'limit': 20}
+        self.recorder.get(self.url, params=params)
+        replayed = self.replayer.get(self.url, params=params)
+        self.assertEqual(replayed.status_code, 200)
+        self.assertEqual(replayed.json(), {'bills': [1, 2]})
+        self.assertEqual(self.inner.calls, 1)
+
+    def test_key_not_recorded(self):
+        self.recorder.get(self.url, params={'api_key': 'secret'})
+        for name in os.listdir(self.tempdir.name):
+            with open(os.path.join(self.tempdir.name, name), 'rb') as f:
+                self.assertNotIn(b'secret', f.read())
+
+    def test_replay_missing(self):
+        with self.assertRaises(LookupError):
+            self.replayer.get(self.url)
+
+    def test_call_uses_transport(self):
+        set_transport(self.recorder)
+        api = cdgAPI()
+        api.call(self.url)
+        set_transport(self.replayer)
+        self.assertEqual(api.call(self.url).json(), {'bills': [1, 2]})
+        self.assertEqual(self.inner.calls, 1)
+
+
+class testTransferStats(unittest.TestCase):
+
+    def test_record(self):
+        stats = transfer_stats()
+        stats.record(100, 400, 'gzip')
+        stats.record(50, 50)
+        self.assertEqual(stats.requests, 2)
+        self.assertEqual(stats.ratio, 150 / 450)
+        self.assertEqual(stats.encodings, {'gzip': 1, 'identity': 1})
+
+    def test_wire_size_from_header(self):
+        response = cassette_response(headers={'Content-Length': '12'},
+                                     content=b'x' * 40)
+        self.assertEqual(wire_size(response), 12)
+
+
+class testPageSizeTuner(unittest.TestCase):
+
+    def setUp(self):
+        self.tuner = page_size_tuner(max_page_bytes=100000,
+                                     target_latency=2.0)
+        self.url = 'https://api.data.gov/congress/v2/bill/116/hr/1/actions'
+
+    def test_endpoint_key(self):
+        self.assertEqual(endpoint_key(self.url), 'bill/*/hr/*/actions')
+
+    def test_single_page_when_it_fits(self):
+        self.assertEqual(self.tuner.page_size(self.url, 45), 45)
+
+    def test_respects_max_size(self):
+        self.assertEqual(self.tuner.page_size(self.url, 2000, max_size=250),
+                         250)
+
+    def test_evens_out_pages(self):
+        self.assertEqual(self.tuner.page_size(self.url, 260, max_size=250),
+                         130)
+
+    def test_byte_budget(self):
+        self.tuner.observe(self.url, 20, 0.5, 20000)
+        self.assertEqual(self.tuner.page_size(self.url, 500), 100)
+
+    def test_latency_budget(self):
+        self.tuner.observe(self.url, 10, 0.6, 100)
+        self.tuner.observe(self.url, 50, 1.0, 500)
+        # 0.5s overhead + 0.01s per item leaves room for 150 items in 2s
+        self.assertEqual(self.tuner.page_size(self.url, 1000), 143)
+
+    def test_limit_bounds(self):
+        api = cdgAPI()
+        api.limit = 1000
+        with self.assertRaises(ValueError):
+            api.limit = 1001
@@ -0,0 +1,83 @@
+import datetime
+import unittest
+from models.db.models import BillCommittee
+from pipeline.bills import load_bill
+from analysis import aggregates
+from tests.helpers import fakeBill, memory_session
+
+
+def sponsored(number, sponsor, actions, cosponsors=()):
+    # The first letter of the sponsor's id doubles as their party
+    return fakeBill(number, actions, cosponsors,
+                    sponsors=[{'bioguideId': sponsor, 'party': sponsor[0]}])
+
+
+class testAggregates(unittest.TestCase):
+
+    def setUp(self):
+        self.session = memory_session()
+        passed = [{'actionDate': '2021-01-14', 'actionCode': '8000',
+                   'text': 'Passed/agreed to in House'},
+                  {'actionDate': '2021-02-03', 'actionCode': '36000',
+                   'text': 'Became Public Law'}]
+        load_bill(self.session, sponsored(1, 'A000001', passed,
+                                          ['B000002', 'C000003']))
+        load_bill(self.session, sponsored(2, 'A000001', (), ['B000002']))
+        load_bill(self.session, sponsored(3, 'B000002', ()))
+        self.session.add_all([
+            BillCommittee(bill_id=1, committee_id=7,
+                          activity_name='Referred To',
+                          activity_date=datetime.date(2021, 1, 4)),
+            BillCommittee(bill_id=1, committee_id=7,
+                          activity_name='Reported By',
+                          activity_date=datetime.date(2021, 1, 10)),
+            BillCommittee(bill_id=2, committee_id=7,
+                          activity_name='Referred To',
+                          activity_date=datetime.date(2021, 1, 4))])
+        self.session.commit()
+        self.frames = aggregates.load_frames(self.session, congress=117)
+
+    def tearDown(self):
+        self.session.close()
+
+    def test_categoricals(self):
+        self.assertEqual(
+            str(self.frames['sponsorships']['bioguide_id'].dtype),
+            'category')
+
+    def test_bills_per_sponsor(self):
+        counts = aggregates.bills_per_sponsor(self.frames)
+        self.assertEqual(counts['A000001'], 2)
+        self.assertEqual(counts['B000002'], 1)
+
+    def test_bills_per_party(self):
+        counts = aggregates.bills_per_party(self.frames)
+        self.assertEqual(counts.to_dict(), {'A': 2, 'B': 1})
+
+    def test_cosponsors_per_bill(self):
+        counts = aggregates.cosponsors_per_bill(self.frames)
+        self.assertEqual(counts.tolist(), [2, 1, 0])
+
+    def test_days_to_passage(self):
+        self.assertEqual(
+            aggregates.days_to_passage(self.frames, 'house').tolist(), [10])
+        self.assertEqual(
+            aggregates.days_to_passage(self.frames, 'law').tolist(), [30])
+
+    def test_bad_milestone(self):
+        with self.assertRaises(ValueError):
+            aggregates.days_to_passage(self.frames, 'signed')
+
+    def test_stage_counts(self):
+        counts = aggregates.stage_counts(self.frames)
+        self.assertEqual(counts.loc['hr', 'introduced'], 2)
+        self.assertEqual(counts.loc['hr', 'law'], 1)
+
+    def test_committee_throughput(self):
+        table = aggregates.committee_throughput(self.frames)
+        self.assertEqual(table.loc[7, 'Referred To'], 2)
+        self.assertEqual(table.loc[7, 'Reported By'], 1)
+
+    def test_actions_per_month(self):
+        counts = aggregates.actions_per_month(self.frames)
+        self.assertEqual(counts.tolist(), [1, 1])
@@ -0,0 +1,105 @@
+import unittest
+from unittest import mock
+from APIConnectors import IDENTITY_MAP
+from models.cdg.legislation import amendment, amendments, bill
+from models.db.models import Actions, Amendment, BillStatus, Sponsorship
+from pipeline.amendments import load_amendment
+from pipeline.bills import load_bill
+from tests.helpers import fakeBill, fakeResponse, memory_session
+
+AMENDED_BILL = {'congress': 117, 'type': 'HR', 'number': '3684',
+                'url': 'http://api.data.gov/congress/v2/bill/117/hr/3684'}
+
+
+def fake_call(obj, url):
+    return fakeResponse({'amendment': {'url': url,
+                                       'amendedBill': AMENDED_BILL}},
+                        url=url)
+
+
+class testAmendment(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(amendment, 'call', fake_call)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        IDENTITY_MAP.clear()
+
+    def test_requires_args(self):
+        with self.assertRaises(AttributeError):
+            amendment(congress=117)
+
+    def test_batch(self):
+        keys = [('samdt', 2137), ('hamdt', 1)]
+        results = {item.key: item for item in amendments(117, keys)}
+        self.assertEqual(set(results), set(keys))
+        self.assertIsNone(results[('samdt', 2137)].error)
+        self.assertTrue(results[('samdt', 2137)].amendment.url.endswith(
+            'amendment/117/samdt/2137/'))
+
+    def test_amended_bill(self):
+        obj = next(amendments(117, [('samdt', 2137)])).amendment
+        self.assertIsInstance(obj.amended_bill, bill)
+        self.assertIs(obj.amended_bill, obj.amended_bill)
+        self.assertIsNone(obj.amended_amendment)
+
+
+class fakeAmendment():
+
+    def __init__(self, actions):
+        self.data = {'amendment': {
+            'congress': 117, 'type': 'SAMDT', 'number': 2137,
+            'chamber': 'Senate', 'purpose': 'In the nature of a substitute.',
+            'amendedBill': AMENDED_BILL,
+            'updateDate': '2021-08-10T12:00:00Z',
+            'sponsors': [{'bioguideId': 'S000522'}],
+            'cosponsors': {'count': 1, 'url': ''},
+            'actions': {'count': len(actions), 'url': ''}}}
+        self.actions = actions
+        self.cosponsors = [{'bioguideId': 'P000449'}]
+
+
+class testLoadAmendment(unittest.TestCase):
+
+    def setUp(self):
+        self.session = memory_session()
+        self.bill_row = load_bill(self.session, fakeBill(
+            3684, [{'actionDate': '2021-07-01', 'actionCode': '8000',
+                    'text': 'Passed/agreed to in House'}],
+            sponsors=[{'bioguideId': 'D000191'}],
+            update_date='2021-11-16T12:00:00Z',
+            introducedDate='2021-06-04'))
+        self.session.commit()
+
+    def tearDown(self):
+        self.session.close()
+
+    def test_load(self):
+        agreed = {'actionDate': '2021-08-10', 'actionCode': '36000',
+                  'text': 'Amendment SA 2137 agreed to in Senate'}
+        row = load_amendment(self.session, fakeAmendment([agreed]))
+        self.session.commit()
+        self.assertEqual(row.bill_id, self.bill_row.bill_id)
+        self.assertEqual(row.chamber, 'senate')
+        self.assertEqual(self.session.query(Actions)
+                         .filter_by(amendment_id=row.amendment_id).count(), 1)
+        sponsors = (self.session.query(Sponsorship)
+                    .filter_by(amendment_id=row.amendment_id).all())
+        self.assertEqual(sorted(item.bioguide_id for item in sponsors),
+                         ['P000449', 'S000522'])
+        self.assertTrue(all(item.bill_id is None for item in sponsors))
+        # The amendment's actions don't count towards the bill's status
+        self.assertEqual(self.session.get(BillStatus,
+                                          self.bill_row.bill_id).stage,
+                         'passed_house')
+
+    def test_reload_replaces(self):
+        load_amendment(self.session, fakeAmendment([{'actionDate':
+                                                     '2021-08-01'}] * 2))
+        load_amendment(self.session, fakeAmendment([]))
+        self.session.commit()
+        self.assertEqual(self.session.query(Amendment).count(), 1)
+        self.assertEqual(self.session.query(Actions)
+                         .filter(Actions.amendment_id.isnot(None)).count(), 0)
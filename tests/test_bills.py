@@ -1,8 +1,12 @@
 import unittest
-from models.cdg.legislation import bill
+from unittest import mock
+from requests import HTTPError
+from APIConnectors import IDENTITY_MAP
+from models.cdg.legislation import bill, bills
+from tests.helpers import fakeResponse, recorded_case
 
 
-class testBill(unittest.TestCase):
+class testBill(recorded_case):
 
     def setUp(self):
         self.bill_type = 'hr'
@@ -41,3 +45,38 @@ class testBill(unittest.TestCase):
 
     def test_find_title_by_tag_good(self):
         self.assertEqual
+
+
+def fake_call(obj, url):
+    return fakeResponse({'bill': {'url': url}},
+                        status_code=404 if '/404/' in url else 200, url=url)
+
+
+class testBills(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(bill, 'call', fake_call)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        IDENTITY_MAP.clear()
+
+    def test_batch(self):
+        keys = [('hr', 1), ('hr', 404), ('s', 2)]
+        results = {item.key: item for item in bills(116, keys, max_workers=2)}
+        self.assertEqual(set(results), set(keys))
+        self.assertIsNone(results[('hr', 1)].error)
+        self.assertEqual(results[('hr', 1)].bill.data['bill']['url'],
+                         'http://api.data.gov/congress/v2/bill/116/hr/1/')
+        self.assertIsInstance(results[('hr', 404)].error, HTTPError)
+        self.assertIsNone(results[('hr', 404)].bill)
+
+    def test_batch_shares_identity_map(self):
+        first = next(bills(116, [('hr', 1)])).bill
+        self.assertIs(bill.cached(congress=116, bill_type='hr', bill_num=1),
+                      first)
+
+    def test_failed_bill_not_cached(self):
+        list(bills(116, [('hr', 404)]))
+        self.assertEqual(len(IDENTITY_MAP), 0)
@@ -0,0 +1,143 @@
+import io
+import os
+import tempfile
+import unittest
+import zipfile
+from models.db.models import (Actions, Bill, BillCommittee, BillStatus,
+                              Committee, Related, Sponsorship)
+from pipeline import bulk
+from tests.helpers import memory_session
+
+# The original layout, with billNumber/billType and billCommittees
+OLD_LAYOUT = '''<?xml version="1.0" encoding="UTF-8"?>
+<billStatus><bill>
+  <billNumber>1</billNumber><billType>HR</billType><congress>117</congress>
+  <introducedDate>2021-01-04</introducedDate>
+  <createDate>2021-01-05T03:00:00Z</createDate>
+  <updateDate>2021-03-01T12:00:00Z</updateDate>
+  <committees><billCommittees><item>
+    <systemCode>hsju00</systemCode><name>Judiciary Committee</name>
+    <chamber>House</chamber><type>Standing</type>
+    <activities><item><name>Referred to</name>
+      <date>2021-01-04T18:00:00Z</date></item></activities>
+    <subcommittees><item>
+      <systemCode>hsju01</systemCode><name>Antitrust</name>
+      <activities><item><name>Referred to</name>
+        <date>2021-01-20T18:00:00Z</date></item></activities>
+    </item></subcommittees>
+  </item></billCommittees></committees>
+  <relatedBills>
+    <item><congress>117</congress><number>5</number><type>S</type>
+      <relationshipDetails><item><type>Identical bill</type>
+        <identifiedBy>CRS</identifiedBy></item></relationshipDetails></item>
+    <item><congress>117</congress><number>999</number><type>HR</type>
+      <relationshipDetails><item><type>Related bill</type>
+        <identifiedBy>CRS</identifiedBy></item></relationshipDetails></item>
+  </relatedBills>
+  <actions>
+    <actionTypeCounts><introducedInHouse>1</introducedInHouse>
+      <passedAgreedToInHouse>1</passedAgreedToInHouse></actionTypeCounts>
+    <actionByCounts><houseOfRepresentatives>2</houseOfRepresentatives>
+    </actionByCounts>
+    <item><actionDate>2021-01-04</actionDate><text>Introduced</text>
+      <actionCode>Intro-H</actionCode>
+      <sourceSystem><code>2</code><name>House floor actions</name>
+      </sourceSystem></item>
+    <item><actionDate>2021-02-10</actionDate>
+      <text>Passed/agreed to in House</text><actionCode>8000</actionCode>
+      <sourceSystem><code>9</code><name>Library of Congress</name>
+      </sourceSystem></item>
+  </actions>
+  <sponsors><item><bioguideId>A000001</bioguideId><party>D</party>
+    <state>CA</state></item></sponsors>
+  <cosponsors><item><bioguideId>B000002</bioguideId>
+    <sponsorshipDate>2021-01-04</sponsorshipDate>
+    <isOriginalCosponsor>True</isOriginalCosponsor></item></cosponsors>
+</bill></billStatus>
+'''
+
+# The current layout, with number/type and no billCommittees wrapper
+NEW_LAYOUT = '''<?xml version="1.0" encoding="UTF-8"?>
+<billStatus><version>3.0.0</version><bill>
+  <number>5</number><type>S</type><congress>117</congress>
+  <introducedDate>2021-01-06</introducedDate>
+  <updateDate>2021-03-01T12:00:00Z</updateDate>
+  <committees><item>
+    <systemCode>ssju00</systemCode><name>Judiciary Committee</name>
+    <chamber>Senate</chamber><type>Standing</type>
+    <activities><item><name>Referred to</name>
+      <date>2021-01-06T18:00:00Z</date></item></activities>
+  </item></committees>
+  <relatedBills><item><congress>117</congress><number>1</number>
+    <type>HR</type><relationshipDetails><item><type>Identical bill</type>
+    <identifiedBy>CRS</identifiedBy></item></relationshipDetails></item>
+  </relatedBills>
+  <actions><item><actionDate>2021-01-06</actionDate><text>Introduced</text>
+    <actionCode>10000</actionCode></item></actions>
+  <sponsors><item><bioguideId>C000003</bioguideId></item></sponsors>
+  <cosponsors/>
+</bill><dublinCore/></billStatus>
+'''
+
+
+class testParse(unittest.TestCase):
+
+    def test_old_layout(self):
+        record = bulk.parse_bill_status(io.BytesIO(OLD_LAYOUT.encode()))
+        self.assertEqual(record['bill']['type'], 'HR')
+        self.assertEqual(record['bill']['number'], '1')
+        self.assertEqual(record['bill']['actions'], {'count': 2})
+        self.assertEqual(record['actions'][0]['sourceSystem']['code'], 2)
+        self.assertEqual(record['actions'][1]['actionCode'], '8000')
+        self.assertIs(record['cosponsors'][0]['isOriginalCosponsor'], True)
+        self.assertEqual(record['committees'][0]['systemCode'], 'hsju00')
+        self.assertEqual(len(bulk.related_keys(record['related'])), 2)
+
+    def test_new_layout(self):
+        record = bulk.parse_bill_status(io.BytesIO(NEW_LAYOUT.encode()))
+        self.assertEqual(record['bill']['type'], 'S')
+        self.assertEqual(record['cosponsors'], [])
+        self.assertEqual(record['committees'][0]['systemCode'], 'ssju00')
+
+
+class testLoadArchives(unittest.TestCase):
+
+    def setUp(self):
+        self.session = memory_session()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'BILLSTATUS-117.zip')
+        with zipfile.ZipFile(self.path, 'w') as archive:
+            archive.writestr('BILLSTATUS-117hr1.xml', OLD_LAYOUT)
+            archive.writestr('BILLSTATUS-117s5.xml', NEW_LAYOUT)
+            archive.writestr('BILLSTATUS-117s6.xml', '<billStatus>')
+            archive.writestr('README.txt', 'not a bill')
+
+    def tearDown(self):
+        self.session.close()
+
+    def test_load(self):
+        totals = bulk.load_archives(self.session, [self.path], max_workers=2)
+        self.assertEqual(totals, {'bills': 2, 'related': 2, 'failed': 1})
+        self.assertEqual(self.session.query(Bill).count(), 2)
+        self.assertEqual(self.session.query(Actions).count(), 3)
+        self.assertEqual(self.session.query(Sponsorship).count(), 3)
+        self.assertEqual(self.session.query(BillCommittee).count(), 3)
+        sub = (self.session.query(Committee)
+               .filter_by(committee_code='hsju01').one())
+        self.assertEqual(sub.parent_committee_code, 'hsju00')
+        house = (self.session.query(Bill)
+                 .filter_by(bill_type='hr', bill_number='1').one())
+        self.assertEqual(self.session.get(BillStatus, house.bill_id).stage,
+                         'passed_house')
+        related = (self.session.query(Related)
+                   .filter_by(bill_id_1=house.bill_id).one())
+        self.assertEqual(related.relationship_type, 'Identical bill')
+
+    def test_reload_replaces(self):
+        bulk.load_archives(self.session, [self.path], max_workers=1)
+        bulk.load_archives(self.session, [self.path], max_workers=1)
+        self.assertEqual(self.session.query(Bill).count(), 2)
+        self.assertEqual(self.session.query(BillCommittee).count(), 3)
+        self.assertEqual(self.session.query(Related).count(), 2)
+        self.assertEqual(self.session.query(Committee).count(), 3)
@@ -0,0 +1,105 @@
+import datetime
+import unittest
+from models.db.models import Actions, Bill, BillStatus, ContentHash
+from pipeline.bills import get_checkpoint, load_bill, sync_checkpointed
+from pipeline.changes import change_feed, content_digest
+from tests.helpers import fakeBill, memory_session
+
+
+class testContentDigest(unittest.TestCase):
+
+    def test_stable(self):
+        self.assertEqual(content_digest({'a': 1, 'b': [1, 2]}),
+                         content_digest({'b': [1, 2], 'a': 1}))
+        self.assertEqual(
+            content_digest({'a': 1, 'updateDate': '2021-01-01'}),
+            content_digest({'a': 1, 'updateDate': '2022-01-01',
+                            'actions': {'count': 5, 'url': 'x'}}))
+        self.assertNotEqual(content_digest({'a': 1}), content_digest({'a': 2}))
+
+
+class testChangeDetection(unittest.TestCase):
+
+    def setUp(self):
+        self.session = memory_session()
+        self.actions = [{'actionDate': '2021-01-04', 'actionCode': '1000',
+                         'text': 'Introduced in House'}]
+        load_bill(self.session, fakeBill(1, self.actions), run_id='first')
+        self.session.commit()
+
+    def tearDown(self):
+        self.session.close()
+
+    def parts(self, run_id):
+        return sorted((row.part, row.change_type)
+                      for row in change_feed(self.session, run_id))
+
+    def test_first_load(self):
+        self.assertEqual(self.parts('first'), [
+            ('actions', 'added'), ('bill', 'added'),
+            ('cosponsors', 'added')])
+        self.assertEqual(self.session.query(ContentHash).count(), 3)
+
+    def test_unchanged_reload(self):
+        action_id = self.session.query(Actions.action_id).scalar()
+        status_date = self.session.query(BillStatus.update_date).scalar()
+        load_bill(self.session, fakeBill(1, self.actions,
+                                         update_date='2021-07-01T00:00:00Z'),
+                  run_id='second')
+        self.session.commit()
+        self.assertEqual(self.parts('second'), [])
+        self.assertEqual(self.session.query(Actions.action_id).scalar(),
+                         action_id)
+        self.assertEqual(self.session.query(BillStatus.update_date).scalar(),
+                         status_date)
+        self.assertEqual(self.session.query(Bill.ext_update_date).scalar(),
+                         datetime.datetime(2021, 7, 1))
+
+    def test_changed_parts(self):
+        load_bill(self.session, fakeBill(1, self.actions + [
+            {'actionDate': '2021-03-03', 'actionCode': '8000',
+             'text': 'Passed/agreed to in House'}], cosponsors=['B000002']),
+            run_id='second')
+        self.session.commit()
+        self.assertEqual(self.parts('second'), [('actions', 'changed'),
+                                                ('cosponsors', 'changed')])
+        self.assertEqual(self.session.query(BillStatus.stage).scalar(),
+                         'passed_house')
+
+    def test_force(self):
+        load_bill(self.session, fakeBill(1, self.actions), run_id='second',
+                  force=True)
+        self.assertEqual(len(self.parts('second')), 3)
+
+
+class testSyncCheckpointed(unittest.TestCase):
+
+    def setUp(self):
+        self.session = memory_session()
+        self.errors = list()
+
+    def tearDown(self):
+        self.session.close()
+
+    def sync(self, results):
+        def load(obj):
+            if obj == 'bad':
+                raise ValueError(obj)
+
+        return sync_checkpointed(self.session, 'test', lambda since: results,
+                                 load, started='2021-06-01T00:00:00Z',
+                                 on_error=lambda: self.errors.append(1))
+
+    def test_moves_checkpoint(self):
+        totals = self.sync([(('hr', 1), 'good', None)])
+        self.assertEqual(totals, {'loaded': 1, 'failed': 0})
+        self.assertEqual(get_checkpoint(self.session, 'test'),
+                         '2021-06-01T00:00:00Z')
+
+    def test_failure_holds_checkpoint(self):
+        totals = self.sync([(('hr', 1), 'good', None),
+                            (('hr', 2), 'bad', None),
+                            (('hr', 3), None, LookupError('404'))])
+        self.assertEqual(totals, {'loaded': 1, 'failed': 2})
+        self.assertEqual(self.errors, [1])
+        self.assertIsNone(get_checkpoint(self.session, 'test'))
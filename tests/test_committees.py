@@ -0,0 +1,143 @@
+import datetime
+import unittest
+from models.cdg.committees import committee, committeeReport
+from models.db.models import (Actions, Bill, BillCommittee, Committee,
+                              CommitteeReport)
+from pipeline import committees
+from tests.helpers import memory_session
+
+
+class testCommitteeConnectors(unittest.TestCase):
+
+    def test_committee_url(self):
+        obj = committee(chamber='house', committee_id='hsju00')
+        self.assertTrue(obj.url.endswith('committee/house/hsju00/'))
+
+    def test_committee_requires_args(self):
+        with self.assertRaises(AttributeError):
+            committee(chamber='house')
+
+    def test_report_url(self):
+        obj = committeeReport(congress=116, report_type='hrpt',
+                              report_num=617)
+        self.assertTrue(obj.url.endswith('committeeReport/116/hrpt/617/'))
+
+    def test_report_requires_args(self):
+        with self.assertRaises(AttributeError):
+            committeeReport(congress=116)
+
+
+class testCommitteeIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = committees.committee_index()
+        self.index.add('hsju00', name='Judiciary')
+        self.index.add('hsju01', 'hsju00')
+        self.index.add('hsju02', 'hsju00')
+        self.index.add('hsju0a', 'hsju01')
+
+    def test_lookups(self):
+        self.assertEqual(self.index.parent('hsju01'), 'hsju00')
+        self.assertEqual(self.index.children('hsju00'), ['hsju01', 'hsju02'])
+        self.assertEqual(self.index.ancestors('hsju0a'), ['hsju01', 'hsju00'])
+        self.assertEqual(self.index.root('hsju0a'), 'hsju00')
+        self.assertEqual(sorted(self.index.descendants('hsju00')),
+                         ['hsju01', 'hsju02', 'hsju0a'])
+
+    def test_unknown(self):
+        with self.assertRaises(KeyError):
+            self.index.parent('ssfi00')
+
+    def test_move(self):
+        self.index.add('hsju0a', 'hsju02')
+        self.assertEqual(self.index.children('hsju01'), [])
+        self.assertEqual(self.index.children('hsju02'), ['hsju0a'])
+
+    def test_rollup(self):
+        totals = self.index.rollup({'hsju0a': 2, 'hsju02': 1, 'ssfi00': 4})
+        self.assertEqual(totals['hsju00'], 3)
+        self.assertEqual(totals['hsju01'], 2)
+        self.assertEqual(totals['ssfi00'], 4)
+
+
+class testCommitteeLoader(unittest.TestCase):
+
+    def setUp(self):
+        self.session = memory_session()
+        self.items = [{'systemCode': 'hsju00', 'name': 'Judiciary Committee',
+                       'chamber': 'House', 'committeeTypeCode': 'Standard',
+                       'updateDate': '2020-02-04T00:07:37Z',
+                       'subcommittees': [{'systemCode': 'hsju01',
+                                          'name': 'Antitrust'}]},
+                      {'systemCode': 'hsju0a', 'name': 'Task Force',
+                       'chamber': 'House', 'committeeTypeCode': 'Task Force',
+                       'updateDate': '2020-02-04T00:07:37Z',
+                       'parent': {'systemCode': 'hsju01'}}]
+
+    def tearDown(self):
+        self.session.close()
+
+    def test_load_committees(self):
+        written = committees.load_committees(self.session, self.items)
+        self.session.commit()
+        self.assertEqual(written, 3)
+        sub = (self.session.query(Committee)
+               .filter_by(committee_code='hsju01').one())
+        self.assertEqual(sub.parent_committee_code, 'hsju00')
+        self.assertEqual(sub.chamber, 'house')
+        self.assertFalse(sub.is_current)
+        committees.load_committees(self.session, self.items, current=True)
+        self.session.commit()
+        self.assertEqual(self.session.query(Committee).count(), 3)
+        self.assertTrue(sub.is_current)
+        committees.load_committees(self.session, self.items[:1],
+                                   current=True)
+        self.session.commit()
+        task_force = (self.session.query(Committee)
+                      .filter_by(committee_code='hsju0a').one())
+        self.assertFalse(task_force.is_current)
+        self.assertTrue(sub.is_current)
+        committees.load_committees(self.session, self.items[1:])
+        self.session.commit()
+        self.assertTrue(sub.is_current)
+
+    def test_load_reports(self):
+        item = {'congress': 116, 'type': 'HRPT', 'number': 617, 'part': 1,
+                'chamber': 'House', 'citation': 'H. Rept. 116-617',
+                'updateDate': '2021-01-04T17:12:20Z', 'url': ''}
+        # The app's sessions don't autoflush, so the duplicate has to be
+        # caught without a query seeing the first one
+        with self.session.no_autoflush:
+            committees.load_committee_reports(self.session,
+                                              [item, dict(item)])
+        self.session.commit()
+        row = self.session.query(CommitteeReport).one()
+        self.assertEqual(row.report_type, 'hrpt')
+        self.assertEqual(row.citation, 'H. Rept. 116-617')
+
+    def test_committee_foreign_keys(self):
+        for table in (BillCommittee, Actions):
+            keys = table.__table__.c.committee_id.foreign_keys
+            self.assertEqual({key.target_fullname for key in keys},
+                             {'committee.committee_id'})
+
+    def test_committee_activity(self):
+        committees.load_committees(self.session, self.items)
+        self.session.flush()
+        ids = {row.committee_code: row.committee_id
+               for row in self.session.query(Committee)}
+        for number in (1, 2):
+            self.session.add(Bill(congress=117, bill_number=str(number),
+                                  bill_type='hr',
+                                  introduced=datetime.date(2021, 1, 4),
+                                  ext_create=datetime.datetime(2021, 1, 4),
+                                  ext_update=datetime.datetime(2021, 1, 4)))
+        self.session.flush()
+        day = datetime.date(2021, 1, 4)
+        self.session.add_all([
+            BillCommittee(1, ids['hsju0a'], 'Referred To', day),
+            BillCommittee(2, ids['hsju01'], 'Referred To', day),
+            BillCommittee(2, ids['hsju00'], 'Referred To', day)])
+        self.session.commit()
+        counts = committees.committee_activity(self.session, congress=117)
+        self.assertEqual(counts, {'hsju00': 2, 'hsju01': 2, 'hsju0a': 1})
@@ -1,5 +1,6 @@
 import unittest
-from models.cdg.core import actions
+from models.cdg.core import actions, text_version, lazy_list
+from tests.helpers import fakeResponse
 
 
 class testAction(unittest.TestCase):
@@ -46,3 +47,90 @@ class testAction(unittest.TestCase):
     def test_committee_code(self):
         self.assertEqual(self.data['committee']['systemCode'],
                          self.action.committee_code)
+
+
+class testTextVersion(unittest.TestCase):
+
+    def setUp(self):
+        self.data = {
+            "date": "2019-05-02T04:00:00Z",
+            "formats": [
+                {"type": "Formatted Text",
+                 "url": ("https://www.congress.gov/116/bills/hr2546/"
+                         "BILLS-116hr2546ih.htm")},
+                {"type": "PDF",
+                 "url": ("https://www.congress.gov/116/bills/hr2546/"
+                         "BILLS-116hr2546ih.pdf")}
+            ],
+            "type": "Introduced in House"
+        }
+        self.version = text_version(self.data)
+
+    def test_url(self):
+        self.assertEqual(self.data['formats'][0]['url'], self.version.url)
+
+    def test_missing_format(self):
+        missing = text_version(self.data, text_format='Formatted XML')
+        with self.assertRaises(AttributeError):
+            missing.text
+
+    def test_params(self):
+        self.assertEqual(dict(), self.version.params)
+
+    def test_version_type(self):
+        self.assertEqual(self.data['type'], self.version.version_type)
+
+
+class fakeLazyList(lazy_list):
+    """
+    lazy_list that serves pages out of a local list instead of the API.
+    """
+    def __init__(self, items, **kwargs):
+        source = {'count': len(items),
+                  'url': 'https://api.data.gov/congress/v2/bill/1/hr/1/titles'}
+        super().__init__(source=source, obj_name='titles', **kwargs)
+        self.items = items
+        self.offsets = list()
+
+    def call(self, url):
+        offset = self.params.get('offset', 0)
+        self.offsets.append(offset)
+        return fakeResponse({'titles': self.items[offset:offset + self.limit]})
+
+
+class testLazyList(unittest.TestCase):
+
+    def setUp(self):
+        self.items = [{'title': i} for i in range(45)]
+        self.view = fakeLazyList(self.items, max_pages=2)
+
+    def test_len_without_fetching(self):
+        self.assertEqual(len(self.view), 45)
+        self.assertEqual(self.view.pages_fetched, 0)
+
+    def test_index_fetches_one_page(self):
+        self.assertEqual(self.view[25], {'title': 25})
+        self.assertEqual(self.view.offsets, [20])
+
+    def test_negative_index(self):
+        self.assertEqual(self.view[-1], {'title': 44})
+
+    def test_index_out_of_range(self):
+        with self.assertRaises(IndexError):
+            self.view[45]
+
+    def test_iterate(self):
+        self.assertEqual(list(self.view), self.items)
+        self.assertEqual(self.view.offsets, [0, 20, 40])
+
+    def test_slice(self):
+        self.assertEqual(self.view[18:22], self.items[18:22])
+
+    def test_page_budget(self):
+        list(self.view)
+        self.assertEqual(len(self.view._pages), 2)
+        self.view[0]
+        self.assertEqual(self.view.pages_fetched, 4)
+
+    def test_equality(self):
+        self.assertEqual(self.view, self.items)
@@ -0,0 +1,85 @@
+import unittest
+from collections import namedtuple
+from analysis.cosponsors import cosponsor_graph
+from models.db.models import Sponsorship
+from tests.helpers import memory_session
+
+row = namedtuple('row', ['sponsorship_id', 'bill_id', 'bioguide_id',
+                         'is_sponsor', 'sponsorship_withdrawn_date'])
+
+
+class testCosponsorGraph(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = cosponsor_graph()
+        self.rows = [
+            row(1, 10, 'A000001', True, None),
+            row(2, 10, 'B000002', False, None),
+            row(3, 10, 'C000003', False, None),
+            row(4, 11, 'A000001', True, None),
+            row(5, 11, 'B000002', False, None),
+            row(6, 12, 'C000003', True, None),
+            row(7, 12, 'A000001', False, '2020-01-01'),
+        ]
+        self.graph.add_sponsorships(self.rows)
+
+    def test_members(self):
+        self.assertEqual(len(self.graph), 3)
+
+    def test_neighbors(self):
+        self.assertEqual(self.graph.neighbors('A000001', direction='in'),
+                         [('B000002', 2), ('C000003', 1)])
+        self.assertEqual(self.graph.neighbors('B000002'), [('A000001', 2)])
+
+    def test_withdrawn_skipped(self):
+        self.assertEqual(self.graph.neighbors('C000003', direction='in'), [])
+
+    def test_degree(self):
+        self.assertEqual(self.graph.degree('A000001', direction='in'), 2)
+        self.assertEqual(self.graph.degree('A000001', direction='in',
+                                           weighted=True), 3)
+        self.assertEqual(self.graph.degree('B000002', direction='both'), 1)
+
+    def test_unknown_member(self):
+        with self.assertRaises(KeyError):
+            self.graph.neighbors('Z000000')
+
+    def test_bad_direction(self):
+        with self.assertRaises(ValueError):
+            self.graph.degrees(direction='sideways')
+
+    def test_incremental_update_replaces_bill(self):
+        self.graph.neighbors('A000001')
+        self.graph.add_bill(11, 'A000001', ['C000003'])
+        self.assertEqual(self.graph.neighbors('A000001', direction='in'),
+                         [('C000003', 2), ('B000002', 1)])
+
+    def test_all_withdrawn_removes_bill(self):
+        self.graph.add_sponsorships([row(8, 11, 'A000001', True, None),
+                                     row(5, 11, 'B000002', False,
+                                         '2021-01-01')])
+        self.graph.add_sponsorships([row(4, 11, 'A000001', True,
+                                         '2021-01-01')])
+        self.assertEqual(self.graph.neighbors('A000001', direction='in'),
+                         [('B000002', 1), ('C000003', 1)])
+
+    def test_update_from_db_drops_deleted_bills(self):
+        session = memory_session()
+        graph = cosponsor_graph()
+        session.add_all([Sponsorship('A000001', bill_id=10, is_sponsor=True),
+                         Sponsorship('B000002', bill_id=10)])
+        session.flush()
+        self.assertEqual(graph.update_from_db(session), 1)
+        self.assertEqual(graph.degree('B000002'), 1)
+        session.query(Sponsorship).delete()
+        self.assertEqual(graph.update_from_db(session), 1)
+        self.assertEqual(graph.degree('B000002'), 0)
+
+    def test_new_member(self):
+        self.graph.add_bill(13, 'D000004', ['A000001'])
+        self.assertEqual(self.graph.degree('D000004', direction='in'), 1)
+
+    def test_pagerank(self):
+        scores = self.graph.pagerank()
+        self.assertAlmostEqual(sum(scores.values()), 1.0)
+        self.assertEqual(max(scores, key=scores.get), 'A000001')
@@ -0,0 +1,95 @@
+import gzip
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+from APIConnectors import cdgAPI
+from pipeline import export
+from pipeline.export import ndjson_writer, export_congress
+from tests.helpers import fakeResponse
+
+
+def fake_call(obj, url):
+    if url.endswith('/titles'):
+        return fakeResponse({'titles': [{'title': 'A title'}]})
+    if '/404/' in url:
+        return fakeResponse({}, status_code=404)
+    return fakeResponse({'bill': {
+        'number': url.rstrip('/').split('/')[-1],
+        'titles': {'count': 1, 'url': url + 'titles'}}})
+
+
+class testNdjsonWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.template = os.path.join(self.tempdir.name, 'bills-{part:02d}'
+                                     '.ndjson')
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def read(self, path, opener=open):
+        with opener(path, 'rt') as f:
+            return [json.loads(line) for line in f]
+
+    def test_single_file(self):
+        with ndjson_writer(self.template) as writer:
+            writer.write({'number': 1})
+            writer.write({'number': 2})
+        self.assertEqual(len(writer.files), 1)
+        self.assertEqual(self.read(writer.files[0]),
+                         [{'number': 1}, {'number': 2}])
+
+    def test_rotation(self):
+        with ndjson_writer(self.template, max_lines=2) as writer:
+            for i in range(5):
+                writer.write({'number': i})
+        self.assertEqual([os.path.basename(path) for path in writer.files],
+                         ['bills-00.ndjson', 'bills-01.ndjson',
+                          'bills-02.ndjson'])
+        self.assertEqual(self.read(writer.files[2]), [{'number': 4}])
+
+    def test_gzip(self):
+        with ndjson_writer(self.template, compression='gzip') as writer:
+            writer.write({'number': 1})
+        self.assertTrue(writer.files[0].endswith('.ndjson.gz'))
+        self.assertEqual(self.read(writer.files[0], gzip.open),
+                         [{'number': 1}])
+
+    def test_bad_compression(self):
+        with self.assertRaises(ValueError):
+            ndjson_writer(self.template, compression='lzma')
+
+    def test_rotation_needs_part(self):
+        with self.assertRaises(ValueError):
+            ndjson_writer('bills.ndjson', max_lines=10)
+
+
+class testExportCongress(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        patchers = [
+            mock.patch.object(cdgAPI, 'call', fake_call),
+            mock.patch.object(export, 'list_bills',
+                              lambda congress, bill_type: iter(
+                                  [('hr', 1), ('hr', 404), ('hr', 3)]))]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_export(self):
+        path = os.path.join(self.tempdir.name, 'bills.ndjson')
+        with ndjson_writer(path) as writer:
+            counts = export_congress(117, writer, max_workers=2)
+        self.assertEqual(counts, {'written': 2, 'failed': 1})
+        with open(path) as f:
+            records = sorted((json.loads(line) for line in f),
+                             key=lambda item: item['number'])
+        self.assertEqual(records[0]['titles']['list'],
+                         [{'title': 'A title'}])
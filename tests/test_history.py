@@ -0,0 +1,92 @@
+import datetime
+import random
+import unittest
+from models.db.models import Bill, BillVersion
+from pipeline.bills import load_bill
+from pipeline.history import (bill_as_of, bill_history, bill_version, diff,
+                              patch, record_version)
+from tests.helpers import fakeBill, memory_session
+
+
+class testDiff(unittest.TestCase):
+
+    def test_round_trip(self):
+        old = {'a': 1, 'b': {'c': [1, 2, 3, 4], 'd': 'x'}, 'e': None}
+        new = {'a': 2, 'b': {'c': [1, 9, 4, 5]}, 'f': [1]}
+        self.assertEqual(patch(old, diff(old, new)), new)
+
+    def test_list_splice(self):
+        old = list(range(100))
+        new = [-1] + old
+        self.assertEqual(diff(old, new), [['splice', [], 0, 0, [-1]]])
+
+    def test_random_round_trips(self):
+        generator = random.Random(5)
+        for i in range(50):
+            old = [generator.randint(0, 5) for i in range(10)]
+            new = [generator.randint(0, 5) for i in range(10)]
+            self.assertEqual(patch(list(old), diff(old, new)), new)
+
+
+class testBillHistory(unittest.TestCase):
+
+    def setUp(self):
+        self.session = memory_session()
+        self.actions = list()
+        for day in range(1, 8):
+            self.actions.insert(0, {'actionDate': '2021-03-0{}'.format(day),
+                                    'text': 'Action {}'.format(day)})
+            load_bill(self.session, fakeBill(
+                1, list(self.actions),
+                update_date='2021-03-0{}T12:00:00Z'.format(day)))
+        self.session.commit()
+        self.bill_id = self.session.query(Bill.bill_id).scalar()
+
+    def tearDown(self):
+        self.session.close()
+
+    def test_versions(self):
+        history = bill_history(self.session, self.bill_id)
+        self.assertEqual([item[0] for item in history], list(range(1, 8)))
+        self.assertEqual(history[0][1], datetime.datetime(2021, 3, 1, 12))
+        self.assertEqual(
+            len(bill_version(self.session, self.bill_id, 4)['actions']), 4)
+
+    def test_as_of(self):
+        record = bill_as_of(self.session, self.bill_id,
+                            datetime.date(2021, 3, 3))
+        self.assertEqual([item['text'] for item in record['actions']],
+                         ['Action 3', 'Action 2', 'Action 1'])
+        self.assertEqual(record['bill']['updateDate'],
+                         '2021-03-03T12:00:00Z')
+        self.assertIsNone(bill_as_of(self.session, self.bill_id,
+                                     datetime.date(2021, 2, 1)))
+
+    def test_out_of_order_valid_from(self):
+        # A re-sync of the 3rd's record after the 7th's stays the newest
+        record_version(self.session, self.bill_id, {'title': 'Re-synced'},
+                       valid_from=datetime.datetime(2021, 3, 3, 12))
+        history = bill_history(self.session, self.bill_id)
+        self.assertEqual(history[-1],
+                         (8, datetime.datetime(2021, 3, 7, 12)))
+        self.assertEqual(len(bill_as_of(self.session, self.bill_id,
+                                        datetime.date(2021, 3, 5))
+                             ['actions']), 5)
+
+    def test_unchanged_reload(self):
+        load_bill(self.session, fakeBill(1, list(self.actions),
+                                         update_date='2021-03-07T12:00:00Z'))
+        self.assertEqual(len(bill_history(self.session, self.bill_id)), 7)
+
+    def test_keyframes(self):
+        for i in range(5):
+            record_version(self.session, self.bill_id, {'title': str(i)},
+                           keyframe_interval=4)
+        keyframes = [row.version for row in self.session.query(BillVersion)
+                     .filter_by(bill_id=self.bill_id, is_keyframe=True)
+                     .order_by(BillVersion.version)]
+        self.assertEqual(keyframes, [1, 9])
+        self.assertEqual(bill_version(self.session, self.bill_id, 12),
+                         {'title': '4'})
+        self.assertEqual(len(bill_version(self.session, self.bill_id, 7)
+                             ['actions']), 7)
@@ -0,0 +1,121 @@
+import threading
+import unittest
+from unittest import mock
+from models.cdg.members import member
+from models.db.models import Member, Sponsorship
+from pipeline import members
+from pipeline.bills import ensure_members, sponsorship_row
+from tests.helpers import memory_session
+
+ENTRY = {'bioguideId': 'N000002', 'name': 'Nadler, Jerrold L.',
+         'partyName': 'Democratic', 'state': 'New York', 'district': 10,
+         'terms': {'item': [{'chamber': 'House of Representatives',
+                             'startYear': 1992}]},
+         'updateDate': '2022-11-07T13:42:19Z'}
+
+
+class testMember(unittest.TestCase):
+
+    def test_url(self):
+        self.assertTrue(member(bioguide_id='N000002').url.endswith(
+            'member/N000002/'))
+
+    def test_requires_args(self):
+        with self.assertRaises(AttributeError):
+            member()
+
+    def test_details(self):
+        details = members.member_details(ENTRY)
+        self.assertEqual(details['last_name'], 'Nadler')
+        self.assertEqual(details['first_name'], 'Jerrold')
+        self.assertEqual(details['middle_name'], 'L.')
+        self.assertEqual(details['party'], 'D')
+        self.assertEqual(details['state'], 'NY')
+        self.assertEqual(details['district'], '10')
+        self.assertEqual(details['chamber'], 'house')
+
+
+class testRoster(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(members, 'list_members',
+                                    return_value=[ENTRY])
+        self.list_members = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.roster = members.member_roster()
+
+    def test_fetched_once(self):
+        self.assertEqual(self.roster.get('N000002', 117)['party'], 'D')
+        self.assertIsNone(self.roster.get('X000000', 117))
+        self.assertEqual(self.list_members.call_count, 1)
+        self.assertIn(117, self.roster)
+
+    def test_congresses_fetch_independently(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def list_members(congress):
+            if congress == 117:
+                started.set()
+                release.wait(5)
+            return [ENTRY]
+
+        self.list_members.side_effect = list_members
+        slow = threading.Thread(target=self.roster.congress, args=(117,))
+        slow.start()
+        self.addCleanup(slow.join)
+        self.addCleanup(release.set)
+        started.wait(5)
+        self.assertIn('N000002', self.roster.congress(116))
+        self.assertNotIn(117, self.roster)
+        release.set()
+        slow.join()
+        self.assertIn(117, self.roster)
+
+    def test_sync(self):
+        session = memory_session()
+        self.addCleanup(session.close)
+        # Sponsor details a bill load left behind get updated
+        ensure_members(session, [{'bioguideId': 'N000002', 'state': 'NY'}])
+        session.commit()
+        self.assertEqual(members.sync_members(session, 117,
+                                              roster=self.roster), 1)
+        row = session.get(Member, 'N000002')
+        self.assertEqual(row.full_name, 'Nadler, Jerrold L.')
+        self.assertEqual(row.chamber, 'house')
+
+    def test_ensure_members_prefers_roster(self):
+        session = memory_session()
+        self.addCleanup(session.close)
+        sponsors = [{'bioguideId': 'N000002', 'state': 'NY', 'party': 'X'},
+                    {'bioguideId': 'B000002', 'lastName': 'Brady',
+                     'firstName': 'Kevin'}]
+        ensure_members(session, sponsors, congress=117, roster=self.roster)
+        row = session.get(Member, 'N000002')
+        self.assertEqual((row.party, row.chamber), ('D', 'house'))
+        self.assertEqual(row.full_name, 'Nadler, Jerrold L.')
+        self.assertEqual(session.get(Member, 'B000002').full_name,
+                         'Brady, Kevin')
+
+
+class testEnsureMembers(unittest.TestCase):
+
+    def setUp(self):
+        self.session = memory_session()
+
+    def tearDown(self):
+        self.session.close()
+
+    def test_adds_and_fills_in(self):
+        cosponsor = {'bioguideId': 'B000002'}
+        sponsor = {'bioguideId': 'B000002', 'party': 'R', 'state': 'TX',
+                   'district': 3}
+        self.assertEqual(ensure_members(self.session, [cosponsor]), 1)
+        self.session.add(sponsorship_row(None, cosponsor))
+        self.session.commit()
+        self.assertEqual(ensure_members(self.session, [sponsor]), 0)
+        self.session.commit()
+        row = self.session.get(Member, 'B000002')
+        self.assertEqual((row.party, row.district), ('R', '3'))
+        self.assertEqual(self.session.query(Sponsorship).one().bioguide_id,
+                         'B000002')
@@ -0,0 +1,112 @@
+import datetime
+import unittest
+from sqlalchemy.orm import scoped_session, sessionmaker
+from APIConnectors import cdgAPI, get_session
+from models.cdg.legislation import bill
+from models.db.models import Actions, Bill
+from pipeline.bills import load_bill
+from mirror import mirror_api, mirror_server, response_cache
+from tests.helpers import API_URL, fakeBill, memory_engine
+
+
+def numbered(number, actions, cosponsors=()):
+    return fakeBill(str(number), actions, cosponsors,
+                    update_date='2021-06-0{}T12:00:00Z'.format(number),
+                    title='Bill {}'.format(number),
+                    titles={'count': 3, 'url': API_URL + 'titles'})
+
+
+class testMirror(unittest.TestCase):
+
+    def setUp(self):
+        self.sessions = scoped_session(sessionmaker(
+            bind=memory_engine(shared=True)))
+        session = self.sessions()
+        actions = [{'actionDate': '2021-01-{:02d}'.format(day),
+                    'text': 'Action {}'.format(day)}
+                   for day in range(25, 0, -1)]
+        load_bill(session, numbered(1, actions, ['B000002']))
+        for number in range(2, 6):
+            load_bill(session, numbered(number, actions[:1]))
+        # A bill loaded before there was any history
+        now = datetime.datetime(2021, 5, 1)
+        row = Bill(117, '9', 's', now.date(), now, now)
+        session.add(row)
+        session.flush()
+        session.add(Actions(bill_id=row.bill_id, action_date=now.date(),
+                            action_text='Introduced in Senate'))
+        session.commit()
+        self.sessions.remove()
+        self.server = mirror_server(port=0,
+                                    session_factory=self.sessions).start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def fetch(self, obj):
+        obj._base_url = self.server.base_url
+        return obj
+
+    def test_bill(self):
+        obj = self.fetch(bill(congress=117, bill_type='hr', bill_num=1))
+        self.assertEqual(obj.data['bill']['title'], 'Bill 1')
+        self.assertNotIn('titles', obj.data['bill'])
+        self.assertEqual(len(obj.actions), 25)
+        self.assertEqual(obj.actions[24]['text'], 'Action 1')
+        self.assertEqual(obj.actions.pages_fetched, 1)
+        self.assertEqual([item['bioguideId'] for item in obj.cosponsors],
+                         ['B000002'])
+
+    def test_bill_without_history(self):
+        obj = self.fetch(bill(congress=117, bill_type='s', bill_num=9))
+        self.assertEqual(obj.data['bill']['introducedDate'], '2021-05-01')
+        self.assertEqual([item['text'] for item in obj.actions],
+                         ['Introduced in Senate'])
+        self.assertNotIn('cosponsors', obj.data['bill'])
+
+    def test_pagination(self):
+        listing = self.fetch(cdgAPI())
+        listing._url_parts = ['bill', 117, 'hr']
+        listing.limit = 2
+        pages = list(listing.paginate(listing.url))
+        self.assertEqual([len(page['bills']) for page in pages], [2, 2, 1])
+        self.assertEqual(pages[0]['pagination']['count'], 5)
+        self.assertEqual(pages[0]['bills'][0]['number'], '5')
+        listing.fromDateTime = '2021-06-04T00:00:00Z'
+        self.assertEqual(len(next(listing.paginate(listing.url))['bills']),
+                         2)
+
+    def test_cache_and_errors(self):
+        url = self.server.base_url + 'congress/v2/bill/117/hr/2'
+        first = get_session().get(url, params={'api_key': 'one'})
+        second = get_session().get(url, params={'api_key': 'two'})
+        self.assertEqual((first.headers['X-Cache'],
+                          second.headers['X-Cache']), ('MISS', 'HIT'))
+        self.assertEqual(first.json(), second.json())
+        self.assertEqual(get_session().get(
+            self.server.base_url + 'bill/117/hr/99').status_code, 404)
+        self.assertEqual(get_session().post(url).status_code, 405)
+
+
+class testMirrorApi(unittest.TestCase):
+
+    def test_routes(self):
+        api = mirror_api(session_factory=sessionmaker(), base_url='http://m/')
+        self.assertEqual(api.handle('/member/A000001', {})[0], 404)
+        page = api.page('actions', list(range(5)), {'limit': '2'},
+                        ['bill', 117, 'hr', 1, 'actions'])
+        self.assertEqual(page['actions'], [0, 1])
+        self.assertEqual(page['pagination']['next'],
+                         'http://m/bill/117/hr/1/actions?limit=2&offset=2')
+        with self.assertRaises(ValueError):
+            api.page('actions', [], {'limit': '0'}, ['bill'])
+
+    def test_cache_expiry(self):
+        cache = response_cache(maxsize=2, ttl=60)
+        for key in 'abc':
+            cache.add(key, key)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.get('c'), 'c')
+        cache.ttl = -1
+        cache.add('d', 'd')
+        self.assertIsNone(cache.get('d'))
@@ -0,0 +1,109 @@
+import unittest
+from unittest import mock
+from APIConnectors import IDENTITY_MAP
+from models.cdg.nominations import nomination, nominations
+from models.db.models import (Actions, Committee, Nomination,
+                              NominationCommittee, Nominee)
+from pipeline.nominations import load_nomination
+from tests.helpers import fakeResponse, memory_session
+
+POSITIONS = [{'ordinal': 1, 'positionTitle': 'Ambassador to Mongolia',
+              'organization': 'Department of State', 'nomineeCount': 1,
+              'url': 'http://api.data.gov/congress/v2/nomination/117/2467/1'}]
+
+
+def fake_call(obj, url):
+    return fakeResponse({'nomination': {'url': url, 'nominees': POSITIONS}},
+                        url=url)
+
+
+class testNomination(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(nomination, 'call', fake_call)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        IDENTITY_MAP.clear()
+
+    def test_url(self):
+        self.assertTrue(nomination(congress=117, nom_num=2467).url.endswith(
+            'nomination/117/2467/'))
+
+    def test_min_congress(self):
+        with self.assertRaises(ValueError):
+            nomination(congress=96, nom_num=1)
+
+    def test_requires_args(self):
+        with self.assertRaises(AttributeError):
+            nomination(congress=117)
+
+    def test_batch(self):
+        results = list(nominations(117, [(2467,), (2468,)], max_workers=2))
+        self.assertEqual({item.key for item in results}, {(2467,), (2468,)})
+        obj = results[0].nomination
+        self.assertEqual(len(obj.nominees(1)), 1)
+        with self.assertRaises(KeyError):
+            obj.nominees(2)
+
+
+class fakeNomination():
+
+    def __init__(self, actions):
+        self.data = {'nomination': {
+            'congress': 117, 'number': 2467, 'citation': 'PN2467',
+            'organization': 'Department of State', 'isCivilian': True,
+            'receivedDate': '2022-08-01',
+            'updateDate': '2022-09-29T12:00:00Z',
+            'nominees': POSITIONS,
+            'actions': {'count': len(actions), 'url': ''},
+            'committees': {'count': 1, 'url': ''}}}
+        self.positions = POSITIONS
+        self.actions = actions
+        self.committees = [{'systemCode': 'ssfr00', 'chamber': 'Senate',
+                            'name': 'Foreign Relations Committee',
+                            'type': 'Standing',
+                            'activities': [{'name': 'Referred to',
+                                            'date': '2022-08-01T00:00:00Z'},
+                                           {'name': 'Reported by',
+                                            'date': '2022-09-21T00:00:00Z'}]}]
+
+    def nominees(self, ordinal):
+        return [{'firstName': 'Richard', 'lastName': 'Buangan',
+                 'state': 'CA'}]
+
+
+class testLoadNomination(unittest.TestCase):
+
+    def setUp(self):
+        self.session = memory_session()
+
+    def tearDown(self):
+        self.session.close()
+
+    def test_load(self):
+        actions = [{'actionDate': '2022-08-01', 'type': 'IntroReferral',
+                    'text': 'Received in the Senate'}]
+        row = load_nomination(self.session, fakeNomination(actions))
+        self.session.commit()
+        self.assertEqual(row.citation, 'PN2467')
+        nominee = self.session.query(Nominee).one()
+        self.assertEqual((nominee.ordinal, nominee.last_name),
+                         (1, 'Buangan'))
+        self.assertEqual(nominee.position_title, 'Ambassador to Mongolia')
+        self.assertEqual(self.session.query(Actions)
+                         .filter_by(nomination_id=row.nomination_id).count(),
+                         1)
+        self.assertEqual(self.session.query(NominationCommittee).count(), 2)
+        self.assertEqual(self.session.query(Committee).one().committee_code,
+                         'ssfr00')
+
+    def test_reload_replaces(self):
+        load_nomination(self.session, fakeNomination([{}, {}]))
+        load_nomination(self.session, fakeNomination([]))
+        self.session.commit()
+        self.assertEqual(self.session.query(Nomination).count(), 1)
+        self.assertEqual(self.session.query(Nominee).count(), 1)
+        self.assertEqual(self.session.query(Actions).count(), 0)
+        self.assertEqual(self.session.query(NominationCommittee).count(), 2)
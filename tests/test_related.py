@@ -0,0 +1,98 @@
+import unittest
+from models.cdg.legislation import bill
+from models.db.models import Related
+from pipeline.bills import load_bill
+from analysis.related import related_graph, union_find
+from tests.helpers import fakeBill, memory_session
+
+
+class testUnionFind(unittest.TestCase):
+
+    def test_union(self):
+        sets = union_find()
+        sets.union(1, 2)
+        sets.union(3, 4)
+        self.assertNotEqual(sets.find(1), sets.find(3))
+        sets.union(2, 4)
+        self.assertEqual(sets.find(1), sets.find(3))
+        self.assertEqual(sorted(sets.members(4)), [1, 2, 3, 4])
+        self.assertEqual(len(sets.sets()), 1)
+
+
+class testRelatedGraph(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = related_graph()
+        for bill_id in range(1, 7):
+            self.graph.add_bill(bill_id)
+        self.graph.add_edge(1, 2, 'Identical bill')
+        self.graph.add_edge(2, 3, 'Related bill')
+        self.graph.add_edge(4, 5, 'Identical bill')
+
+    def test_clusters(self):
+        self.assertEqual(sorted(self.graph.cluster_of(1)), [1, 2, 3])
+        self.assertEqual(sorted(self.graph.cluster_of(1, 'Identical bill')),
+                         [1, 2])
+        self.assertEqual(self.graph.cluster_of(3, 'Identical bill'), [3])
+        self.assertEqual(self.graph.cluster_of(6), [6])
+        self.assertEqual([len(item) for item in self.graph.clusters()],
+                         [3, 2])
+
+    def test_unknown_bill(self):
+        with self.assertRaises(KeyError):
+            self.graph.cluster_of(99)
+
+    def test_neighbors(self):
+        self.assertEqual(self.graph.neighbors(2), [1, 3])
+        self.assertEqual(self.graph.neighbors(2, 'Related bill'), [3])
+        self.assertEqual(self.graph.relationship_types,
+                         ['Identical bill', 'Related bill'])
+
+
+class testLoadRelated(unittest.TestCase):
+
+    def setUp(self):
+        self.session = memory_session()
+
+    def tearDown(self):
+        self.session.close()
+
+    def test_load_and_graph(self):
+        # H.R. 1's related bills aren't loaded yet, so nothing is written
+        load_bill(self.session, fakeBill(
+            1, related=[('S', 1, 'Identical bill'),
+                        ('HRES', 5, 'Procedurally-related')]))
+        self.assertEqual(self.session.query(Related).count(), 0)
+        load_bill(self.session, fakeBill(
+            1, related=[('HR', 1, 'Identical bill')], bill_type='S'))
+        load_bill(self.session, fakeBill(
+            5, related=[('HR', 1, 'Procedurally-related')],
+            bill_type='HRES'))
+        self.session.commit()
+        self.assertEqual(self.session.query(Related).count(), 2)
+        graph = related_graph.from_db(self.session, congress=117)
+        house = graph.bill_id(117, 'HR', 1)
+        self.assertEqual(sorted(graph.label(item)[1]
+                                for item in graph.cluster_of(house)),
+                         ['hr', 'hres', 's'])
+        self.assertEqual(len(graph.cluster_of(house, 'Identical bill')), 2)
+
+    def test_dropped_related_bills(self):
+        house = load_bill(self.session, fakeBill(1))
+        senate = load_bill(self.session, fakeBill(
+            1, related=[('HR', 1, 'Identical bill')], bill_type='S'))
+        self.session.add(Related(senate.bill_id, house.bill_id,
+                                 'Similar text', 'minhash'))
+        self.session.commit()
+        load_bill(self.session, fakeBill(
+            1, bill_type='S', update_date='2021-07-01T12:00:00Z'))
+        self.session.commit()
+        self.assertEqual([row.identified_by for row in
+                          self.session.query(Related)], ['minhash'])
+
+    def test_related_bills_property(self):
+        obj = bill(congress=117, bill_type='hr', bill_num=1)
+        obj._data = {'bill': {'relatedBills': {'count': 3, 'url': 'x'},
+                              'actions': {'count': 9, 'url': 'y'}}}
+        self.assertEqual(obj.related_bills.name, 'relatedBills')
+        self.assertEqual(len(obj.related_bills), 3)
@@ -0,0 +1,95 @@
+import json
+import unittest
+from models.cdg import schema
+from models.cdg.core import typed_list
+from models.cdg.legislation import TYPED_LISTS, bill
+from tests.helpers import fakeResponse
+import msgspec
+
+ACTIONS = {'actions': [
+    {'actionDate': '2021-01-04', 'actionCode': '1000', 'type': 'IntroReferral',
+     'text': 'Introduced in House',
+     'sourceSystem': {'code': 9, 'name': 'Library of Congress'},
+     'committees': [{'name': 'Judiciary Committee', 'systemCode': 'hsju00',
+                     'url': 'x'}]},
+    {'actionDate': '2021-01-05', 'text': 'Referred'}],
+    'pagination': {'count': 2}}
+COMMITTEES = {'billCommittees': [
+    {'name': 'Judiciary Committee', 'systemCode': 'hsju00',
+     'chamber': 'House', 'type': 'Standard',
+     'activities': [{'name': 'Referred To', 'date': '2021-01-04T17:01:10Z'}],
+     'subcommittees': []}],
+    'pagination': {'count': 1}}
+BILL = {'bill': {'congress': 117, 'type': 'HR', 'number': '1',
+                 'sponsors': [{'bioguideId': 'A000001', 'district': '5'}],
+                 'actions': {'count': 2, 'url': 'x'},
+                 'policyArea': {'name': 'Government Operations'}}}
+
+
+class schemaChecks():
+    """
+    The same checks against whichever schema self.schema is.
+    """
+
+    def test_page(self):
+        actions = self.schema.decode(json.dumps(ACTIONS).encode(), 'action',
+                                     'actions', True)
+        self.assertEqual(len(actions), 2)
+        self.assertEqual(actions[0].source_system.name, 'Library of Congress')
+        self.assertEqual(actions[0].committees[0].system_code, 'hsju00')
+        self.assertIsNone(actions[1].source_system)
+        self.assertEqual(actions[1].committees, [])
+
+    def test_committee_page(self):
+        list_name, kind = TYPED_LISTS['committees']
+        committees = self.schema.decode(json.dumps(COMMITTEES).encode(), kind,
+                                        list_name, True)
+        self.assertEqual(committees[0].system_code, 'hsju00')
+        self.assertEqual(committees[0].activities[0].name, 'Referred To')
+
+    def test_single(self):
+        record = self.schema.decode(json.dumps(BILL).encode(), 'bill', 'bill',
+                                    False)
+        self.assertEqual((record.congress, record.number), (117, '1'))
+        self.assertEqual(record.sponsors[0].district, '5')
+        self.assertEqual(record.actions.count, 2)
+        self.assertEqual(record.policy_area.name, 'Government Operations')
+        self.assertIsNone(record.titles)
+
+    def test_convert(self):
+        record = self.schema.convert('cosponsor', {'bioguideId': 'B000002',
+                                                   'isOriginalCosponsor':
+                                                   True})
+        self.assertEqual(record.bioguide_id, 'B000002')
+        self.assertTrue(record.is_original_cosponsor)
+        self.assertIsNone(record.party)
+
+
+class testTupleSchema(schemaChecks, unittest.TestCase):
+
+    def setUp(self):
+        self.schema = schema._tuple_schema()
+
+
+class testStructSchema(schemaChecks, unittest.TestCase):
+
+    def setUp(self):
+        self.schema = schema._struct_schema(msgspec)
+
+
+class testTypedList(unittest.TestCase):
+
+    def test_pages(self):
+        view = typed_list(source={'count': 2, 'url': 'https://x/actions'},
+                          obj_name='actions', kind='action')
+        view.call = lambda url: fakeResponse(ACTIONS)
+        self.assertEqual([item.text for item in view],
+                         ['Introduced in House', 'Referred'])
+
+    def test_bill(self):
+        obj = bill(congress=117, bill_type='hr', bill_num=1)
+        obj._data = BILL
+        self.assertEqual(obj.typed('actions').kind, 'action')
+        self.assertEqual(obj.record.sponsors[0].bioguide_id, 'A000001')
+        self.assertEqual(schema.camel('update_date_including_text'),
+                         'updateDateIncludingText')
@@ -0,0 +1,54 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import settings
+
+
+class testGetApiKey(unittest.TestCase):
+
+    def setUp(self):
+        self.env = os.environ.pop(settings.API_KEY_ENV, None)
+        self.config_file = settings.CONFIG_FILE
+        self.tempdir = tempfile.TemporaryDirectory()
+        settings._api_key = settings._NOT_LOOKED_UP
+
+    def tearDown(self):
+        if self.env is not None:
+            os.environ[settings.API_KEY_ENV] = self.env
+        else:
+            os.environ.pop(settings.API_KEY_ENV, None)
+        settings.CONFIG_FILE = self.config_file
+        settings._api_key = settings._NOT_LOOKED_UP
+        self.tempdir.cleanup()
+
+    def test_env(self):
+        os.environ[settings.API_KEY_ENV] = 'from-env'
+        self.assertEqual(settings.get_api_key(), 'from-env')
+
+    def test_config_file(self):
+        path = os.path.join(self.tempdir.name, 'config.ini')
+        with open(path, 'w') as config:
+            config.write('[api]\nkey = from-config\n')
+        settings.CONFIG_FILE = path
+        self.assertEqual(settings.get_api_key(), 'from-config')
+
+    def test_resolved_once(self):
+        os.environ[settings.API_KEY_ENV] = 'first'
+        settings.get_api_key()
+        os.environ[settings.API_KEY_ENV] = 'second'
+        self.assertEqual(settings.get_api_key(), 'first')
+
+    def test_set_api_key(self):
+        os.environ[settings.API_KEY_ENV] = 'from-env'
+        settings.set_api_key('worker-key')
+        self.assertEqual(settings.get_api_key(), 'worker-key')
+
+    def test_missing_searched_once(self):
+        with mock.patch.object(settings, '_find_api_key',
+                               return_value=None) as find:
+            with self.assertLogs('settings', 'WARNING') as logs:
+                self.assertIsNone(settings.get_api_key())
+                self.assertIsNone(settings.get_api_key())
+        self.assertEqual(find.call_count, 1)
+        self.assertEqual(len(logs.output), 1)
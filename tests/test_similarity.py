@@ -0,0 +1,113 @@
+import datetime
+import random
+import unittest
+from models.db.models import Bill, BillText, Related
+from pipeline.bills import load_related
+from pipeline.texts import load_texts, version_text
+from analysis.similarity import (find_near_duplicates, minhash_index,
+                                 shingle_hashes)
+from tests.helpers import memory_session
+
+
+def random_text(generator, length=600):
+    words = ['word{}'.format(i) for i in range(3000)]
+    return ' '.join(generator.choice(words) for i in range(length))
+
+
+class testMinhashIndex(unittest.TestCase):
+
+    def setUp(self):
+        generator = random.Random(7)
+        self.base = random_text(generator)
+        words = self.base.split()
+        words[100] = 'amended'
+        words[400] = 'struck'
+        self.near = ' '.join(words) + ' and for other purposes'
+        self.other = random_text(generator)
+        self.index = minhash_index()
+        self.index.add_many(['a', 'b', 'c'],
+                            [self.base, self.near, self.other])
+
+    def test_shingles(self):
+        self.assertEqual(len(shingle_hashes('one two three', size=5)), 1)
+        self.assertEqual(len(shingle_hashes('')), 0)
+        self.assertEqual(list(shingle_hashes('A b, c d e f')),
+                         list(shingle_hashes('a B c d e. F')))
+
+    def test_near_duplicates(self):
+        pairs = self.index.similar_pairs(0.8)
+        self.assertEqual([sorted(pair[:2]) for pair in pairs], [['a', 'b']])
+        self.assertLess(self.index.similarity('a', 'c'), 0.1)
+        self.assertEqual(self.index.query(self.near), ['a', 'b'])
+
+    def test_bands(self):
+        with self.assertRaises(ValueError):
+            minhash_index(num_perm=100, bands=16)
+        self.assertEqual(self.index.add('a', self.other), 0)
+        self.assertEqual(len(self.index), 3)
+
+
+class testNearDuplicateRows(unittest.TestCase):
+
+    def setUp(self):
+        self.session = memory_session()
+        now = datetime.datetime(2021, 6, 1)
+        self.bills = list()
+        for number in range(1, 4):
+            row = Bill(117, str(number), 'hr', now.date(), now, now)
+            self.session.add(row)
+            self.bills.append(row)
+        self.session.flush()
+        generator = random.Random(3)
+        text = random_text(generator)
+        texts = [text, text + ' section 2 short title', random_text(generator)]
+        for row, body in zip(self.bills, texts):
+            load_texts(self.session, row.bill_id,
+                       [version_text('Introduced in House', '2021-01-04',
+                                     'early draft'),
+                        version_text('Reported in House', '2021-03-01',
+                                     body)])
+        self.session.commit()
+
+    def tearDown(self):
+        self.session.close()
+
+    def test_load_texts_skips_unchanged(self):
+        first = self.bills[0].bill_id
+        text = (self.session.query(BillText.text)
+                .filter_by(bill_id=first, version_type='Reported in House')
+                .scalar())
+        self.assertEqual(load_texts(
+            self.session, first,
+            [version_text('Reported in House', '2021-03-01', text)]), 0)
+        self.assertEqual(load_texts(
+            self.session, first,
+            [version_text('Reported in House', '2021-03-01', 'new text')]), 1)
+
+    def test_find_near_duplicates(self):
+        first, second, third = [row.bill_id for row in self.bills]
+        pairs = find_near_duplicates(self.session, congress=117)
+        self.assertEqual([sorted(pair[:2]) for pair in pairs],
+                         [[first, second]])
+        # Running it again replaces the rows rather than adding to them
+        find_near_duplicates(self.session, congress=117)
+        rows = self.session.query(Related).all()
+        self.assertEqual([(row.bill_id_1, row.bill_id_2, row.identified_by)
+                          for row in rows], [(first, second, 'minhash')])
+        # Reloading a bill's related bills from the API keeps them too
+        load_related(self.session, {first: [(117, 'hr', '3', 'Related bill',
+                                             'House')]})
+        self.session.commit()
+        self.assertEqual(sorted((row.bill_id_2, row.identified_by) for row in
+                                self.session.query(Related)
+                                .filter_by(bill_id_1=first)),
+                         [(second, 'minhash'), (third, 'House')])
+
+    def test_diverged_text_drops_row(self):
+        find_near_duplicates(self.session, congress=117)
+        load_texts(self.session, self.bills[1].bill_id,
+                   [version_text('Reported in House', '2021-03-01',
+                                 random_text(random.Random(4)))])
+        self.session.commit()
+        self.assertEqual(find_near_duplicates(self.session, congress=117), [])
+        self.assertEqual(self.session.query(Related).count(), 0)
@@ -0,0 +1,112 @@
+import datetime
+import unittest
+from collections import namedtuple
+from models.db.models import BillStatus
+from pipeline.bills import load_bill, parse_datetime
+from pipeline.status import (action_stage, derive_status, bills_passed,
+                             bills_at_stage)
+from tests.helpers import fakeBill, memory_session
+
+action = namedtuple('action', ['action_date', 'action_code', 'action_text'])
+
+
+class testDeriveStatus(unittest.TestCase):
+
+    def setUp(self):
+        self.actions = [
+            action(datetime.date(2021, 1, 4), '1000', 'Introduced in House'),
+            action(datetime.date(2021, 3, 1), 'H30000', 'Considered.'),
+            action(datetime.date(2021, 3, 3), '8000',
+                   'Passed/agreed to in House: On passage Passed.'),
+            action(datetime.date(2021, 3, 3), None,
+                   'Passed/agreed to in House: duplicate from the floor.'),
+        ]
+
+    def test_action_stage_code(self):
+        self.assertEqual(action_stage('17000', 'anything'), 'passed_senate')
+
+    def test_action_stage_text(self):
+        self.assertEqual(action_stage(None, 'Became Public Law No: 117-2.'),
+                         'became_law')
+
+    def test_action_stage_passage_text(self):
+        self.assertEqual(
+            action_stage(None, 'Passed/agreed to in House: On passage '
+                               'Passed by recorded vote'), 'passed_house')
+        self.assertEqual(
+            action_stage(None, 'Passed/agreed to in Senate: Passed Senate '
+                               'without amendment by Unanimous Consent.'),
+            'passed_senate')
+
+    def test_passed_text_only(self):
+        actions = [
+            action(datetime.date(2021, 1, 4), '1000', 'Introduced in House'),
+            action(datetime.date(2021, 3, 3), None,
+                   'Passed/agreed to in House: On passage Passed.')]
+        status = derive_status(actions)
+        self.assertEqual(status['stage'], 'passed_house')
+        self.assertEqual(status['passed_house_date'],
+                         datetime.date(2021, 3, 3))
+
+    def test_action_stage_other(self):
+        self.assertIsNone(action_stage('H11100', 'Referred to committee'))
+
+    def test_passed_house(self):
+        status = derive_status(self.actions)
+        self.assertEqual(status['stage'], 'passed_house')
+        self.assertEqual(status['passed_house_date'],
+                         datetime.date(2021, 3, 3))
+        self.assertEqual(status['introduced_date'], datetime.date(2021, 1, 4))
+        self.assertIsNone(status['became_law_date'])
+
+    def test_law(self):
+        actions = self.actions + [
+            action(datetime.date(2021, 3, 6), '17000', 'Passed Senate'),
+            action(datetime.date(2021, 3, 11), '36000', 'Became Public Law')]
+        status = derive_status(actions)
+        self.assertEqual(status['stage'], 'law')
+        self.assertEqual(status['latest_action_date'],
+                         datetime.date(2021, 3, 11))
+
+    def test_no_actions(self):
+        self.assertEqual(derive_status([])['stage'], 'introduced')
+
+
+class testStatusTable(unittest.TestCase):
+
+    def setUp(self):
+        self.session = memory_session()
+        passed = [{'actionDate': '2021-03-03', 'actionCode': '8000',
+                   'text': 'Passed/agreed to in House'}]
+        load_bill(self.session, fakeBill(1, passed))
+        load_bill(self.session, fakeBill(2))
+        self.session.commit()
+
+    def tearDown(self):
+        self.session.close()
+
+    def test_loaded(self):
+        self.assertEqual(self.session.query(BillStatus).count(), 2)
+
+    def test_bills_passed(self):
+        self.assertEqual(bills_passed(self.session, 117, 'house').count(), 1)
+        self.assertEqual(bills_passed(self.session, 117, 'senate').count(), 0)
+
+    def test_bills_at_stage(self):
+        self.assertEqual(
+            bills_at_stage(self.session, 117, 'introduced').count(), 1)
+
+    def test_reload_replaces(self):
+        load_bill(self.session, fakeBill(2, [
+            {'actionDate': '2021-04-01', 'actionCode': '8000',
+             'text': 'Passed/agreed to in House'}]))
+        self.session.commit()
+        self.assertEqual(bills_passed(self.session, 117, 'house').count(), 2)
+
+    def test_bad_chamber(self):
+        with self.assertRaises(ValueError):
+            bills_passed(self.session, 117, 'senat')
+
+    def test_parse_datetime(self):
+        self.assertEqual(parse_datetime('2021-06-01T12:00:00Z'),
+                         datetime.datetime(2021, 6, 1, 12))
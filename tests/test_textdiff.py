@@ -0,0 +1,72 @@
+import unittest
+from analysis import textdiff
+
+
+class testTextDiff(unittest.TestCase):
+
+    def setUp(self):
+        self.old = ('A BILL\n\nTo do things.\n\n'
+                    'SEC. 1. SHORT TITLE.\n\nThis Act may be cited as the '
+                    'Things Act.\n\n'
+                    'SEC. 2. DEFINITIONS.\n\nIn this Act, the term thing '
+                    'means a thing.\n')
+        self.new = ('A BILL\n\nTo do things.\n\n'
+                    'SEC. 1. SHORT TITLE.\n\nThis Act may be cited as the '
+                    'Things Act.\n\n'
+                    'SEC. 2. DEFINITIONS.\n\nIn this Act, the term thing '
+                    'means any thing.\n\n'
+                    'SEC. 3. FUNDING.\n\nThere are authorized such sums.\n')
+        self.cache = textdiff.diff_cache(maxsize=4)
+
+    def test_split_sections(self):
+        sections = textdiff.split_sections(self.old)
+        self.assertEqual([item.key for item in sections],
+                         ['A BILL', 'SEC. 1. SHORT TITLE.',
+                          'SEC. 2. DEFINITIONS.'])
+
+    def test_split_paragraphs(self):
+        paragraphs = textdiff.split_sections(self.old, level='paragraph')
+        self.assertEqual(len(paragraphs), 6)
+
+    def test_split_bad_level(self):
+        with self.assertRaises(ValueError):
+            textdiff.split_sections(self.old, level='word')
+
+    def test_digest_ignores_whitespace(self):
+        self.assertEqual(textdiff.digest('a  b\nc'), textdiff.digest('a b c'))
+
+    def test_diff_statuses(self):
+        results = textdiff.diff_texts(self.old, self.new, cache=self.cache)
+        statuses = [(item.key, item.status) for item in results]
+        self.assertEqual(statuses,
+                         [('A BILL', 'unchanged'),
+                          ('SEC. 1. SHORT TITLE.', 'unchanged'),
+                          ('SEC. 2. DEFINITIONS.', 'changed'),
+                          ('SEC. 3. FUNDING.', 'added')])
+        self.assertIn('+In this Act, the term thing means any thing.',
+                      results[2].diff)
+
+    def test_removed_section(self):
+        results = textdiff.diff_texts(self.new, self.old, cache=self.cache)
+        self.assertEqual(results[-1].status, 'removed')
+
+    def test_cache(self):
+        first = textdiff.diff_texts(self.old, self.new, cache=self.cache)
+        second = textdiff.diff_texts(self.old, self.new, cache=self.cache)
+        self.assertIs(first, second)
+        self.assertEqual(self.cache.hits, 1)
+
+    def test_cache_keeps_reflowed_text_apart(self):
+        textdiff.diff_texts(self.old, self.new, cache=self.cache)
+        reflowed = self.new.replace('means any thing.', 'means  any\nthing.')
+        results = textdiff.diff_texts(self.old, reflowed, cache=self.cache)
+        self.assertEqual(self.cache.hits, 0)
+        self.assertIn('+thing.', results[2].diff)
+
+    def test_sorted_versions(self):
+        versions = [{'date': None, 'type': 'Enrolled Bill'},
+                    {'date': '2019-05-01T04:00:00Z', 'type': 'Reported'},
+                    {'date': '2019-01-01T04:00:00Z', 'type': 'Introduced'}]
+        ordered = [item['type'] for item in
+                   textdiff.sorted_versions(versions)]
+        self.assertEqual(ordered, ['Introduced', 'Reported', 'Enrolled Bill'])
@@ -0,0 +1,133 @@
+import datetime
+import unittest
+import numpy as np
+from models.db.models import Bill, Vote
+from models.rollcall.votes import (houseVote, senateVote, congress_year,
+                                   parse_bill_reference)
+from pipeline.votes import load_votes, position_code, YEA, NAY, ABSENT
+from analysis.votes import load_matrix, party_unity, agreement
+from tests.helpers import fakeResponse, memory_session
+
+HOUSE_XML = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rollcall-vote>
+<vote-metadata>
+<congress>117</congress><session>1st</session>
+<rollcall-num>10</rollcall-num><legis-num>H R 1</legis-num>
+<vote-question>On Passage</vote-question><vote-result>Passed</vote-result>
+<action-date>3-Mar-2021</action-date><action-time>9:12 PM</action-time>
+</vote-metadata>
+<vote-data>
+<recorded-vote><legislator name-id="A000001" unaccented-name="Adams"
+ party="D" state="NC">Adams</legislator><vote>Yea</vote></recorded-vote>
+<recorded-vote><legislator name-id="B000002" unaccented-name="Baker"
+ party="R" state="TX">Baker</legislator><vote>Nay</vote></recorded-vote>
+<recorded-vote><legislator name-id="C000003" unaccented-name="Cole"
+ party="R" state="OK">Cole</legislator><vote>Not Voting</vote></recorded-vote>
+</vote-data>
+</rollcall-vote>
+"""
+
+
+class testParsing(unittest.TestCase):
+
+    def setUp(self):
+        self.vote = houseVote(congress=117, session=1, roll_num=10)
+        self.vote.call = lambda url: fakeResponse(content=HOUSE_XML)
+
+    def test_urls(self):
+        self.assertEqual(self.vote.url,
+                         'https://clerk.house.gov/evs/2021/roll010.xml')
+        senate = senateVote(congress=117, session=2, roll_num=7)
+        self.assertEqual(senate.url,
+                         'https://www.senate.gov/legislative/LIS/'
+                         'roll_call_votes/vote1172/vote_117_2_00007.xml')
+
+    def test_congress_year(self):
+        self.assertEqual(congress_year(117, 2), 2022)
+
+    def test_bill_reference(self):
+        self.assertEqual(parse_bill_reference('H J RES 5'), ('hjres', 5))
+        self.assertEqual(parse_bill_reference('S.Res.'), None)
+        self.assertEqual(parse_bill_reference('QUORUM'), None)
+
+    def test_metadata(self):
+        metadata = self.vote.metadata
+        self.assertEqual(metadata['bill'], ('hr', 1))
+        self.assertEqual(metadata['date'],
+                         datetime.datetime(2021, 3, 3, 21, 12))
+        self.assertEqual(metadata['result'], 'Passed')
+
+    def test_positions(self):
+        self.assertEqual([item['vote'] for item in self.vote.positions],
+                         ['Yea', 'Nay', 'Not Voting'])
+
+    def test_position_code(self):
+        self.assertEqual(position_code('Aye'), YEA)
+        self.assertEqual(position_code('Pelosi'), 3)
+
+
+class testVoteLoading(unittest.TestCase):
+
+    def setUp(self):
+        self.session = memory_session()
+        now = datetime.datetime(2021, 1, 1)
+        self.session.add(Bill(117, '1', 'hr', now.date(), now, now))
+        self.session.flush()
+        members = [('A1', 'D'), ('A2', 'D'), ('A3', 'D'), ('B1', 'R'),
+                   ('B2', 'R')]
+        votes = [('Yea', 'Yea', 'Yea', 'Nay', 'Nay'),
+                 ('Yea', 'Nay', 'Yea', 'Nay', 'Nay'),
+                 ('Yea', 'Yea', 'Yea', 'Yea', 'Yea')]
+        batch = list()
+        for roll, casts in enumerate(votes, start=1):
+            metadata = {'congress': 117, 'chamber': 'house', 'session': 1,
+                        'roll_number': roll, 'url': 'x', 'date': now,
+                        'question': 'On Passage', 'result': 'Passed',
+                        'bill': ('hr', 1) if roll == 1 else None}
+            positions = [{'member_id': member, 'party': party, 'vote': cast}
+                         for (member, party), cast in zip(members, casts)]
+            batch.append((metadata, positions))
+        # A member who only shows up on the last vote
+        batch[-1][1].append({'member_id': 'C1', 'party': 'D', 'vote': 'Nay'})
+        load_votes(self.session, batch)
+        self.session.commit()
+        self.matrix = load_matrix(self.session, 117, 'house')
+
+    def tearDown(self):
+        self.session.close()
+
+    def test_bill_linked(self):
+        vote = self.session.query(Vote).filter_by(roll_number=1).one()
+        self.assertEqual(vote.bill_id, 1)
+
+    def test_packed(self):
+        vote = self.session.query(Vote).filter_by(roll_number=1).one()
+        self.assertEqual(len(vote.positions), 5)
+
+    def test_matrix(self):
+        self.assertEqual(self.matrix.members,
+                         ['A1', 'A2', 'A3', 'B1', 'B2', 'C1'])
+        self.assertEqual(self.matrix.positions.shape, (6, 3))
+        self.assertEqual(self.matrix.positions[5, 0], ABSENT)
+        self.assertEqual(self.matrix.positions[5, 2], NAY)
+
+    def test_party_unity(self):
+        scores = party_unity(self.matrix)
+        # Votes 1 and 2 split the parties; A2 broke with the Democrats once
+        np.testing.assert_allclose(scores[:5], [1.0, 0.5, 1.0, 1.0, 1.0])
+        self.assertTrue(np.isnan(scores[5]))
+
+    def test_agreement(self):
+        matrix = agreement(self.matrix)
+        self.assertAlmostEqual(matrix[0, 1], 2 / 3)
+        self.assertAlmostEqual(matrix[3, 4], 1.0)
+        self.assertAlmostEqual(matrix[0, 5], 0.0)
+
+    def test_reload_replaces(self):
+        metadata = {'congress': 117, 'chamber': 'house', 'session': 1,
+                    'roll_number': 1, 'url': 'x',
+                    'date': datetime.datetime(2021, 1, 1), 'question': None,
+                    'result': 'Failed', 'bill': None}
+        load_votes(self.session, [(metadata, list())])
+        self.session.commit()
+        self.assertEqual(self.session.query(Vote).count(), 3)
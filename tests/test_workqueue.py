@@ -0,0 +1,76 @@
+import datetime
+import unittest
+from unittest import mock
+from models.cdg.legislation import batch_result
+from models.db.models import Bill, WorkItem
+from pipeline import workqueue
+from pipeline.workqueue import work_queue, run_worker
+from tests.helpers import fakeBill, memory_session
+
+
+def fake_bills(congress, keys, max_workers=8, cached=True, fetch_all=False):
+    for key in keys:
+        if key[1] == 13:
+            yield batch_result(key, None, ValueError('Bad bill'))
+        else:
+            yield batch_result(
+                key, fakeBill(key[1], bill_type=key[0].upper()), None)
+
+
+class testWorkQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.session = memory_session()
+        self.queue = work_queue(self.session, max_attempts=2, retry_delay=0)
+        self.queue.enqueue(117, [('hr', 1), ('HR', 2), ('s', 3)])
+
+    def tearDown(self):
+        self.session.close()
+
+    def test_enqueue_is_idempotent(self):
+        self.assertEqual(self.queue.enqueue(117, [('hr', 1), ('hr', 4)]), 1)
+        self.assertEqual(self.queue.counts(), {'pending': 4})
+
+    def test_leases_are_exclusive(self):
+        first = self.queue.lease('a', 2)
+        second = self.queue.lease('b', 2)
+        self.assertEqual([item.key for item in first], [('hr', 1), ('hr', 2)])
+        self.assertEqual([item.key for item in second], [('s', 3)])
+        self.assertEqual(self.queue.lease('c', 2), [])
+        self.assertFalse(self.queue.complete(first[0], 'b'))
+        self.assertTrue(self.queue.complete(first[0], 'a'))
+        self.session.commit()
+        self.assertEqual(self.queue.counts(), {'done': 1, 'leased': 2})
+
+    def test_expired_lease(self):
+        item = self.queue.lease('a')[0]
+        self.session.query(WorkItem).filter_by(
+            work_item_id=item.work_item_id).update(
+            {'lease_expires': datetime.datetime(2000, 1, 1)})
+        self.session.commit()
+        again = self.queue.lease('b')[0]
+        self.assertEqual(again.work_item_id, item.work_item_id)
+        self.assertEqual(again.attempts, 2)
+        self.assertFalse(self.queue.heartbeat(item, 'a'))
+        self.assertTrue(self.queue.heartbeat(item, 'b'))
+
+    def test_retries(self):
+        item = self.queue.lease('a')[0]
+        self.queue.fail(item, 'a', ValueError('timed out'))
+        self.assertEqual(self.queue.lease('a')[0].work_item_id,
+                         item.work_item_id)
+        self.queue.fail(item, 'a', ValueError('timed out again'))
+        row = self.session.get(WorkItem, item.work_item_id)
+        self.assertEqual((row.status, row.last_error),
+                         ('failed', 'timed out again'))
+
+    def test_run_worker(self):
+        patcher = mock.patch.object(workqueue, 'bills', fake_bills)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.queue.enqueue(117, [('hr', 13)])
+        totals = run_worker(self.session, worker_id='a', batch_size=2,
+                            queue=self.queue)
+        self.assertEqual(totals, {'loaded': 3, 'failed': 2})
+        self.assertEqual(self.queue.counts(), {'done': 3, 'failed': 1})
+        self.assertEqual(self.session.query(Bill).count(), 3)